@@ -0,0 +1,289 @@
+"""
+Benchmarks for ChoroPie construction, plotting and export.
+
+Times ChoroPie.__init__, choro_plot, pie_plot, insert_colorbar, zoom_to_area and fig.savefig on the demo shapefiles at
+several data sizes (the share of areas given data), and records the peak memory of each phase with tracemalloc. Results
+are written as json so runs from different commits can be compared:
+
+    python benchmarks/bench.py --output before.json
+    (checkout another commit)
+    python benchmarks/bench.py --output after.json --compare before.json
+
+Run from the repository root. The synthetic dataset (3,000 county sized areas with shared, wiggly borders) is written
+with pyshp on first use, so there is always something to measure. Datasets whose shp files are missing are recorded as
+skipped. Options which older commits don't know (lod, use_collection, scheme, cull) are only passed when asked for, so the
+same script runs against any commit.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from choropie import ChoroPie as cp  # noqa: E402
+
+BASEMAP_KWARGS = dict(llcrnrlon=-119, llcrnrlat=22, urcrnrlon=-64, urcrnrlat=49,
+                      projection='lcc', lat_1=33, lat_2=45, lon_0=-95, resolution=None)
+
+DATASETS = dict(
+    synthetic=dict(shp_file=os.path.join(tempfile.gettempdir(), 'choropie_bench', 'synthetic_60x50'), shp_key='GEOID',
+                   grid=(60, 50)),
+    state=dict(shp_file=os.path.join(ROOT, 'demo_projects', 'fatal_police_shootings', 'Data', 'cb_2016_us_state_500k',
+                                     'cb_2016_us_state_500k'),
+               shp_key='NAME'),
+    county=dict(shp_file=os.path.join(ROOT, 'demo_projects', 'us_election', 'Shapefiles', 'cb_2016_us_county_500k'),
+                shp_key='GEOID'),
+)
+
+PIE_DICT = dict(a='red', b='blue', c='green', d='0.75')
+
+PHASES = ('init', 'choro_plot', 'pie_plot', 'insert_colorbar', 'zoom_to_area', 'savefig')
+
+
+def write_synthetic(shp_file, nx, ny, points_per_edge=24, seed=0):
+    """
+    Writes an nx x ny grid of jittered quadrilaterals over the conterminous US with pyshp. Every edge is a wiggly line of
+    points_per_edge segments which both of its areas share, like county borders.
+    """
+    import shapefile
+
+    rng = np.random.default_rng(seed)
+
+    lons = np.linspace(-117., -66., nx + 1)
+    lats = np.linspace(24., 48., ny + 1)
+    cell = np.array([lons[1] - lons[0], lats[1] - lats[0]])
+
+    nodes = np.stack(np.meshgrid(lons, lats, indexing='ij'), axis=-1)
+    nodes[1:-1, 1:-1] += rng.uniform(-.3, .3, (nx - 1, ny - 1, 2)) * cell
+
+    t = np.linspace(0., 1., points_per_edge + 1)[:, None]
+
+    def edge(start, end, axis):
+        points = start + (end - start) * t
+        wiggle = rng.normal(size=3) * .06 * cell[axis]
+        points[:, axis] += (wiggle[0] * np.sin(np.pi * t) + wiggle[1] * np.sin(3 * np.pi * t) +
+                            wiggle[2] * np.sin(7 * np.pi * t))[:, 0]
+        return points
+
+    # vertical edges go up from node (i, j), horizontal edges right from it
+    up = [[edge(nodes[i, j], nodes[i, j + 1], 0) for j in range(ny)] for i in range(nx + 1)]
+    right = [[edge(nodes[i, j], nodes[i + 1, j], 1) for j in range(ny + 1)] for i in range(nx)]
+
+    os.makedirs(os.path.dirname(shp_file), exist_ok=True)
+    with shapefile.Writer(shp_file, shapeType=shapefile.POLYGON) as writer:
+        writer.field('GEOID', 'C', 5)
+        writer.field('NAME', 'C', 40)
+        for i in range(nx):
+            for j in range(ny):
+                # clockwise: up the left edge, along the top, down the right edge and back along the bottom
+                ring = np.concatenate([up[i][j], right[i][j + 1][1:], up[i + 1][j][::-1][1:], right[i][j][::-1][1:]])
+                writer.poly([ring.tolist()])
+                writer.record('%05d' % (i * ny + j), 'Area %d' % (i * ny + j))
+
+
+def make_data(area_names, fraction, seed=0):
+    """
+    Synthetic color, size and pie data for a share of the areas.
+    """
+    rng = np.random.default_rng(seed)
+
+    names = list(area_names)
+    names = [names[i] for i in np.sort(rng.choice(len(names), max(1, int(round(len(names) * fraction))), replace=False))]
+
+    color_data = pd.Series(rng.lognormal(size=len(names)), index=names)
+    size_data = pd.Series(rng.random(len(names)) + 0.1, index=names)
+
+    index = pd.MultiIndex.from_product([names, list(PIE_DICT)])
+    pie_data = pd.Series(rng.random(len(index)), index=index)
+    size_ratios = pd.Series(rng.random(len(index)) + 0.1, index=index)
+
+    return dict(color_data=color_data, size_data=size_data, pie_data=pie_data, size_ratios=size_ratios)
+
+
+def run_once(dataset, data, args, trace):
+    """
+    Runs every phase once. Returns the seconds and (when trace) the tracemalloc peak in bytes of each phase, and the error
+    of each phase which raised. Phases after a failed one still run, except after init.
+    """
+    seconds = {}
+    peaks = {}
+    errors = {}
+
+    def phase(name, funct):
+        if trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            result = funct()
+        except Exception as e:  # older commits may not run on current libraries, record it and go on
+            errors[name] = '%s: %s' % (type(e).__name__, e)
+            return None
+        seconds[name] = time.perf_counter() - start
+
+        if trace:
+            peaks[name] = tracemalloc.get_traced_memory()[1] - base
+
+        return result
+
+    # only pass the options which were asked for, older commits don't take them
+    init_kwargs = dict(lod=True) if args.lod else dict()
+    pie_kwargs = dict(use_collection=True) if args.collection else dict()
+    choro_kwargs = dict(pie_kwargs, **(dict(scheme=args.scheme) if args.scheme else dict()))
+    zoom_kwargs = dict(cull=True) if args.cull else dict()
+
+    m = phase('init', lambda: cp.ChoroPie(BASEMAP_KWARGS, dataset['shp_file'], dataset['shp_key'],
+                                          figsize=tuple(args.figsize), **init_kwargs))
+    if m is None:
+        return seconds, peaks, errors
+
+    phase('choro_plot', lambda: m.choro_plot(args.num_colors, 'hot_r', data['color_data'], **choro_kwargs))
+    phase('pie_plot', lambda: m.pie_plot(data['pie_data'], PIE_DICT, size_data=data['size_data'],
+                                         size_ratios=data['size_ratios'], **pie_kwargs))
+    phase('insert_colorbar', lambda: m.insert_colorbar(colorbar_title='benchmark'))
+    phase('zoom_to_area', lambda: m.zoom_to_area(list(data['color_data'].index[:1]), **zoom_kwargs))
+    phase('savefig', lambda: m.fig.savefig(io.BytesIO(), format='png', dpi=args.dpi))
+
+    plt.close(m.fig)
+
+    return seconds, peaks, errors
+
+
+def bench_dataset(name, dataset, args):
+    """
+    Results of every data size of a dataset.
+    """
+    if 'grid' in dataset and not os.path.exists(dataset['shp_file'] + '.shp'):
+        write_synthetic(dataset['shp_file'], *dataset['grid'])
+
+    if not os.path.exists(dataset['shp_file'] + '.shp'):
+        return dict(skipped='missing %s.shp' % dataset['shp_file'])
+
+    area_names = list(dict.fromkeys(area[dataset['shp_key']] for area in cp.get_shp_attributes(dataset['shp_file'])))
+
+    sizes = []
+    for fraction in args.fractions:
+        data = make_data(area_names, fraction)
+
+        timings = {phase: [] for phase in PHASES}
+        errors = {}
+        for _ in range(args.repeat):
+            seconds, _, failed = run_once(dataset, data, args, trace=False)
+            for phase, value in seconds.items():
+                timings[phase].append(value)
+            errors.update(failed)
+
+        peaks = {}
+        if not args.no_memory:
+            tracemalloc.start()
+            peaks = run_once(dataset, data, args, trace=True)[1]
+            tracemalloc.stop()
+
+        sizes.append(dict(fraction=fraction,
+                          n_areas=len(data['color_data']),
+                          phases={phase: dict(min=min(values) if values else None,
+                                              median=statistics.median(values) if values else None,
+                                              peak_bytes=peaks.get(phase),
+                                              error=errors.get(phase))
+                                  for phase, values in timings.items()}))
+
+        print('%s %.2f: %s' % (name, fraction, ', '.join('%s %s' % (phase, '%.3fs' % min(values) if values else 'failed')
+                                                         for phase, values in timings.items())))
+        for phase, error in errors.items():
+            print('  %s failed: %s' % (phase, error))
+
+    return dict(shp_file=os.path.relpath(dataset['shp_file'], ROOT), shp_key=dataset['shp_key'],
+                n_areas=len(area_names), sizes=sizes)
+
+
+def environment():
+    """
+    Commit and library versions the results were measured with.
+    """
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return dict(commit=commit,
+                python=platform.python_version(),
+                platform=platform.platform(),
+                numpy=np.__version__,
+                pandas=pd.__version__,
+                matplotlib=matplotlib.__version__)
+
+
+def compare(results, baseline):
+    """
+    Prints the ratio of every minimum time to the same measurement in baseline.
+    """
+    for name, dataset in results['datasets'].items():
+        old = baseline.get('datasets', {}).get(name, {})
+        old_sizes = {size['fraction']: size for size in old.get('sizes', [])}
+
+        for size in dataset.get('sizes', []):
+            if size['fraction'] not in old_sizes:
+                continue
+            for phase, values in size['phases'].items():
+                before = old_sizes[size['fraction']]['phases'].get(phase)
+                if before and before.get('min') and values['min']:
+                    print('%s %.2f %-16s %8.3fs -> %8.3fs  x%.2f' % (name, size['fraction'], phase, before['min'],
+                                                                    values['min'], values['min'] / before['min']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--datasets', nargs='+', default=list(DATASETS), choices=list(DATASETS))
+    parser.add_argument('--shp', nargs=2, action='append', default=[], metavar=('SHP_FILE', 'SHP_KEY'),
+                        help='benchmark another shp file (path without extension) as well')
+    parser.add_argument('--fractions', nargs='+', type=float, default=[0.1, 0.5, 1.0],
+                        help='share of areas given data')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--num-colors', type=int, default=8)
+    parser.add_argument('--scheme', help='choro_plot classification scheme. choro_plot\'s default when not given')
+    parser.add_argument('--collection', action='store_true', help='draw with use_collection')
+    parser.add_argument('--cull', action='store_true', help='zoom_to_area with cull')
+    parser.add_argument('--lod', action='store_true', help='construct with lod')
+    parser.add_argument('--figsize', nargs=2, type=float, default=[22, 12])
+    parser.add_argument('--dpi', type=float, default=100)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--compare', help='results file of an earlier run')
+    args = parser.parse_args(argv)
+
+    datasets = {name: DATASETS[name] for name in args.datasets}
+    for shp_file, shp_key in args.shp:
+        datasets[os.path.basename(shp_file)] = dict(shp_file=os.path.abspath(shp_file), shp_key=shp_key)
+
+    results = dict(environment=environment(),
+                   options={key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+                   datasets={name: bench_dataset(name, dataset, args) for name, dataset in datasets.items()})
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of choropie import times.
+
+Every statement runs in a fresh interpreter, so nothing is cached between measurements. Reports the wall time of each
+statement and the heavy backends (basemap, matplotlib.pyplot, pandas) it left in sys.modules. Results are written as
+json and can be compared with an earlier run:
+
+    python benchmarks/import_time.py --output before.json
+    (checkout another commit)
+    python benchmarks/import_time.py --output after.json --compare before.json
+
+Run from the repository root.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = (
+    ('numpy', 'import numpy'),
+    ('choropie', 'import choropie'),
+    ('poly_functs', 'from choropie import poly_functs'),
+    ('spatial_index', 'from choropie.spatial_index import SpatialIndex'),
+    ('ChoroPie module', 'from choropie import ChoroPie as cp'),
+    ('ChoroPie class', 'from choropie import ChoroPie as cp; cp.ChoroPie'),
+)
+
+BACKENDS = ('mpl_toolkits.basemap', 'matplotlib.pyplot', 'matplotlib', 'pandas')
+
+# times the statement and prints the seconds and the backends it imported as json
+SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+%s
+seconds = time.perf_counter() - start
+print(json.dumps(dict(seconds=seconds, backends=[name for name in %r if name in sys.modules])))
+'''
+
+
+def time_statement(statement):
+    """
+    Seconds and loaded backends of one statement in a fresh interpreter.
+    """
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT % (statement, BACKENDS)], cwd=ROOT)
+
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='import_time.json')
+    parser.add_argument('--compare', help='results file of an earlier run')
+    args = parser.parse_args(argv)
+
+    results = dict(environment=dict(python=platform.python_version(), platform=platform.platform()), statements={})
+
+    for name, statement in STATEMENTS:
+        runs = [time_statement(statement) for _ in range(args.repeat)]
+        seconds = [run['seconds'] for run in runs]
+
+        results['statements'][name] = dict(statement=statement, min=min(seconds), median=statistics.median(seconds),
+                                           backends=runs[0]['backends'])
+
+        print('%-16s %8.3fs  %s' % (name, min(seconds), ', '.join(runs[0]['backends']) or '-'))
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        for name, values in results['statements'].items():
+            before = baseline.get('statements', {}).get(name)
+            if before:
+                print('%-16s %8.3fs -> %8.3fs  x%.2f' % (name, before['min'], values['min'], values['min'] / before['min']))
+
+
+if __name__ == '__main__':
+    main()
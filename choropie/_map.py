@@ -0,0 +1,1444 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+import matplotlib as mpl
+from mpl_toolkits.basemap import Basemap
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+from matplotlib.patches import Patch
+from matplotlib.collections import LineCollection, PathCollection, PolyCollection
+import matplotlib.path as mplPath
+
+# area and centroids for polygons in shapefiles
+from choropie import poly_functs as sc
+from choropie import classify
+from choropie import export
+from choropie import geometry_cache
+from choropie import layout
+from choropie import preprocess
+from choropie import projections
+from choropie import shp_reader
+from choropie.geometry import GeometryStore, ShapeList
+from choropie.profiling import Profiler, profiled
+
+
+def _area_matrix(data, area_names, categories=None):
+    """
+    Aligns a series with an (area name, category) multiindex into a dense areas x categories matrix, with rows in the order
+    of area_names. Pairs missing from data and areas not in area_names are left out.
+
+    Parameters:
+        data (series): multiindex with area names followed by categories and a column of data.
+        area_names (list): unique area names, one per row.
+        categories (pd.Index): column order. defaults to the categories of data in order of appearance.
+
+    Returns:
+        matrix (np.array): (n_areas, n_categories) float array, nan for missing pairs.
+        categories (pd.Index): category of each column.
+    """
+    if categories is None:
+        columns, categories = pd.factorize(data.index.get_level_values(1))
+    else:
+        columns = categories.get_indexer(data.index.get_level_values(1))
+    rows = pd.Index(area_names).get_indexer(data.index.get_level_values(0))
+
+    keep = (rows >= 0) & (columns >= 0)
+
+    matrix = np.full((len(area_names), len(categories)), np.nan)
+    matrix[rows[keep], columns[keep]] = np.asarray(data, dtype=np.float64)[keep]
+
+    return matrix, pd.Index(categories)
+
+
+class ChoroPie(Basemap):
+    """
+    A Basemap/Matplotlib toolkit which allows the simplified creation of choropleth maps with colorbars using shapefiles, and the combined plotting of pie charts within the centroid coordinates of the shapefile's polygons.
+
+
+    Attributes:
+        choropie:
+            geometry (GeometryStore): projected shapes of the shp file, with the shapes of each area stored together.
+            corr_geometry (GeometryStore): corrected shapes (takes into account any translation/rescaling).
+            area_names (list of tuples): area names extracted from shape files corresponding to each shape (may have duplicates).
+            indexer (dict): area_name as key, index position of the first shape of the area in shapes and corr_shapes as value.
+                the shapes of an area are consecutive.
+            shapes (ShapeList): area_names, area (list of vector coordinates) from shp file. a read only view of geometry.
+            corr_shapes (ShapeList): corrected  vector coordinates (takes into account any translation/rescaling) with associated area names (may have duplicates). a read only view of corr_geometry, move areas with translate_shapes.
+            centroids (list of tuples): original polygon centroids with associated area names.
+            corr_centroids: corrected centroids (takes into account any translation/rescaling) with associated area names.
+            area_info (list): shp attributes as read by Basemap, in the order of shapes.
+            annotations (dict): holds matplotlib.pyplot.annotate objects for each area that are created after calling set_pie_offset method.
+            lod_levels (list): simplification tolerances in map units, coarsest first. None when lod is off.
+            lod_tolerance (numeric): tolerance of the level currently drawn. None for full resolution.
+
+        matplotlib:
+            fig (figure): matplotlib figure instance.
+            ax (axes): matplotlib axes instance where the map projection is plotted.
+            mpl_paths (dict): area, list of path collection memory addresses (or range of indices into mpl_pie_collection).
+            mpl_pie_collection (PathCollection): all pie wedges when pie_plot is called with use_collection, else None.
+            mpl_polygons (dict): area, list of polygons memory addresses (or range of indices into mpl_collection).
+            mpl_collection (PolyCollection): all polygons when choro_plot is called with use_collection, else None.
+            mpl_bounds (LineCollection): shape boundaries drawn on construction.
+            x_lims (tuple): initial x axis limits.
+            y_lims (tuple): initial y axis limits.
+    """
+
+    def __draw_pie(self, X, Y, colors, ratios, sizes):
+        """
+        Used in loops to draw pie charts. Returns a list of matplotlib PathCollection objects, one per slice.
+        """
+        mpl_paths_sin = []
+
+        if len(ratios) == 1:  # draw solid colored pie when only one variable is present (to avoid a radial line)
+            path = self.ax.scatter(X, Y,
+                                   s=sizes[0],
+                                   facecolor=self.pie_dict[colors[0]],
+                                   edgecolor='black',
+                                   zorder=3)
+
+            mpl_paths_sin.append(path)
+
+        else:
+            xy = []
+
+            # determine arches
+            start = 0.
+            for ratio in ratios:
+                x = [0] + np.cos(np.linspace(2 * np.pi * start, 2 * np.pi * (start + ratio), 30)).tolist()
+                y = [0] + np.sin(np.linspace(2 * np.pi * start, 2 * np.pi * (start + ratio), 30)).tolist()
+                xy.append(list(zip(x, y)))
+                start += ratio
+
+            # iterate through slices and draw one by one
+            for color, xyi, size in zip(colors, xy, sizes):
+                path = self.ax.scatter(X, Y,
+                                       marker=np.array(xyi),
+                                       s=size,
+                                       facecolor=self.pie_dict[color],
+                                       edgecolor='black',
+                                       zorder=3)
+
+                mpl_paths_sin.append(path)
+
+        return mpl_paths_sin
+
+    @profiled('draw_pies')
+    def __draw_pies(self, names=None):
+        """
+        Draws the pies prepared by pie_plot, for names only when given, in the mode pie_plot was called with.
+        """
+        names = list(self.__pies) if names is None else names
+
+        self.mpl_paths = {}
+        self.mpl_pie_collection = None
+
+        if self.__pie_use_collection:
+            self.__pie_collection_plot([(name,) + self.__pies[name] for name in names])
+        else:
+            for name in names:
+                x, y, colors, ratios, sizes = self.__pies[name]
+                self.mpl_paths.update({name: self.__draw_pie(x, y, colors, ratios, sizes)})
+
+        if self.stats.enabled:
+            wedges = sum(len(self.__pies[name][3]) for name in names)
+            self.stats.count(artists=wedges if self.mpl_pie_collection is None else 1, pies=len(names), wedges=wedges)
+
+    def __remove_pies(self):
+        """
+        Removes the pie artists from the axes. The pies prepared by pie_plot are kept.
+        """
+        if self.mpl_pie_collection is not None:
+            self.mpl_pie_collection.remove()
+        else:
+            for path in [path for paths in self.mpl_paths.values() for path in paths]:
+                path.remove()
+
+        self.mpl_paths = {}
+        self.mpl_pie_collection = None
+
+    def __pie_collection_plot(self, pies):
+        """
+        Draws the wedges of every pie into one PathCollection, in the same order and with the same marker geometry as
+        __draw_pie.
+
+        Parameters:
+            pies (list of tuples): area name, x, y, slice names, slice ratios, slice sizes (scatter sizes) for each pie.
+        """
+        counts = [len(ratios) for name, x, y, colors, ratios, sizes in pies]
+        pie_offsets = np.append(0, np.cumsum(counts)).astype(np.int64)
+
+        ratios = np.concatenate([ratios for name, x, y, colors, ratios, sizes in pies]) if pies else np.zeros(0)
+        wedges = sc.pie_wedges(ratios, pie_offsets)
+
+        circle = mplPath.Path.unit_circle().transformed(mpl.transforms.Affine2D().scale(0.5))
+
+        paths = []
+        offsets = []
+        facecolors = []
+        self.__pie_sizes = []
+        for (name_glob, x, y, colors, ratios, sizes), start, end in zip(pies, pie_offsets[:-1], pie_offsets[1:]):
+            if len(ratios) == 1:  # draw solid colored pie when only one variable is present (to avoid a radial line)
+                paths.append(circle)
+            else:
+                paths.extend(mplPath.Path(wedge) for wedge in wedges[start:end])
+
+            offsets.extend([(x, y)] * len(ratios))
+            facecolors.extend(self.pie_dict[color] for color in colors)
+            self.__pie_sizes.extend(sizes)
+
+            self.mpl_paths.update({name_glob: range(start, end)})
+
+        self.__pie_sizes = np.array(self.__pie_sizes, dtype=np.float64)
+
+        self.mpl_pie_collection = PathCollection(paths, self.__pie_sizes,
+                                                 facecolors=facecolors,
+                                                 edgecolors='black',
+                                                 linewidths=mpl.rcParams['patch.linewidth'],
+                                                 offsets=np.array(offsets).reshape(-1, 2),
+                                                 offset_transform=self.ax.transData,
+                                                 zorder=3)
+        self.mpl_pie_collection.set_transform(mpl.transforms.IdentityTransform())
+        self.ax.add_collection(self.mpl_pie_collection, autolim=False)
+
+    def __set_pie_offsets(self, area_name, new_origin):
+        """
+        Moves the pie of an area, whether it is drawn as PathCollections or as part of mpl_pie_collection.
+        """
+        self.__move_pies([area_name], [new_origin])
+
+    def __move_pies(self, area_names, new_origins):
+        """
+        Moves the pies of several areas at once. Pies which aren't drawn (culled) are drawn at the new origin later.
+        """
+        for name, (x, y) in zip(area_names, new_origins):
+            if name in self.__pies:
+                self.__pies[name] = (x, y) + self.__pies[name][2:]
+
+        if self.mpl_pie_collection is None:
+            for name, new_origin in zip(area_names, new_origins):
+                for paths in self.mpl_paths.get(name, []):
+                    paths.set_offsets(new_origin)
+        else:
+            offsets = np.array(self.mpl_pie_collection.get_offsets())
+            for name, new_origin in zip(area_names, new_origins):
+                if name in self.mpl_paths:
+                    offsets[self.mpl_paths[name].start:self.mpl_paths[name].stop] = new_origin
+            self.mpl_pie_collection.set_offsets(offsets)
+
+    def __pie_radii(self, area_names):
+        """
+        Radius in points of the pie of each area: the reach of its largest slice, with slices scaled the way scatter scales
+        markers.
+        """
+        pies = [self.__pies[name] for name in area_names]
+        pie_offsets = np.append(0, np.cumsum([len(ratios) for x, y, colors, ratios, sizes in pies])).astype(np.int64)
+        if pie_offsets[-1] == 0:
+            return np.zeros(len(pies))
+
+        ratios = np.concatenate([ratios for x, y, colors, ratios, sizes in pies])
+        sizes = np.concatenate([sizes for x, y, colors, ratios, sizes in pies]).astype(np.float64)
+
+        extents = np.hypot(*sc.pie_wedges(ratios, pie_offsets).transpose(2, 0, 1)).max(axis=1)
+        extents[pie_offsets[:-1][np.diff(pie_offsets) == 1]] = 0.5  # single slice pies are circles
+
+        return np.maximum.reduceat(np.sqrt(sizes) * extents, pie_offsets[:-1])
+
+    def __remove_annotation(self, area_name):
+        """
+        Removes the arrow drawn to the pie of an area, if any.
+        """
+        if area_name in self.annotations:  # check to see if annotation is in dictionary container
+            try:
+                self.annotations[area_name].remove()
+            except Exception as e:
+                print('exception: ', e)
+            del self.annotations[area_name]
+
+    def __annotate_offset(self, area_name, old_origin, new_origin, annotate_kwargs):
+        """
+        Draws an arrow from old_origin to the pie of an area, replacing the one drawn before.
+        """
+        self.__remove_annotation(area_name)  # remove to prevent multiple arrows
+
+        default = dict(text='',
+                       xy=(new_origin[0], new_origin[1]),
+                       xycoords='data',
+                       xytext=(old_origin[0], old_origin[1]),
+                       textcoords='data',
+                       color='black',
+                       ha='center',
+                       arrowprops=dict(arrowstyle="fancy",
+                                       color='red'))
+        default.update(annotate_kwargs)
+        self.annotations.update({area_name: self.ax.annotate(**default)})
+
+    def __set_pies_visible(self, area_names=None):
+        """
+        Shows the pies of area_names and hides all others. Shows every pie when area_names is None.
+        """
+        self.__shown_pies = None if area_names is None else set(area_names)
+
+        if self.mpl_pie_collection is None:
+            for name, paths in self.mpl_paths.items():
+                for path in paths:
+                    path.set_visible(area_names is None or name in area_names)
+        else:
+            sizes = self.__pie_sizes.copy()
+            if area_names is not None:
+                visible = np.zeros(len(sizes), dtype=bool)
+                for name in area_names:
+                    if name in self.mpl_paths:
+                        visible[self.mpl_paths[name].start:self.mpl_paths[name].stop] = True
+                sizes[~visible] = 0
+
+            self.mpl_pie_collection.set_sizes(sizes)
+
+    def __draw_bounds(self, rings):
+        """
+        Draws shape boundaries the way Basemap.readshapefile does. Used when the shp file is not read by Basemap.
+        """
+        lines = LineCollection(rings, antialiaseds=(1,))
+        lines.set_color('k')
+        lines.set_linewidth(0.5)
+        lines.set_label('_nolabel_')
+        lines.set_zorder(1)
+        self.ax.add_collection(lines)
+
+        self.set_axes_limits(ax=self.ax)
+        lines, c = self._cliplimb(self.ax, lines)
+
+        return lines
+
+    def __init__(self, basemap_kwargs, shp_file, shp_key, figsize=(22, 12), cache_dir=None, lod=False, dtype=np.float64,
+                 profile=False, profile_memory=False, profile_callback=None, headless=False, projection_backend=None,
+                 workers=None):
+        """
+        Initialization:
+        Preps for plotting. Does the heavy lifting of finding polygon areas and centroids.
+
+        Parameters:
+        Positional:
+            basemap_kwargs (dict): kwargs to pass into Basemap.
+            shp_file (string): path to a shp_file without the ".shp" extension in the string.
+            shp_key (string): the attribute in the shape file which contains the indices used in the data.
+        Optional:
+            drawbounds (bool): passed into Basemap.readshapefile method. draws borders on map.
+            figsize (tuple): matplotlib figure size.
+            cache_dir (string): directory for the geometry cache. when passed, the projected shapes, indexer and centroids are
+                stored on the first run and later runs with the same shp file and basemap_kwargs skip reading and projecting it.
+            lod (bool or list): draw simplified shapes matched to the output resolution. True uses a default set of
+                simplification tolerances, a list gives the tolerances in map units. see select_lod. the simplification of
+                every level is worked out once, in one vectorized pass, and kept in the geometry cache.
+            dtype (numpy dtype): dtype of the projected vertices. np.float32 halves the memory of geometry for large shp files.
+            profile (bool): record the wall time of every public method and of their internal phases (reading the shp file,
+                building the geometry, centroids, drawing, rasterizing...) along with artist and vertex counts in stats.
+            profile_memory (bool): also record tracemalloc peaks in stats. slows everything down while on.
+            profile_callback (function): called with each stats record as it is made.
+            headless (bool): draw on a bare Agg Figure that pyplot doesn't know about, for servers rendering many maps. the
+                figure is freed with the ChoroPie instance, no plt.close needed. use render or savefig to get the image.
+            projection_backend (string): "numpy" projects with the vectorized projections of choropie.projections (cyl, merc,
+                lcc and tmerc), reading the shp file in one pass and projecting every vertex in one call. "basemap" projects
+                through Basemap and reads the shp file with Basemap.readshapefile. None uses numpy when the projection has a
+                numpy implementation.
+            workers (int): processes projecting the shp file and finding centroids and bounds, with the vertices passed
+                through shared memory. -1 uses every cpu. files under preprocess.MIN_VERTICES vertices (and the basemap
+                backend) are always done in this process. the results are the same as with one process.
+
+        Attributes:
+            stats (Profiler): the records. switch profiling on or off later with stats.enabled.
+            projector (Projection or BasemapProjection): the projection used by project.
+        """
+        self.stats = Profiler(profile or profile_memory or profile_callback is not None, profile_memory, profile_callback)
+
+        with self.stats.phase('init'):
+            with self.stats.phase('basemap'):
+                Basemap.__init__(self, **basemap_kwargs)
+
+                if projection_backend not in (None, 'numpy', 'basemap'):
+                    raise ValueError('projection_backend must be "numpy", "basemap" or None, not %r' % (projection_backend,))
+                self.projector = None if projection_backend == 'basemap' else projections.from_basemap(self)
+                if self.projector is None:
+                    if projection_backend == 'numpy':
+                        raise ValueError('projection "%s" has no numpy implementation' % self.projection)
+                    self.projector = projections.BasemapProjection(self)
+
+                if headless:
+                    self.fig = Figure(figsize=figsize)
+                    FigureCanvasAgg(self.fig)
+                else:
+                    import matplotlib.pyplot as plt
+
+                    self.fig = plt.figure(figsize=figsize)
+                self.ax = self.fig.add_axes([0.1, 0.1, .95, 0.95], frame_on=False)
+
+            cached = None
+            if cache_dir is not None:
+                with self.stats.phase('cache_load'):
+                    backend = 'numpy' if isinstance(self.projector, projections.Projection) else 'basemap'
+                    cache_file = geometry_cache.cache_path(cache_dir, shp_file, shp_key, basemap_kwargs, dtype, backend)
+                    cached = geometry_cache.load(cache_file)
+
+            self.mpl_bounds = None
+            if cached is None:
+                # shp file
+                if isinstance(self.projector, projections.Projection):
+                    with self.stats.phase('read_shapefile'):
+                        lonlat, ring_offsets, self.area_info = shp_reader.read_lonlat(shp_file)
+
+                    workers = preprocess.resolve_workers(workers, len(lonlat))
+                    with self.stats.phase('project'):
+                        coords = preprocess.project(self.projector, lonlat, workers)
+                        del lonlat
+                else:
+                    with self.stats.phase('read_shapefile'):  # parsing and projection
+                        info = self.readshapefile(shp_file, 'area', drawbounds=True, zorder=1)  # read shapefile
+                        self.mpl_bounds = info[-1] if len(info) > 4 else None
+                    workers = 1
+
+                # every ring in one vertex array, with the rings of each area stored together
+                with self.stats.phase('geometry'):
+                    ring_names = [areas[shp_key] for areas in self.area_info]
+                    if self.mpl_bounds is None:
+                        self.geometry = GeometryStore.from_flat(ring_names, coords, ring_offsets, dtype)
+                    else:
+                        self.geometry = GeometryStore.from_rings(ring_names, self.area, dtype)
+                    self.area_info = [self.area_info[ring] for ring in self.geometry.file_rings.tolist()]
+
+                # the centroid of an area is the centroid of its largest ring
+                with self.stats.phase('centroids'):
+                    centroids, ring_bounds = preprocess.centroids_and_bounds(self.geometry, workers)
+
+                lod_errors = self.__simplification_errors() if lod else None
+
+                if cache_dir is not None:
+                    with self.stats.phase('cache_save'):
+                        geometry_cache.save(cache_file, self.geometry, self.area_info, centroids, lod_errors)
+            else:
+                self.geometry = cached['geometry']
+                self.geometry.vertices = self.geometry.vertices.astype(dtype, copy=False)
+                self.area_info = cached['area_info']
+                centroids = cached['centroids']
+                ring_bounds = self.geometry.ring_bounds()
+
+                # cached by a run without lod, store them for the next one
+                lod_errors = cached['lod_errors']
+                if lod and lod_errors is None:
+                    lod_errors = self.__simplification_errors()
+                    with self.stats.phase('cache_save'):
+                        geometry_cache.save(cache_file, self.geometry, self.area_info, centroids, lod_errors)
+
+            self.stats.count(areas=self.geometry.n_areas, rings=self.geometry.n_rings, vertices=len(self.geometry.vertices))
+
+            # views into the store replace the lists of tuples read by Basemap
+            self.area = self.geometry.rings()
+            self.area_names = self.geometry.ring_names()  # congregate names into list
+
+            if self.mpl_bounds is None:
+                with self.stats.phase('draw_bounds'):
+                    self.mpl_bounds = self.__draw_bounds(self.area)
+
+            self.corr_geometry = self.geometry.copy()  # corrected coordinates which hold any modifications to shapes
+
+            self.indexer = dict(zip(self.geometry.names, self.geometry.area_offsets[:-1].tolist()))  # first shape of each area
+            self.centroids = dict(zip(self.geometry.names, map(tuple, centroids.tolist())))  # original centroids
+            self.corr_centroids = dict(self.centroids)  # corrected centroids
+
+            # bounding box (x0, y0, x1, y1) of every shape in corr_geometry
+            self.__ring_bounds = ring_bounds
+
+            self.x_lims = self.ax.get_xlim()
+            self.y_lims = self.ax.get_ylim()
+
+            # level of detail
+            if lod is True:
+                extent = max(self.urcrnrx - self.llcrnrx, self.urcrnry - self.llcrnry)
+                lod = [extent / 2 ** k for k in (9, 11, 13, 15)]
+            self.lod_levels = sorted(lod, reverse=True) if lod else None
+            self.lod_tolerance = None
+            self.__lod_masks = {}
+            self.__lod_errors = lod_errors
+            self.__polygon_rings = {}
+
+            # matplotlib objects, filled by choro_plot and pie_plot
+            self.mpl_polygons = {}
+            self.mpl_collection = None
+            self.mpl_paths = {}
+            self.mpl_pie_collection = None
+            self.ax_colorbar = None
+
+            # plot state kept to redraw after culling
+            self.__series_bins = None
+            self.__choro_areas = None  # areas choro_plot drew, kept (hidden) when later data drops them
+            self.__visible_areas = None
+            self.__pies = {}
+            self.__pie_anchors = {}  # where pies were before layout_pies moved them
+            self.__shown_pies = None  # names of the pies left visible by zoom_to_area, None for all
+            self.__culled = False
+
+            self.select_lod()
+
+            ###
+            # dictionary which holds annotations created in set_pie_offset method
+            self.annotations = {}
+
+    def project(self, x, y, inverse=False):
+        """
+        Projects lon, lat to map x, y (or x, y back to lon, lat with inverse) with projector. Like calling the map, but whole
+        arrays are projected in one call.
+
+        Parameters:
+            x, y (numeric, sequences or np.arrays): lon and lat in degrees, or x and y in map units with inverse.
+            inverse (bool): map coordinates to lon, lat.
+
+        Returns:
+            floats for scalar input, np.arrays otherwise.
+        """
+        return self.projector(x, y, inverse=inverse)
+
+    @property
+    def shapes(self):
+        return ShapeList(self.area_names, self.geometry)
+
+    @property
+    def corr_shapes(self):
+        return ShapeList(self.area_names, self.corr_geometry)
+
+    @profiled('choro_plot')
+    def choro_plot(self, num_colors, cmap, color_data, alpha=1, use_collection=False, scheme='equal_interval', scheme_kwargs=dict()):
+        """
+        Plot the choropleths.
+
+        Parameters:
+        Positional:
+            num_colors (numeric): determines number of colors to be used in the plot.
+            cmap (matplotlib.cmap): string representation of matplotlib colormap ie. "hot_r"
+            color_data (series): series with the area name as the single index and a column for the numerical variable to be plotted as values.
+            alpha (numeric): opacity of fills.
+            use_collection (bool): draw every polygon in a single PolyCollection (mpl_collection) instead of one Polygon patch
+                per shape. much faster to draw and save for maps with many shapes. mpl_polygons then holds index ranges into
+                the collection instead of Polygon objects.
+            scheme (string or function): classification of color_data into num_colors bins: "equal_interval", "quantiles",
+                "fisher_jenks" (natural breaks) or a function, see classify.classify.
+            scheme_kwargs (dict): kwargs to pass into the scheme, such as sample for fisher_jenks on very large inputs.
+
+        Attributes:
+            __scheme (list): list of rgb values from matplotlib
+            __bins (np.array): bins corresponding to colors and values in color_data
+        """
+        self.__classification = (scheme, scheme_kwargs)
+
+        series_bins = self.__set_scheme(num_colors, cmap, color_data)
+
+        # plot choropleth patches
+        self.__remove_polygons()
+        self.__alpha = alpha
+        self.__use_collection = use_collection
+        self.__choro_areas = set(color_data.index)
+        self.__visible_areas = None
+        self.__culled = False
+        self.__draw_polygons()
+
+        insets = dict(Alaska=(28, -114, 0.3), Hawaii=(25, -107, 0.75))
+        self.translate_areas({name: inset for name, inset in insets.items() if name in self.geometry.codes})
+
+    @profiled('classify')
+    def __set_scheme(self, num_colors, cmap, color_data):
+        """
+        Determines the colors and bins for color_data. Returns a series with the bin of each area.
+        """
+        cm = mpl.colormaps.get_cmap(cmap)
+        self.__scheme = [cm(i / num_colors) for i in range(1, num_colors + 1)]
+        self.__num_colors = num_colors
+        self.__cmap = cmap
+
+        # define bin ranges
+        scheme, scheme_kwargs = self.__classification
+        self.__bins = classify.classify(color_data, num_colors, scheme, **scheme_kwargs)
+
+        # create series with bins corresponding to data values
+        self.__series_bins = pd.Series(index=color_data.index,
+                                       data=np.digitize(color_data, np.append(self.__bins[:-1], self.__bins[-1] + 0.0000001)) - 1)  # -1 or indexerror. it is extremely important to add that tiny number to make sure the max data point is stuck into the proper bin
+
+        return self.__series_bins
+
+    @profiled('draw_polygons')
+    def __draw_polygons(self, rings=None):
+        """
+        Draws the choropleth polygons of the rings given (all shapes by default) in the mode choro_plot was called with.
+        """
+        rings = range(self.corr_geometry.n_rings) if rings is None else rings
+
+        self.mpl_polygons = {}
+        self.mpl_collection = None
+
+        if self.__use_collection:
+            self.__collection_plot(self.__series_bins, self.__alpha, rings)
+        else:
+            self.__patch_plot(self.__series_bins, self.__alpha, rings)
+
+        # areas update_color_data dropped since choro_plot
+        self.__set_polygons_visible()
+
+        if self.stats.enabled:
+            drawn = [ring for rings in self.__polygon_rings.values() for ring in rings]
+            self.stats.count(artists=len(drawn) if self.mpl_collection is None else 1,
+                             polygons=len(drawn),
+                             vertices=int(self.__vertex_counts()[drawn].sum()))
+
+    def __vertex_counts(self):
+        """
+        Number of vertices of every shape at the current level of detail.
+        """
+        if self.lod_tolerance is None or self.lod_tolerance not in self.__lod_masks:
+            return np.diff(self.geometry.ring_offsets)
+
+        return np.add.reduceat(self.__lod_masks[self.lod_tolerance].astype(np.int64), self.geometry.ring_offsets[:-1])
+
+    def __remove_polygons(self):
+        """
+        Removes the choropleth artists from the axes.
+        """
+        if self.mpl_collection is not None:
+            self.mpl_collection.remove()
+        else:
+            for poly in [poly for polys in self.mpl_polygons.values() for poly in polys]:
+                poly.remove()
+
+        self.mpl_polygons = {}
+        self.mpl_collection = None
+        self.__polygon_rings = {}
+
+    def __patch_plot(self, series_bins, alpha, rings):
+        """
+        Draws one Polygon patch per shape.
+        """
+        self.__polygon_rings = {}
+        for ring in rings:
+            name_glob = self.area_names[ring]
+            if name_glob in self.__choro_areas:
+                color = self.__scheme[series_bins.get(name_glob, 0)]
+                poly = Polygon(self.__lod_shape(ring, self.corr_geometry.ring(ring)),
+                               facecolor=color,
+                               edgecolor='black',
+                               zorder=2,
+                               alpha=alpha)
+                self.ax.add_patch(poly)
+
+                if name_glob not in self.mpl_polygons:
+                    self.mpl_polygons.update({name_glob: [poly]})
+                    self.__polygon_rings.update({name_glob: [ring]})
+                else:
+                    self.mpl_polygons[name_glob].append(poly)
+                    self.__polygon_rings[name_glob].append(ring)
+
+    def __collection_plot(self, series_bins, alpha, rings):
+        """
+        Draws every shape into one PolyCollection colored through its value array (the bin of each shape).
+        """
+        # group the shapes of each area so that every area owns one contiguous index range
+        self.__polygon_rings = {}
+        for ring in rings:
+            name_glob = self.area_names[ring]
+            if name_glob in self.__choro_areas:
+                self.__polygon_rings.setdefault(name_glob, []).append(ring)
+
+        verts = []
+        for name_glob, rings in self.__polygon_rings.items():
+            self.mpl_polygons.update({name_glob: range(len(verts), len(verts) + len(rings))})
+            verts.extend(self.__lod_shape(ring, self.corr_geometry.ring(ring)) for ring in rings)
+
+        self.__collection_bins = self.__ring_bins(series_bins)
+
+        self.mpl_collection = PolyCollection(verts,
+                                             array=self.__collection_bins,
+                                             cmap=mpl.colors.ListedColormap(self.__scheme),
+                                             norm=mpl.colors.NoNorm(),
+                                             edgecolor='black',
+                                             zorder=2,
+                                             alpha=alpha)
+        self.ax.add_collection(self.mpl_collection, autolim=False)
+
+    def __ring_bins(self, series_bins):
+        """
+        Bin of every path in mpl_collection, masked where the area has no data.
+        """
+        bins = np.ma.masked_all(sum(len(indices) for indices in self.mpl_polygons.values()), dtype=np.int64)
+
+        for name, indices in self.mpl_polygons.items():
+            if name in series_bins:
+                bins[indices.start:indices.stop] = series_bins.loc[name]
+
+        return bins
+
+    def __set_polygon_xy(self, area_name, i, shape):
+        """
+        Moves the i-th polygon of an area, whether it is a Polygon patch or a path of mpl_collection.
+        """
+        if self.mpl_collection is None:
+            self.mpl_polygons[area_name][i].set_xy(shape)  # mpl method
+        else:
+            shape = np.asarray(shape)
+            paths = self.mpl_collection.get_paths()
+            paths[self.mpl_polygons[area_name][i]] = mplPath.Path(np.concatenate([shape, shape[:1]]), closed=True)
+            self.mpl_collection.stale = True
+
+    def __set_polygons_visible(self, area_names=None):
+        """
+        Shows the polygons of area_names and hides all others. Shows every polygon when area_names is None.
+        Polygons of areas without color data are always hidden.
+        """
+        self.__visible_areas = area_names
+
+        if self.mpl_collection is None:
+            for name, polys in self.mpl_polygons.items():
+                for poly in polys:
+                    poly.set_visible((name in self.__series_bins) and (area_names is None or name in area_names))
+        else:
+            visible = ~np.ma.getmaskarray(self.__collection_bins)
+            if area_names is not None:
+                selected = np.zeros(len(visible), dtype=bool)
+                for name in area_names:
+                    if name in self.mpl_polygons:
+                        selected[self.mpl_polygons[name].start:self.mpl_polygons[name].stop] = True
+                visible &= selected
+
+            # masked values are drawn with the colormap's transparent "bad" color
+            self.mpl_collection.set_array(np.ma.masked_array(self.__collection_bins.data, mask=~visible))
+
+            # edge alphas are overridden by the collection alpha, so hidden edges get no width instead
+            self.mpl_collection.set_linewidth(np.where(visible, mpl.rcParams['patch.linewidth'], 0))
+
+    @profiled('update_color_data')
+    def update_color_data(self, color_data, num_colors=None, cmap=None, scheme=None, scheme_kwargs=None):
+        """
+        Recolor the choropleth with new data, keeping the polygons drawn by choro_plot (and any translations) in place.
+        Only the bins and face colors are recomputed, and the colorbar is redrawn if one was inserted.
+
+        Parameters:
+        Positional:
+            color_data (series): series with the area name as the single index and a column for the numerical variable to be plotted as values.
+        Optional:
+            num_colors (numeric): number of colors. defaults to the value last passed into choro_plot.
+            cmap (matplotlib.cmap): string representation of matplotlib colormap. defaults to the value last passed into choro_plot.
+            scheme (string or function): classification scheme. defaults to the value last passed into choro_plot.
+            scheme_kwargs (dict): kwargs to pass into the scheme. defaults to the value last passed into choro_plot.
+
+        Notes:
+            Areas missing from color_data are hidden. Areas that had no polygons drawn by choro_plot can't be added, call
+            clear_elements and choro_plot with a color_data that covers them instead.
+        """
+        num_colors = self.__num_colors if num_colors is None else num_colors
+        cmap = self.__cmap if cmap is None else cmap
+
+        if scheme is not None or scheme_kwargs is not None:
+            self.__classification = (self.__classification[0] if scheme is None else scheme,
+                                     self.__classification[1] if scheme_kwargs is None else scheme_kwargs)
+
+        series_bins = self.__set_scheme(num_colors, cmap, color_data)
+
+        if self.mpl_collection is None:
+            for name_glob, polys in self.mpl_polygons.items():
+                if name_glob in series_bins:
+                    color = self.__scheme[series_bins.loc[name_glob]]
+                    for poly in polys:
+                        poly.set_facecolor(color)
+        else:
+            self.__collection_bins = self.__ring_bins(series_bins)
+            self.mpl_collection.set_cmap(mpl.colors.ListedColormap(self.__scheme))
+
+        self.__set_polygons_visible(self.__visible_areas)
+
+        if self.ax_colorbar is not None:
+            self.ax_colorbar.clear()
+            self.__draw_colorbar(*self.__colorbar_args)
+
+    @profiled('insert_colorbar')
+    def insert_colorbar(self, colorbar_title=None, colorbar_loc_kwargs=dict(), colorbar_title_kwargs=dict(), colorbarbase_kwargs=dict()):
+        """
+        Insert a colorbar next to the parent axes.
+
+        Parameters:
+        Optional:
+            colorbar_title (string): title for the colorbar.
+            colorbar_loc_kwargs (dict): kwargs to pass into matplotlib.colorbar.make_axes -
+                used to adjust positioning of colorbar. pass in a keyword argument location with the options "right, left, top, bottom" to change location. defaults overwritten.
+            colorbarbase_kwargs (dict): kwargs to pass into colorbarbase instance. defaults overwritten.
+            colorbar_title_kwargs (dict): kwargs to pass into axes.set_ylabel method. defaults overwritten.
+        Attributes:
+            ax_colorbar (axes): matplotlib axes instances for the colorbar.
+        """
+        try:
+            self.ax_colorbar.remove()
+        except Exception:
+            pass
+
+        default = dict(fraction=0.05,
+                       location='right',
+                       aspect=40,
+                       shrink=.75,
+                       pad=0.01)
+        default.update(colorbar_loc_kwargs)
+
+        self.ax_colorbar, kw = mpl.colorbar.make_axes(self.ax, **default)
+
+        orientation = 'vertical'
+        if (default['location'] != 'right') and (default['location'] != 'left'):
+            orientation = 'horizontal'
+
+        # kept for update_color_data
+        self.__colorbar_args = (orientation, colorbar_title, colorbar_title_kwargs, colorbarbase_kwargs)
+
+        self.__draw_colorbar(*self.__colorbar_args)
+
+    def __draw_colorbar(self, orientation, colorbar_title, colorbar_title_kwargs, colorbarbase_kwargs):
+        """
+        Draws the colorbar for the current scheme and bins into ax_colorbar.
+        """
+        cmap = mpl.colors.ListedColormap(self.__scheme)
+
+        if orientation == 'vertical':
+            default = dict(ax=self.ax_colorbar,
+                           cmap=cmap,
+                           ticks=self.__bins,
+                           boundaries=self.__bins,
+                           orientation='vertical')
+        else:
+            default = dict(ax=self.ax_colorbar,
+                           cmap=cmap,
+                           ticks=self.__bins,
+                           boundaries=self.__bins,
+                           orientation='horizontal')
+
+        default.update(colorbarbase_kwargs)
+
+        cb = mpl.colorbar.ColorbarBase(**default)
+        if orientation == 'horizontal':
+            cb.ax.set_xticklabels(self.__bins)
+
+        default = dict(labelpad=15,
+                       fontdict=dict(fontsize=14,
+                                     fontweight='bold',
+                                     verticalalignment='center',
+                                     horizontalalignment='center'))
+        default.update(colorbar_title_kwargs)
+
+        if orientation == 'vertical':
+            cb.ax.set_ylabel(colorbar_title, **default)
+        else:
+            cb.ax.set_xlabel(colorbar_title, **default)
+
+    @profiled('pie_plot')
+    def pie_plot(self, pie_data, pie_dict, size_data=1000, scale_factor_size=1, scale_factor_ratios=1 / 2, size_ratios=None, use_collection=False):
+        """
+        Plots pies at centroids.
+
+        Parameters:
+        Positional:
+            pie_data (series): determines the pie slices (traditional). multiindex with area names followed by pie features and a column of data. The data within an area should add up to the whole (as all pie charts do).
+            pie_dict (dict): dictionary with pie slices as keys and colors as values.
+        Optional:
+            size_data (series or numeric): size of each pie chart at the centroid. single index with area names. if an int, then all pies are plotted to same size. can compare feature for each entire area.
+            scale_factor_size (numeric): smaller numbers shrink differences in size between largest and smallest pies.
+            size_ratios (series): can be used to compare a feature across pie slices. determines size of the radius / length of each slice. multiindex with area names followed by pie features and a column of data.
+            use_collection (bool): draw the wedges of all pies in a single PathCollection (mpl_pie_collection) instead of one
+                scatter call per slice. mpl_paths then holds index ranges into the collection.
+
+        Notes:
+            Make sure first level of all series indexes match shp area names.
+
+        Attributes:
+            pie_dict (dict): returns the dictionary for colors.
+        """
+        if isinstance(pie_data, pd.DataFrame):
+            pie_data = pie_data.iloc[:, 0]
+
+        # align everything once into areas x categories matrices, rows in the order of corr_centroids
+        names = list(self.corr_centroids)
+        ratios, categories = _area_matrix(pie_data, names)
+        present = ~np.isnan(ratios)
+        counts = present.sum(axis=1)
+
+        # normalize pie_data: share of every category in the area sum
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratios /= np.nansum(ratios, axis=1)[:, None]
+
+        # normalize size data
+        if isinstance(size_data, pd.Series):
+            size_data = size_data ** (scale_factor_size)
+            size_data = ((size_data / size_data.sum()) * len(size_data) * 1500)
+            area_sizes = size_data.reindex(names).values.astype(np.float64)
+        else:
+            area_sizes = np.full(len(names), size_data, dtype=np.float64)
+
+        # size is the constant, size_ratios is the weight of each slice, normalized
+        sizes = np.repeat(area_sizes[:, None], len(categories), axis=1)
+        if isinstance(size_ratios, pd.Series):
+            size_ratios = size_ratios ** (scale_factor_ratios)
+            weights = _area_matrix(size_ratios, names, categories)[0]
+            weights = (weights / size_ratios.groupby(level=0).sum().reindex(names).values[:, None]) * 2 + 0.5
+
+            weighted = ~np.isnan(weights) & (counts > 1)[:, None]
+            sizes[weighted] *= weights[weighted]
+
+        # slices of each area sorted by ratio, missing categories last
+        order = np.argsort(np.where(present, ratios, np.inf), axis=1, kind='stable')
+        ratios = np.take_along_axis(ratios, order, axis=1)
+        sizes = np.take_along_axis(sizes, order, axis=1)
+        categories = np.asarray(categories, dtype=object)
+
+        self.pie_dict = pie_dict
+
+        self.__remove_pies()
+        self.__pies = {}
+        self.__pie_anchors = {}
+        self.__shown_pies = None
+        self.__pie_use_collection = use_collection
+
+        # areas without size data are skipped (plotting them would misrepresent the data)
+        for row in np.flatnonzero((counts > 0) & ~np.isnan(area_sizes)).tolist():
+            name_glob = names[row]
+            x, y = self.corr_centroids[name_glob]
+            n = counts[row]
+
+            if name_glob == 'District of Columbia':
+                x *= 1.105  # translate right
+                self.ax.annotate(name_glob,
+                                 xy=(x, y),
+                                 xycoords='data',
+                                 xytext=(x, y * 0.85),
+                                 textcoords='data',
+                                 color='black',
+                                 ha='center',
+                                 arrowprops=dict(arrowstyle="fancy",
+                                                 color='red'))
+
+            self.__pies.update({name_glob: (x, y, categories[order[row, :n]], ratios[row, :n], sizes[row, :n])})
+
+        self.__draw_pies()
+
+        if 'Alaska' in self.geometry.codes:
+            self.set_pie_loc('Alaska', 28, -114)
+        if 'Hawaii' in self.geometry.codes:
+            self.set_pie_loc('Hawaii', 25, -107)
+
+    @profiled('layout_pies')
+    def layout_pies(self, padding=2, max_offset=None, leaders=True, leader_min=None, annotate_kwargs=dict()):
+        """
+        Moves pies apart so that none overlap, each as little as it can, with an arrow from where it was to every pie moved
+        (like set_pie_offset). Pies clear of the others stay put, crowded ones are placed largest first at the nearest free
+        spot, see layout.place_circles. Only the pies drawn and shown are laid out. Pie sizes are in points, so the layout
+        holds for the current figure size and axis limits: call it again after zoom_to_area or resizing. Every call starts
+        over from where pie_plot, set_pie_loc or set_pie_offset put the pies. Fixes corr_centroids attribute in place.
+
+        Parameters:
+        Optional:
+            padding (numeric): space between pies in points.
+            max_offset (numeric): pies which would have to move further than this many points stay where they are.
+                defaults to no limit: pies with no room near their area go to the nearest free spot anywhere around the
+                pies, and stay where they are only when there is none left.
+            leaders (bool): draw arrows to the moved pies.
+            leader_min (numeric): only pies moved further than this many points get an arrow. defaults to the pie radius.
+            annotate_kwargs (dict): paramaters to pass into matplotlib.pyplot.annotate for the arrows.
+
+        Returns:
+            list of the area names of the pies moved.
+        """
+        names = [name for name in self.__pies
+                 if name in self.mpl_paths and (self.__shown_pies is None or name in self.__shown_pies)]
+        if not names:
+            return []
+
+        anchors = np.array([self.__pie_anchors.get(name, self.__pies[name][:2]) for name in names], dtype=np.float64)
+        radii = self.__pie_radii(names)
+
+        # lay out in points, the unit of pie sizes
+        self.ax.apply_aspect()
+        to_points = self.ax.transData + mpl.transforms.Affine2D().scale(72. / self.fig.dpi)
+        points, moved = layout.place_circles(to_points.transform(anchors), radii, padding, max_offset)
+
+        origins = anchors.copy()
+        origins[moved] = to_points.inverted().transform(points[moved])
+        self.__move_pies(names, [tuple(origin) for origin in origins.tolist()])
+
+        offsets = np.hypot(*(points - to_points.transform(anchors)).T)
+        for row, name in enumerate(names):
+            if name in self.__pie_anchors:  # moved by the last layout, its arrow goes
+                del self.__pie_anchors[name]
+                self.__remove_annotation(name)
+            elif not moved[row]:
+                continue
+
+            self.corr_centroids[name] = tuple(origins[row])
+            if moved[row]:
+                self.__pie_anchors[name] = tuple(anchors[row])
+                if leaders and offsets[row] > (radii[row] if leader_min is None else leader_min):
+                    self.__annotate_offset(name, anchors[row], origins[row], annotate_kwargs)
+
+        if self.stats.enabled:
+            self.stats.count(pies=len(names), moved=int(moved.sum()))
+
+        return [name for name, pie_moved in zip(names, moved.tolist()) if pie_moved]
+
+    @profiled('insert_pie_legend')
+    def insert_pie_legend(self, legend_loc='upper left', pie_legend_kwargs=dict()):
+        """
+        Inserts legend for pie plots.
+
+        Parameters:
+        Optional:
+            legend_loc (string): 'upper left', 'upper right', 'lower left', 'lower right.' can be overwritten by pie_legend_kwards if bbox_to_anchor is passed.
+            pie_legend_kwargs (dict): kwargs to pass into legend axes creation. defaults overwritten.
+        """
+
+        try:
+            patches = []
+        except AttributeError:
+            print('call method "pie_plot" first')
+
+        for label, color in self.pie_dict.items():
+            patches.append(Patch(label=label,
+                                 facecolor=color,
+                                 edgecolor='black'))
+
+        # default: upper left
+        bbox_anchor = (0.03, 0.97)
+
+        # overwrite default
+        if legend_loc == 'upper right':
+            bbox_anchor = (bbox_anchor[1], bbox_anchor[1])
+        elif legend_loc == 'lower right':
+            bbox_anchor = (bbox_anchor[1], bbox_anchor[0])
+        elif legend_loc == 'lower left':
+            bbox_anchor = (bbox_anchor[0], bbox_anchor[0])
+
+        legend_default = dict(handles=patches,
+                              title=None,
+                              loc=legend_loc,
+                              bbox_to_anchor=bbox_anchor,
+                              edgecolor='black')
+        legend_default.update(pie_legend_kwargs)
+
+        self.ax.legend(**legend_default)
+
+    @profiled('translate_shapes')
+    def translate_shapes(self, area_name, lat, lon, scale=1, rotation=0):
+        """
+        Manually translate/scale an area. Fixes corr_geometry attribute inplace.
+
+        Parameters:
+            area_name (string): name of area to translate/scale.
+            lat (numeric): new lat.
+            lon (numeric): new lon.
+            scale (numeric): scale factor. only affects area shape.
+            rotation (numeric): counterclockwise rotation in degrees around the area centroid. only affects area shape.
+        """
+        self.translate_areas({area_name: (lat, lon, scale, rotation)})
+
+    @profiled('translate_areas')
+    def translate_areas(self, translations):
+        """
+        Translate/scale/rotate several areas in one pass, for example to lay out insets. Like translate_shapes, every area is
+        moved from its original position, so calling it again replaces earlier translations. Fixes corr_geometry attribute
+        inplace.
+
+        Parameters:
+            translations (dict): area name as key, (lat, lon), (lat, lon, scale) or (lat, lon, scale, rotation) as value. the
+                centroid of the area is moved to lat, lon and the shape scaled and rotated (counterclockwise, in degrees)
+                around it.
+        """
+        if not translations:
+            return
+
+        names = list(translations)
+        lats, lons, scales, rotations = np.array([(list(translations[name]) + [1, 0][len(translations[name]) - 2:])[:4]
+                                                  for name in names], dtype=np.float64).T
+
+        new_origins = np.column_stack(self.project(lons, lats))
+        origins = np.array([self.centroids[name] for name in names])
+
+        # vertices of every area in one index array, area after area
+        slices = [self.geometry.vertex_slice(name) for name in names]
+        offsets = np.append(0, np.cumsum([sl.stop - sl.start for sl in slices]))
+        vertices = np.concatenate([np.arange(sl.start, sl.stop) for sl in slices])
+
+        self.corr_geometry.vertices[vertices] = sc.transform_groups(self.geometry.vertices[vertices], offsets,
+                                                                     origins, new_origins, scales, rotations)  # correct array
+
+        for name in names:
+            self.__ring_bounds[self.geometry.area_slice(name)] = self.corr_geometry.ring_bounds(name)
+
+            for i, ring in enumerate(self.__polygon_rings.get(name, [])):
+                self.__set_polygon_xy(name, i, self.__lod_shape(ring, self.corr_geometry.ring(ring)))
+
+    @profiled('set_pie_loc')
+    def set_pie_loc(self, area_name, lat, lon):
+        """
+        Translates a pie chart. Fixes corr_centroids attrbite in place.
+
+        Parameters:
+            area_name (string): name of area to translate/scale.
+            lat (numeric): new lat.
+            lon (numeric): new lon.
+        """
+        new_origin = self.project(lon, lat)
+
+        self.corr_centroids[area_name] = new_origin
+
+        # mpl methods
+        self.__set_pie_offsets(area_name, new_origin)
+        if self.__pie_anchors.pop(area_name, None) is not None:  # drop the arrow of layout_pies
+            self.__remove_annotation(area_name)
+
+    @profiled('set_pie_offset')
+    def set_pie_offset(self, area_name, lat_offset=0, lon_offset=0, arrow=True, annotate_kwargs=dict()):
+        """
+        Offsets pies by lat and lon. If called with lat_offset as 0 and lon_offset as 0, resets pie position.
+
+        Paraters:
+        Positional:
+            area_name (string): name of area to translate/scale.
+        Optional:
+            lat_offset (numeric): positive to send right, negative to send left.
+            lon_offset (numeric): positive to send right, negative to send left.
+            annotations_kwargs (dict): paramaters to pass into matplotlib.pyplot.annotate
+        """
+        old_origin = self.centroids[area_name]
+        lon, lat = self.project(*old_origin, inverse=True)
+
+        lon_new = lon + lon_offset
+        lat_new = lat + lat_offset
+
+        new_origin = self.project(lon_new, lat_new)
+
+        self.__set_pie_offsets(area_name, new_origin)
+        self.__pie_anchors.pop(area_name, None)
+
+        self.__annotate_offset(area_name, old_origin, new_origin, annotate_kwargs)
+
+        self.corr_centroids[area_name] = new_origin
+
+    @profiled('translate_pies_shapes')
+    def translate_pies_shapes(self, area_name, lat, lon, scale=1, rotation=0):
+        """
+        Manually translate/scale an area and corresponding pie chart. Fixes corr_geometry and corr_centroids attributes inplace.
+        """
+        self.translate_shapes(area_name, lat, lon, scale, rotation)
+        self.set_pie_loc(area_name, lat, lon)
+
+    @profiled('clear_elements')
+    def clear_elements(self):
+        """
+        Delete all choropleth and pie elements on the plot.
+        """
+
+        for child in self.ax.get_children():  # remove pie legend
+            if 'legend' and 'anno' in str(child).lower():
+                child.remove()
+        self.annotations = {}
+
+        for axes in self.fig.axes[1:]:  # remove colorbar
+            axes.remove()
+        self.ax_colorbar = None
+
+        # remove pie charts
+        self.__remove_pies()
+        self.__pies = {}
+        self.__pie_anchors = {}
+        self.__shown_pies = None
+
+        # remove choropleth areas
+        self.__remove_polygons()
+        self.__series_bins = None
+        self.__choro_areas = None
+
+        self.__culled = False
+
+    @profiled('savefig')
+    def savefig(self, *args, **kwargs):
+        """
+        Saves the figure, recording the rasterization in stats. Same arguments as matplotlib.figure.Figure.savefig.
+        """
+        self.fig.savefig(*args, **kwargs)
+
+    @profiled('render')
+    def render(self, format='png', dpi=None, buffer=None, **savefig_kwargs):
+        """
+        Render the map to bytes, or into buffer. When ChoroPie was created with lod, the level of detail is matched to dpi
+        first.
+
+        Parameters:
+        Optional:
+            format (string): image format, such as "png", "svg" or "pdf".
+            dpi (numeric): output resolution. defaults to the figure dpi.
+            buffer (file like): written to instead of returning bytes, for example an open file or a reused io.BytesIO.
+            savefig_kwargs: passed into matplotlib.figure.Figure.savefig.
+
+        Returns:
+            bytes of the image, None when buffer is passed.
+        """
+        dpi = self.fig.dpi if dpi is None else dpi
+
+        self.select_lod(dpi)
+
+        out = io.BytesIO() if buffer is None else buffer
+        self.fig.savefig(out, format=format, dpi=dpi, **savefig_kwargs)
+
+        if buffer is None:
+            return out.getvalue()
+
+    def close(self):
+        """
+        Release the figure from pyplot. Not needed for headless instances.
+        """
+        import matplotlib.pyplot as plt
+
+        plt.close(self.fig)
+
+    def __export_data(self, lonlat):
+        """
+        Vertices, area properties, pie points and metadata of the current map for the exporters.
+        """
+        vertices = self.corr_geometry.vertices
+        if lonlat:
+            vertices = np.column_stack(self.project(vertices[:, 0], vertices[:, 1], inverse=True))
+
+        properties = {name: dict(name=name) for name in self.geometry.names}
+        metadata = {}
+        if self.__series_bins is not None:
+            colors = [mpl.colors.to_hex(color) for color in self.__scheme]
+            for name, series_bin in self.__series_bins.items():
+                if name in properties:
+                    properties[name].update(bin=int(series_bin), color=colors[series_bin])
+
+            scheme = self.__classification[0]
+            metadata.update(bins=self.__bins.tolist(), colors=colors, scheme=scheme if isinstance(scheme, str) else None)
+
+        points = []
+        for name, (x, y, colors, ratios, sizes) in self.__pies.items():
+            if lonlat:
+                x, y = self.project(x, y, inverse=True)
+
+            points.append((name, float(x), float(y), dict(name=name,
+                                                           categories=np.asarray(colors).tolist(),
+                                                           colors=[mpl.colors.to_hex(self.pie_dict[color]) for color in colors],
+                                                           fractions=np.asarray(ratios, dtype=np.float64).tolist(),
+                                                           sizes=np.asarray(sizes, dtype=np.float64).tolist())))
+
+        return vertices, properties, points, metadata
+
+    @profiled('export_topojson')
+    def export_topojson(self, fp, quantization=1e5, lonlat=False):
+        """
+        Write the map as TopoJSON: corrected shapes (with translations) as shared, quantized arcs, the bin and color of each
+        area from choro_plot, and the pies from pie_plot as points with their slice fractions. see export.write_topojson.
+
+        Parameters:
+        Positional:
+            fp (string or file): path or text file to write to.
+        Optional:
+            quantization (numeric): grid size of the quantized coordinates.
+            lonlat (bool): write lon, lat coordinates instead of map coordinates. translated areas keep their map position,
+                so insets land at the lon, lat they were moved to.
+        """
+        vertices, properties, points, metadata = self.__export_data(lonlat)
+
+        export.write_topojson(fp, self.corr_geometry, properties, points, quantization, metadata, vertices)
+
+    @profiled('export_geojson')
+    def export_geojson(self, fp, precision=None, lonlat=False):
+        """
+        Write the map as GeoJSON, with the same content as export_topojson.
+
+        Parameters:
+        Positional:
+            fp (string or file): path or text file to write to.
+        Optional:
+            precision (int): decimals kept in coordinates.
+            lonlat (bool): write lon, lat coordinates instead of map coordinates.
+        """
+        vertices, properties, points, metadata = self.__export_data(lonlat)
+
+        export.write_geojson(fp, self.corr_geometry, properties, points, precision, vertices)
+
+    @profiled('zoom_to_area')
+    def zoom_to_area(self, area_names, cull=False):
+        """
+        Reduces the main axes size to the size of a specific area. Return the original x_lims and y_lims as a tuple. Call back method ChoroPie.ax.set_xlim and set_ylim to return to original scale.
+
+        Parameters:
+            area_names (list of strings): names of areas to translate/scale.
+            cull (bool): instead of hiding every area but area_names, rebuild the choropleth and pie artists with only the
+                shapes whose bounding box intersects the view and the pies centered in it. drawing then costs about as much
+                as a map of the visible region. neighbouring areas reaching into the view stay drawn. zoom_home redraws
+                everything.
+        """
+        bounds = np.concatenate([self.__ring_bounds[self.geometry.area_slice(area_name)] for area_name in area_names])
+
+        x0, y0 = bounds[:, :2].min(axis=0)
+        x1, y1 = bounds[:, 2:].max(axis=0)
+
+        self.zoom_to_bounds(x0, y0, x1, y1, cull)
+
+        if not cull:
+            self.__set_polygons_visible(area_names)
+
+            self.__set_pies_visible(area_names)
+
+    @profiled('zoom_to_bounds')
+    def zoom_to_bounds(self, x0, y0, x1, y1, cull=False, margin=0):
+        """
+        Sets the main axes limits to a box in map coordinates.
+
+        Parameters:
+            x0, y0, x1, y1 (numeric): lower left and upper right corners in map coordinates.
+            cull (bool): rebuild the choropleth and pie artists with only the shapes whose bounding box intersects the box
+                and the pies centered in it, see zoom_to_area.
+            margin (numeric): grow the box by margin map units when culling, to keep pies centered just outside of it
+                (whose wedges reach in) drawn.
+        """
+        self.ax.set_xlim(x0, x1)
+        self.ax.set_ylim(y0, y1)
+
+        if cull:
+            x0, y0, x1, y1 = x0 - margin, y0 - margin, x1 + margin, y1 + margin
+
+            in_view = ((self.__ring_bounds[:, 0] <= x1) & (self.__ring_bounds[:, 2] >= x0) &
+                       (self.__ring_bounds[:, 1] <= y1) & (self.__ring_bounds[:, 3] >= y0))
+
+            self.__redraw(np.flatnonzero(in_view).tolist(),
+                          [name for name, (x, y, colors, ratios, sizes) in self.__pies.items() if (x0 <= x <= x1) and (y0 <= y <= y1)])
+            self.__culled = True
+
+        elif self.__culled:
+            self.__redraw()
+            self.__culled = False
+
+        self.select_lod()
+
+    def bounds_intersect(self, x0, y0, x1, y1):
+        """
+        Whether any shape's bounding box intersects a box in map coordinates.
+        """
+        return bool(np.any((self.__ring_bounds[:, 0] <= x1) & (self.__ring_bounds[:, 2] >= x0) &
+                           (self.__ring_bounds[:, 1] <= y1) & (self.__ring_bounds[:, 3] >= y0)))
+
+    @profiled('zoom_home')
+    def zoom_home(self):
+        """
+        If zoom_to_area method was called, this zooms the main axes to the initial position.
+        """
+
+        self.ax.set_xlim(*self.x_lims)
+        self.ax.set_ylim(*self.y_lims)
+
+        if self.__culled:
+            self.__redraw()
+            self.__culled = False
+
+        self.__set_polygons_visible()
+
+        self.__set_pies_visible()
+
+        self.select_lod()
+
+    def __redraw(self, rings=None, pie_names=None):
+        """
+        Rebuilds the choropleth and pie artists for the rings and pies given, everything by default.
+        """
+        self.__visible_areas = None
+
+        if self.__series_bins is not None:
+            self.__remove_polygons()
+            self.__draw_polygons(rings)
+
+        if self.__pies:
+            self.__remove_pies()
+            self.__draw_pies(pie_names)
+
+    @profiled('select_lod')
+    def select_lod(self, dpi=None, pixel_tolerance=0.5):
+        """
+        Picks the coarsest simplification level whose error stays under pixel_tolerance pixels for the current view, figure
+        size and dpi, and redraws the polygons and shape boundaries with it. Called on construction, zoom_to_area and
+        zoom_home when ChoroPie was created with lod. Call it again with the dpi passed to savefig when saving at a
+        resolution other than the figure dpi.
+
+        Parameters:
+        Optional:
+            dpi (numeric): output resolution. defaults to the figure dpi.
+            pixel_tolerance (numeric): largest simplification error allowed, in output pixels.
+
+        Returns:
+            tolerance in map units of the chosen level, None when full resolution is used.
+        """
+        if self.lod_levels is None:
+            return None
+
+        dpi = self.fig.dpi if dpi is None else dpi
+
+        # map units covered by one output pixel
+        bbox = self.ax.get_position()
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        pixel = max(abs(x1 - x0) / (bbox.width * self.fig.get_figwidth() * dpi),
+                    abs(y1 - y0) / (bbox.height * self.fig.get_figheight() * dpi))
+
+        tolerance = None
+        for level in self.lod_levels:
+            if level <= pixel * pixel_tolerance:
+                tolerance = level
+                break
+
+        if tolerance != self.lod_tolerance:
+            self.lod_tolerance = tolerance
+            self.__apply_lod()
+
+        return tolerance
+
+    @profiled('simplify')
+    def __simplification_errors(self):
+        """
+        The Douglas-Peucker error of every vertex of geometry, with the junctions of shared borders kept, which give the
+        vertices of every level of detail at once. Stored in the geometry cache.
+        """
+        vertices, offsets = self.geometry.vertices, self.geometry.ring_offsets
+
+        return sc.simplification_errors(vertices, offsets, fixed=sc.ring_junctions(vertices, offsets))
+
+    def __lod_shape(self, ring, shape):
+        """
+        The vertices of shape (the ring-th shape of the shp file, or its translation) kept at the current level of detail.
+        """
+        if self.lod_tolerance is None:
+            return shape
+
+        if self.lod_tolerance not in self.__lod_masks:
+            self.__lod_masks[self.lod_tolerance] = sc.simplify_rings(self.geometry.vertices, self.geometry.ring_offsets,
+                                                                     self.lod_tolerance, errors=self.__lod_errors)
+
+        mask = self.__lod_masks[self.lod_tolerance][self.geometry.ring_offsets[ring]:self.geometry.ring_offsets[ring + 1]]
+        shape = np.asarray(shape)[mask]
+
+        # a closed ring whose first vertex was simplified away lost its closing vertex with it, close it again
+        if len(shape) and not mask[0]:
+            shape = np.vstack([shape, shape[:1]])
+
+        return shape
+
+    @profiled('apply_lod')
+    def __apply_lod(self):
+        """
+        Redraws polygons and shape boundaries at the current level of detail.
+        """
+        for name, rings in self.__polygon_rings.items():
+            for i, ring in enumerate(rings):
+                self.__set_polygon_xy(name, i, self.__lod_shape(ring, self.corr_geometry.ring(ring)))
+
+        if self.mpl_bounds is not None:
+            self.mpl_bounds.set_segments([self.__lod_shape(ring, shape) for ring, shape in enumerate(self.area)])
+
+        if self.stats.enabled:
+            self.stats.count(vertices=int(self.__vertex_counts().sum()))
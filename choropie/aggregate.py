@@ -0,0 +1,189 @@
+"""
+Streaming aggregation of point data (events, locations) into per area totals, in the shapes choro_plot and pie_plot take.
+Points are read in chunks and assigned to areas with SpatialIndex, so memory stays at one total per area and category.
+"""
+import numpy as np
+
+
+class PointAggregator(object):
+    """
+    Running per area (and per category) counts or weighted sums of points, fed in chunks.
+
+    Attributes:
+        spatial_index (SpatialIndex): index of the areas, in the coordinates of the points.
+        areas (list): area names, in spatial index order.
+        categories (list): categories seen so far, in order of appearance. empty when points have no categories.
+        totals (np.array): (n_areas, n_categories) running totals, a single column when points have no categories.
+        points (int): points added so far.
+        unmatched (int): points added which fell outside every area (or had missing coordinates).
+    """
+
+    def __init__(self, spatial_index):
+        """
+        Parameters:
+            spatial_index (SpatialIndex): index returned by SpatialIndex.from_shapefile, or any SpatialIndex in the
+                coordinates of the points.
+        """
+        self.spatial_index = spatial_index
+
+        codes = {}
+        for name in spatial_index.names:
+            codes.setdefault(name, len(codes))
+        self.areas = list(codes)
+
+        # area code of every ring, -1 (the last entry) for points in no ring
+        self.__ring_areas = np.array([codes[name] for name in spatial_index.names] + [-1], dtype=np.int64)
+
+        self.categories = []
+        self.__category_codes = {}
+        self.__weighted = False
+
+        self.totals = np.zeros((len(self.areas), 1))
+        self.points = 0
+        self.unmatched = 0
+
+    def __category_columns(self, categories):
+        """
+        Column of totals for each category, adding columns for categories not seen before. -1 for missing categories.
+        """
+        import pandas as pd
+
+        local, uniques = pd.factorize(np.asarray(categories, dtype=object))
+
+        columns = []
+        for category in uniques:
+            if category not in self.__category_codes:
+                self.__category_codes[category] = len(self.categories)
+                self.categories.append(category)
+            columns.append(self.__category_codes[category])
+
+        if len(self.categories) > self.totals.shape[1]:
+            grown = np.zeros((len(self.areas), max(len(self.categories), 2 * self.totals.shape[1])))
+            grown[:, :self.totals.shape[1]] = self.totals
+            self.totals = grown
+
+        return np.append(np.asarray(columns, dtype=np.int64), -1)[local]
+
+    def add(self, lons, lats, categories=None, weights=None):
+        """
+        Add a chunk of points to the totals.
+
+        Parameters:
+        Positional:
+            lons (array like): x coordinate of every point (longitude for indexes built from_shapefile).
+            lats (array like): y coordinate of every point.
+        Optional:
+            categories (array like): category of every point, such as the pie feature it counts towards. points without a
+                category (None or NaN) are skipped. pass categories with every chunk or with none.
+            weights (array like): value of every point, summed instead of counting points.
+        """
+        points = np.column_stack([np.asarray(lons, dtype=np.float64).ravel(), np.asarray(lats, dtype=np.float64).ravel()])
+        areas = self.__ring_areas[self.spatial_index.contains_points(points)]
+
+        self.points += len(points)
+        self.unmatched += int((areas < 0).sum())
+
+        if categories is None:
+            columns = np.zeros(len(points), dtype=np.int64)
+        else:
+            columns = self.__category_columns(categories)
+            areas[columns < 0] = -1
+
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64).ravel()
+            self.__weighted = True
+
+        keep = areas >= 0
+        n_columns = self.totals.shape[1]
+        self.totals += np.bincount(areas[keep] * n_columns + columns[keep],
+                                   weights=None if weights is None else weights[keep],
+                                   minlength=self.totals.size).reshape(self.totals.shape)
+
+    def feed(self, chunks, lon='lon', lat='lat', category=None, weight=None):
+        """
+        Add every chunk of an iterable.
+
+        Parameters:
+        Positional:
+            chunks (iterable): DataFrames or dicts of arrays holding the columns below, or tuples of arrays as
+                (lons, lats), (lons, lats, categories) or (lons, lats, categories, weights).
+        Optional:
+            lon, lat (string): names of the coordinate columns.
+            category (string): name of the category column, if any.
+            weight (string): name of the weight column, if any.
+
+        Returns:
+            self, to chain with series or category_series.
+        """
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                self.add(*chunk)
+            else:
+                self.add(chunk[lon], chunk[lat],
+                         None if category is None else chunk[category],
+                         None if weight is None else chunk[weight])
+
+        return self
+
+    def read_csv(self, path, lon='lon', lat='lat', category=None, weight=None, chunksize=100000, read_csv_kwargs=dict()):
+        """
+        Add the points of a csv file, read chunksize rows at a time.
+
+        Parameters:
+        Positional:
+            path (string or file): csv file.
+        Optional:
+            lon, lat, category, weight (string): column names, see feed.
+            chunksize (int): rows read at a time.
+            read_csv_kwargs (dict): kwargs to pass into pandas.read_csv, such as sep or compression.
+
+        Returns:
+            self, to chain with series or category_series.
+        """
+        import pandas as pd
+
+        columns = [column for column in (lon, lat, category, weight) if column is not None]
+        kwargs = dict(usecols=columns, chunksize=chunksize)
+        kwargs.update(read_csv_kwargs)
+
+        with pd.read_csv(path, **kwargs) as reader:
+            return self.feed(reader, lon, lat, category, weight)
+
+    def series(self, drop_empty=False):
+        """
+        Total of every area (over all categories), as color_data for choro_plot or size_data for pie_plot.
+
+        Parameters:
+            drop_empty (bool): leave out areas without points.
+
+        Returns:
+            pd.Series indexed by area name. integer counts unless weights were added.
+        """
+        import pandas as pd
+
+        totals = self.totals.sum(axis=1)
+        series = pd.Series(totals if self.__weighted else totals.astype(np.int64), index=pd.Index(self.areas))
+
+        if drop_empty:
+            series = series[totals != 0]
+
+        return series
+
+    def category_series(self):
+        """
+        Total of every category in every area, as pie_data (or size_ratios) for pie_plot. Areas and categories without
+        points are left out.
+
+        Returns:
+            pd.Series with a MultiIndex of area name and category. integer counts unless weights were added.
+        """
+        import pandas as pd
+
+        totals = self.totals[:, :len(self.categories)]
+        rows, columns = np.nonzero(totals)
+        values = totals[rows, columns]
+
+        index = pd.MultiIndex.from_arrays([pd.Index(self.areas, tupleize_cols=False)[rows],
+                                           pd.Index(self.categories, tupleize_cols=False)[columns]])
+
+        return pd.Series(values if self.__weighted else values.astype(np.int64), index=index)
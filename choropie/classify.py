@@ -0,0 +1,148 @@
+import numpy as np
+
+
+def equal_interval(values, k):
+    """
+    Bins of equal width between the smallest and largest value.
+
+    Parameters:
+        values (array like): data to classify.
+        k (int): number of classes.
+
+    Returns:
+        np.array of k + 1 bin edges.
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    return np.linspace(np.nanmin(values), np.nanmax(values), k + 1)
+
+
+def quantiles(values, k):
+    """
+    Bins holding (about) the same number of values each.
+
+    Parameters:
+        values (array like): data to classify.
+        k (int): number of classes.
+
+    Returns:
+        np.array of k + 1 bin edges. heavily repeated values can make edges coincide.
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    return np.nanquantile(values, np.linspace(0, 1, k + 1))
+
+
+def _jenks_starts(values, weights, k, block=256):
+    """
+    Dynamic program for the optimal Fisher-Jenks classes of sorted unique values with weights (number of occurrences).
+    Class costs (weighted sum of squared deviations) come from prefix sums, and every step of the program is evaluated for
+    a block of class ends at once.
+
+    Returns:
+        list of the index of the first value of each class.
+    """
+    n = len(values)
+
+    # centered for a stable sum of squares
+    values = values - np.average(values, weights=weights)
+
+    w = np.append(0, np.cumsum(weights))
+    s = np.append(0, np.cumsum(weights * values))
+    q = np.append(0, np.cumsum(weights * values ** 2))
+
+    def cost(i, j):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (q[j] - q[i]) - (s[j] - s[i]) ** 2 / (w[j] - w[i])
+
+    ends = np.arange(n + 1)
+
+    # best cost of splitting the first j values into one class
+    best = cost(0, ends)
+    best[0] = np.inf
+
+    back = np.zeros((k, n + 1), dtype=np.int64)
+    for m in range(1, k):
+        new = np.full(n + 1, np.inf)
+
+        for j0 in range(m + 1, n + 1, block):
+            j = ends[j0:j0 + block]
+            i = ends[:j[-1]]
+
+            # previous m classes end at i, class m holds values i:j
+            total = best[None, :len(i)] + cost(i[None, :], j[:, None])
+            total[i[None, :] >= j[:, None]] = np.inf
+
+            back[m, j] = np.argmin(total, axis=1)
+            new[j] = total[np.arange(len(j)), back[m, j]]
+
+        best = new
+
+    starts = [n]
+    for m in range(k - 1, 0, -1):
+        starts.append(int(back[m, starts[-1]]))
+    starts.append(0)
+
+    return starts[::-1][:-1]
+
+
+def fisher_jenks(values, k, sample=None, random_state=None):
+    """
+    Natural breaks: the bins minimizing the sum of squared deviations from the class means (Fisher's exact optimization of
+    Jenks natural breaks). Runs on the unique values weighted by their counts, so repeated values cost nothing.
+
+    Parameters:
+        values (array like): data to classify.
+        k (int): number of classes.
+        sample (int): for large inputs, find the breaks on a random sample of this many values (the smallest and largest
+            value are always kept). the running time grows with the square of the number of unique values.
+        random_state (int): seed for the sample.
+
+    Returns:
+        np.array of k + 1 bin edges: the smallest value of each class followed by the largest value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+
+    if sample is not None and len(values) > sample:
+        rng = np.random.default_rng(random_state)
+        picked = rng.choice(len(values), size=sample, replace=False)
+        values = np.concatenate([values[picked], [values.min(), values.max()]])
+
+    unique, counts = np.unique(values, return_counts=True)
+
+    if len(unique) <= k:
+        # one class per value, the remaining edges collapse onto the largest value
+        return np.append(unique, np.full(k + 1 - len(unique), unique[-1]))
+
+    starts = _jenks_starts(unique, counts.astype(np.float64), k)
+
+    return np.append(unique[starts], unique[-1])
+
+
+SCHEMES = dict(equal_interval=equal_interval,
+               quantiles=quantiles,
+               fisher_jenks=fisher_jenks)
+
+
+def classify(values, k, scheme='equal_interval', **kwargs):
+    """
+    Bin edges for values with a classification scheme.
+
+    Parameters:
+        values (array like): data to classify.
+        k (int): number of classes.
+        scheme (string or function): "equal_interval", "quantiles", "fisher_jenks", or a function of values, k and kwargs
+            returning k + 1 bin edges.
+        kwargs: passed into the scheme, such as sample for fisher_jenks.
+
+    Returns:
+        np.array of k + 1 bin edges.
+    """
+    if not callable(scheme):
+        try:
+            scheme = SCHEMES[scheme]
+        except KeyError:
+            raise ValueError('scheme must be one of %s or a function' % ', '.join(SCHEMES))
+
+    return np.asarray(scheme(values, k, **kwargs), dtype=np.float64)
@@ -0,0 +1,269 @@
+import contextlib
+import hashlib
+import json
+
+import numpy as np
+
+from choropie import poly_functs as sc
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+@contextlib.contextmanager
+def _open(fp):
+    """
+    Opens fp for writing text when it is a path, passes file objects through.
+    """
+    if isinstance(fp, str):
+        with open(fp, 'w', encoding='utf-8') as f:
+            yield f
+    else:
+        yield fp
+
+
+def _quantize(vertices, ring_offsets, quantization, bbox):
+    """
+    Snaps vertices to a quantization x quantization grid over bbox and drops the vertices repeating the one before them.
+
+    Returns:
+        points (np.array): (n, 2) integer grid positions.
+        offsets (np.array): (n_rings + 1,) ring offsets into points.
+        scale, translate (lists): TopoJSON transform.
+    """
+    x0, y0, x1, y1 = bbox
+    scale = [(x1 - x0) / (quantization - 1) or 1., (y1 - y0) / (quantization - 1) or 1.]
+    translate = [x0, y0]
+
+    points = np.round((np.asarray(vertices, dtype=np.float64) - translate) / scale).astype(np.int64)
+
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = (points[1:] != points[:-1]).any(axis=1)
+    keep[ring_offsets[:-1]] = True
+
+    offsets = np.zeros(len(ring_offsets), dtype=np.int64)
+    np.cumsum(np.add.reduceat(keep.astype(np.int64), ring_offsets[:-1]), out=offsets[1:])
+
+    return points[keep], offsets, scale, translate
+
+
+def _ring_arcs(ring, junctions):
+    """
+    Cuts a closed ring (first vertex repeated at the end) at its junctions. A ring without junctions is one closed arc
+    starting at its smallest vertex, so that the same ring always gives the same arc.
+
+    Returns:
+        list of (n, 2) arcs, and whether the single arc is a closed ring without junctions.
+    """
+    ring = ring[:-1] if len(ring) > 1 and (ring[0] == ring[-1]).all() else ring
+    cuts = np.flatnonzero(junctions[:len(ring)])
+
+    if len(cuts) == 0:
+        start = np.lexsort(ring.T[::-1])[0]
+        ring = np.roll(ring, -start, axis=0)
+        return [np.vstack([ring, ring[:1]])], True
+
+    ring = np.roll(ring, -cuts[0], axis=0)
+    ring = np.vstack([ring, ring[:1]])
+    ends = np.append(cuts - cuts[0], len(ring) - 1)
+
+    return [ring[a:b + 1] for a, b in zip(ends[:-1], ends[1:])], False
+
+
+def _inside(points, ring):
+    """
+    True for each point inside a closed ring, by the even-odd rule.
+    """
+    x0, y0 = ring[:-1, 0], ring[:-1, 1]
+    x1, y1 = ring[1:, 0], ring[1:, 1]
+    px, py = points[:, 0, None], points[:, 1, None]
+
+    crossing = (y0 > py) != (y1 > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        at = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+
+    return (crossing & (px < at)).sum(axis=1) % 2 == 1
+
+
+def _polygons(vertices, ring_offsets, rings, areas):
+    """
+    Groups the rings of an area into polygons with RFC 7946 winding. Rings wound like the largest one are outer rings
+    (clockwise in shp files) and the others holes, each given to the smallest outer ring holding most of its vertices. A
+    hole inside no outer ring becomes a polygon of its own.
+
+    Parameters:
+        vertices (np.array): (n_vertices, 2) coordinates.
+        ring_offsets (np.array): (n_rings + 1,) ring offsets into vertices.
+        rings (list): ring numbers of the area.
+        areas (np.array): signed area of every ring, as areas_for_rings (above 0 for clockwise rings).
+
+    Returns:
+        list of polygons, each a list of (ring number, backwards) for the outer ring and its holes. backwards is True for
+        the rings to write in reverse, so that outer rings run counterclockwise and holes clockwise.
+    """
+    if len(rings) < 2:
+        return [[(ring, bool(areas[ring] > 0))] for ring in rings]
+
+    outer_sign = np.sign(max(areas[rings], key=abs)) or 1.
+    outers = [ring for ring in rings if np.sign(areas[ring]) != -outer_sign]
+    polygons = {ring: [(ring, bool(areas[ring] > 0))] for ring in outers}
+
+    def shape(ring):
+        return np.asarray(vertices[ring_offsets[ring]:ring_offsets[ring + 1]], dtype=np.float64)
+
+    for ring in rings:
+        if np.sign(areas[ring]) != -outer_sign:
+            continue
+
+        # a few vertices of the hole, most of them are inside its outer ring even where the two touch
+        hole = shape(ring)
+        sample = hole[np.linspace(0, len(hole) - 1, min(len(hole), 9)).astype(np.int64)]
+        around = [outer for outer in outers if _inside(sample, shape(outer)).mean() > .5]
+        if around:
+            polygons[min(around, key=lambda outer: abs(areas[outer]))].append((ring, bool(areas[ring] < 0)))
+        else:
+            polygons[ring] = [(ring, bool(areas[ring] > 0))]
+
+    return [polygons[ring] for ring in sorted(polygons)]
+
+
+def _key(arc):
+    return hashlib.blake2b(np.ascontiguousarray(arc).tobytes(), digest_size=16).digest()
+
+
+def write_topojson(fp, geometry, properties=None, points=None, quantization=1e5, metadata=None, vertices=None):
+    """
+    Writes the rings of a GeometryStore as a quantized TopoJSON topology: boundaries shared between rings are stored once as
+    arcs, and arc coordinates are delta encoded integers. Arcs are written as they are found, so memory stays proportional
+    to the number of arcs, not to the size of the output.
+
+    Each area is a MultiPolygon. Rings wound against the largest ring of their area are holes and go with the outer ring
+    around them, and rings are written with RFC 7946 winding (outer rings counterclockwise, holes clockwise), see
+    _polygons. Rings that collapse to fewer than three distinct positions at this quantization are left out, with the
+    holes of an outer ring left out.
+
+    Parameters:
+        fp (string or file): path or text file to write to.
+        geometry (GeometryStore): rings and area names.
+        properties (dict): area name as key, dict of json properties as value. written into object "areas".
+        points (list): (name, x, y, dict of json properties) of points to write into object "pies".
+        quantization (numeric): grid size of the quantized coordinates. 1e4 to 1e5 is plenty for screens.
+        metadata (dict): json members added to the topology as "choropie".
+        vertices (np.array): coordinates to use instead of geometry.vertices, such as corrected or unprojected ones.
+    """
+    vertices = geometry.vertices if vertices is None else vertices
+    properties = {} if properties is None else properties
+    points = [] if points is None else points
+
+    lo = vertices.min(axis=0)
+    hi = vertices.max(axis=0)
+    if points:
+        xy = np.array([(x, y) for name, x, y, props in points], dtype=np.float64)
+        lo, hi = np.minimum(lo, xy.min(axis=0)), np.maximum(hi, xy.max(axis=0))
+    bbox = [float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1])]
+
+    quantized, offsets, scale, translate = _quantize(vertices, geometry.ring_offsets, int(quantization), bbox)
+    junctions = sc.ring_junctions(quantized, offsets)
+
+    with _open(fp) as f:
+        f.write('{"type":"Topology","bbox":%s,"transform":%s,"arcs":[' % (_dumps(bbox), _dumps(dict(scale=scale, translate=translate))))
+
+        arc_ids = {}
+        ring_arcs = []
+        for ring in range(geometry.n_rings):
+            start, end = offsets[ring], offsets[ring + 1]
+            if end - start < 4:
+                ring_arcs.append(None)
+                continue
+
+            arcs, closed = _ring_arcs(quantized[start:end], junctions[start:end])
+
+            ids = []
+            for arc in arcs:
+                forward = _key(arc)
+                if forward in arc_ids:
+                    ids.append(arc_ids[forward])
+                    continue
+
+                reverse = _key(_ring_arcs(arc[::-1], np.zeros(len(arc), dtype=bool))[0][0] if closed else arc[::-1])
+                if reverse in arc_ids:
+                    ids.append(~arc_ids[reverse])
+                    continue
+
+                arc_ids[forward] = len(arc_ids)
+                ids.append(arc_ids[forward])
+
+                deltas = np.diff(arc, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+                f.write((',' if arc_ids[forward] else '') + _dumps(deltas.tolist()))
+
+            ring_arcs.append(ids)
+
+        areas = sc.areas_for_rings(vertices, geometry.ring_offsets)
+
+        def arcs(ring, backwards):
+            ids = ring_arcs[ring]
+            return [~arc for arc in ids[::-1]] if backwards else ids
+
+        f.write('],"objects":{"areas":{"type":"GeometryCollection","geometries":[')
+        for code, name in enumerate(geometry.names):
+            rings = range(geometry.area_offsets[code], geometry.area_offsets[code + 1])
+            polygons = [[arcs(ring, backwards) for ring, backwards in polygon if ring_arcs[ring] is not None]
+                        for polygon in _polygons(vertices, geometry.ring_offsets, list(rings), areas)
+                        if ring_arcs[polygon[0][0]] is not None]
+
+            obj = dict(type='MultiPolygon', arcs=polygons) if polygons else dict(type=None)
+            obj.update(id=name, properties=properties.get(name, {}))
+            f.write((',' if code else '') + _dumps(obj))
+
+        f.write(']},"pies":{"type":"GeometryCollection","geometries":[')
+        for i, (name, x, y, props) in enumerate(points):
+            position = [int(round((x - translate[0]) / scale[0])), int(round((y - translate[1]) / scale[1]))]
+            f.write((',' if i else '') + _dumps(dict(type='Point', coordinates=position, id=name, properties=props)))
+
+        f.write(']}},"choropie":%s}' % _dumps(metadata or {}))
+
+
+def write_geojson(fp, geometry, properties=None, points=None, precision=None, vertices=None):
+    """
+    Writes the rings of a GeometryStore as a GeoJSON FeatureCollection, one MultiPolygon feature per area followed by one
+    Point feature per point. Features are written one at a time. Holes go with the outer ring around them, and rings are
+    written with RFC 7946 winding (outer rings counterclockwise, holes clockwise), see _polygons.
+
+    Parameters:
+        fp (string or file): path or text file to write to.
+        geometry (GeometryStore): rings and area names.
+        properties (dict): area name as key, dict of json properties as value.
+        points (list): (name, x, y, dict of json properties) of points, such as pies.
+        precision (int): decimals kept in coordinates. all by default.
+        vertices (np.array): coordinates to use instead of geometry.vertices, such as corrected or unprojected ones.
+    """
+    vertices = geometry.vertices if vertices is None else vertices
+    properties = {} if properties is None else properties
+    points = [] if points is None else points
+
+    def coords(xy):
+        xy = np.asarray(xy, dtype=np.float64)
+        return (xy if precision is None else np.round(xy, precision)).tolist()
+
+    areas = sc.areas_for_rings(vertices, geometry.ring_offsets)
+
+    with _open(fp) as f:
+        f.write('{"type":"FeatureCollection","features":[')
+
+        for code, name in enumerate(geometry.names):
+            rings = range(geometry.area_offsets[code], geometry.area_offsets[code + 1])
+            polygons = [[coords(vertices[geometry.ring_offsets[ring]:geometry.ring_offsets[ring + 1]][::-1 if backwards else 1])
+                         for ring, backwards in polygon]
+                        for polygon in _polygons(vertices, geometry.ring_offsets, list(rings), areas)]
+
+            feature = dict(type='Feature', id=name, properties=properties.get(name, {}),
+                           geometry=dict(type='MultiPolygon', coordinates=polygons))
+            f.write((',' if code else '') + _dumps(feature))
+
+        for i, (name, x, y, props) in enumerate(points):
+            feature = dict(type='Feature', id=name, properties=props,
+                           geometry=dict(type='Point', coordinates=coords([x, y])))
+            f.write((',' if geometry.n_areas or i else '') + _dumps(feature))
+
+        f.write(']}')
@@ -0,0 +1,202 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from choropie import poly_functs as sc
+
+
+class GeometryStore(object):
+    """
+    Compressed sparse row store for the rings of a shp file. Every vertex lives in one (n_vertices, 2) array, rings are
+    offsets into it and areas are offsets into the rings, so the rings of an area and all of its vertices are contiguous
+    slices.
+
+    Attributes:
+        vertices (np.array): (n_vertices, 2) vertices of every ring, area after area.
+        ring_offsets (np.array): (n_rings + 1,) ring i is vertices[ring_offsets[i]:ring_offsets[i + 1]].
+        area_offsets (np.array): (n_areas + 1,) area code c owns rings area_offsets[c]:area_offsets[c + 1].
+        ring_areas (np.array): (n_rings,) area code of each ring.
+        file_rings (np.array): (n_rings,) position of each ring in the shp file.
+        names (list): area name of each area code.
+        codes (dict): area name as key, area code as value.
+    """
+
+    def __init__(self, vertices, ring_offsets, area_offsets, names, file_rings=None):
+        self.vertices = vertices
+        self.ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+        self.area_offsets = np.asarray(area_offsets, dtype=np.int64)
+        self.names = list(names)
+
+        self.file_rings = np.arange(self.n_rings) if file_rings is None else np.asarray(file_rings, dtype=np.int64)
+        self.ring_areas = np.repeat(np.arange(self.n_areas), np.diff(self.area_offsets))
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+    @classmethod
+    def from_flat(cls, ring_names, coords, ring_offsets, dtype=np.float64):
+        """
+        Build a store from rings in file order, grouping the rings of each area. Areas are numbered by first appearance and
+        keep the file order of their rings, so files that already list each area's rings together are not reordered.
+
+        Parameters:
+            ring_names (list): area name of each ring.
+            coords (np.array): (n_vertices, 2) vertices of every ring, as returned by poly_functs.flatten_rings.
+            ring_offsets (np.array): (n_rings + 1,) ring offsets into coords.
+            dtype (numpy dtype): dtype of the vertex array. float32 halves the memory, at a precision of about a meter on a
+                continental map.
+        """
+        codes = {}
+        ring_codes = np.fromiter((codes.setdefault(name, len(codes)) for name in ring_names),
+                                 dtype=np.int64, count=len(ring_names))
+
+        order = np.argsort(ring_codes, kind='stable')
+        lengths = np.diff(ring_offsets)
+
+        area_offsets = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ring_codes, minlength=len(codes)), out=area_offsets[1:])
+
+        if np.all(order == np.arange(len(order))):
+            vertices = np.asarray(coords, dtype=dtype)
+            offsets = np.asarray(ring_offsets, dtype=np.int64)
+        else:
+            offsets = np.zeros(len(order) + 1, dtype=np.int64)
+            np.cumsum(lengths[order], out=offsets[1:])
+
+            # vertex positions in coords, ring after ring in the new order
+            gather = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - ring_offsets[:-1][order], lengths[order])
+            vertices = np.asarray(coords, dtype=dtype)[gather]
+
+        return cls(vertices, offsets, area_offsets, list(codes), order)
+
+    @classmethod
+    def from_rings(cls, ring_names, rings, dtype=np.float64):
+        """
+        Build a store from a list of rings in file order, such as Basemap."area".
+        """
+        coords, ring_offsets = sc.flatten_rings(rings, dtype=dtype)
+
+        return cls.from_flat(ring_names, coords, ring_offsets, dtype)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Rebuild a store from the dict returned by to_arrays.
+        """
+        return cls(arrays['vertices'], arrays['ring_offsets'], arrays['area_offsets'], list(arrays['names']), arrays['file_rings'])
+
+    def to_arrays(self):
+        """
+        Arrays describing the store, for saving with numpy. names are returned as an object array.
+        """
+        return dict(vertices=self.vertices,
+                    ring_offsets=self.ring_offsets,
+                    area_offsets=self.area_offsets,
+                    file_rings=self.file_rings,
+                    names=np.array(self.names, dtype=object))
+
+    def copy(self):
+        """
+        Store sharing the offsets and names but owning a copy of the vertices. Used for corrected (translated) geometry.
+        """
+        return GeometryStore(self.vertices.copy(), self.ring_offsets, self.area_offsets, self.names, self.file_rings)
+
+    @property
+    def n_rings(self):
+        return len(self.ring_offsets) - 1
+
+    @property
+    def n_areas(self):
+        return len(self.area_offsets) - 1
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.vertices, self.ring_offsets, self.area_offsets, self.ring_areas, self.file_rings))
+
+    def ring_names(self):
+        """
+        Area name of every ring.
+        """
+        return [self.names[code] for code in self.ring_areas.tolist()]
+
+    def area_slice(self, area_name):
+        """
+        Slice of the rings of an area.
+        """
+        code = self.codes[area_name]
+
+        return slice(int(self.area_offsets[code]), int(self.area_offsets[code + 1]))
+
+    def vertex_slice(self, area_name):
+        """
+        Slice of the vertices of an area.
+        """
+        rings = self.area_slice(area_name)
+
+        return slice(int(self.ring_offsets[rings.start]), int(self.ring_offsets[rings.stop]))
+
+    def ring(self, i):
+        """
+        Vertices of ring i, as a view.
+        """
+        return self.vertices[self.ring_offsets[i]:self.ring_offsets[i + 1]]
+
+    def rings(self, area_name=None):
+        """
+        Vertices of every ring of an area (every ring when area_name is None), as views.
+        """
+        rings = slice(0, self.n_rings) if area_name is None else self.area_slice(area_name)
+
+        return [self.ring(i) for i in range(rings.start, rings.stop)]
+
+    def ring_bounds(self, area_name=None):
+        """
+        Bounding box of every ring of an area (every ring when area_name is None) as an (n, 4) array of x0, y0, x1, y1.
+        """
+        rings = slice(0, self.n_rings) if area_name is None else self.area_slice(area_name)
+
+        offsets = self.ring_offsets[rings.start:rings.stop + 1]
+        vertices = self.vertices[offsets[0]:offsets[-1]]
+        starts = offsets[:-1] - offsets[0]
+
+        return np.column_stack([np.minimum.reduceat(vertices, starts), np.maximum.reduceat(vertices, starts)])
+
+    def centroids(self):
+        """
+        (n_areas, 2) centroid of the largest ring of every area.
+        """
+        return sc.largest_ring_centroids(self.vertices, self.ring_offsets, self.area_offsets)
+
+
+class ShapeList(Sequence):
+    """
+    Read only list of (area name, ring vertices) over a GeometryStore, in place of the shapes lists ChoroPie used to build.
+    Items are made on access, so indexing doesn't copy the store, and rings are read only views of its vertices. Move areas
+    with ChoroPie.translate_shapes or translate_areas instead of assigning items.
+    """
+
+    def __init__(self, names, store):
+        """
+        Parameters:
+            names (list): area name of each ring.
+            store (GeometryStore): the rings.
+        """
+        self.names = names
+        self.store = store
+
+    def __len__(self):
+        return self.store.n_rings
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        ring = self.store.ring(range(len(self))[i]).view()
+        ring.flags.writeable = False
+
+        return self.names[i], ring
+
+    def __setitem__(self, i, value):
+        raise TypeError('shapes are read only views of the geometry store, use translate_shapes or translate_areas to move '
+                        'areas')
+
+    def __delitem__(self, i):
+        raise TypeError('shapes are read only views of the geometry store')
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from choropie.geometry import GeometryStore
+
+# bump when the layout of the cache files changes
+CACHE_VERSION = 3
+
+
+def cache_path(cache_dir, shp_file, shp_key, basemap_kwargs, dtype=np.float64, projection_backend='numpy'):
+    """
+    Path of the cache file for a shp file read with basemap_kwargs.
+
+    The key is a hash of the shp, shx and dbf file contents, the shp_key, the basemap_kwargs, the vertex dtype and the
+    projection backend, so editing the shp file or changing how it is projected never hits a stale entry.
+
+    Parameters:
+    Positional:
+        cache_dir (string): directory holding the cache files.
+        shp_file (string): path to shp file without extension.
+        shp_key (string): the attribute in the shape file which contains the indices used in the data.
+        basemap_kwargs (dict): kwargs passed into Basemap.
+    Optional:
+        dtype (numpy dtype): dtype of the projected vertices.
+        projection_backend (string): "numpy" or "basemap", the backend which projected the vertices.
+    """
+    digest = hashlib.sha1()
+
+    for ext in ('.shp', '.shx', '.dbf'):
+        with open(shp_file + ext, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+
+    key = [CACHE_VERSION, shp_key, basemap_kwargs, np.dtype(dtype).str, projection_backend]
+    digest.update(json.dumps(key, sort_keys=True, default=repr).encode('utf-8'))
+
+    return os.path.join(cache_dir, digest.hexdigest() + '.npz')
+
+
+def save(path, geometry, area_info, centroids, lod_errors=None):
+    """
+    Write projected geometry to a cache file. The file is written to a temporary name first so that concurrent readers never
+    see a partial file.
+
+    Parameters:
+        geometry (GeometryStore): projected rings.
+        area_info (list of dicts): shp attributes of each ring, in the ring order of geometry. values which are not json
+            types are stored as strings.
+        centroids (np.array): (n_areas, 2) centroid of each area code of geometry.
+        lod_errors (np.array): optional simplification error of every vertex of geometry, see
+            poly_functs.simplification_errors.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    arrays = geometry.to_arrays()
+    meta = json.dumps(dict(area_info=area_info, names=arrays.pop('names').tolist()), default=str)
+
+    if lod_errors is not None:
+        arrays['lod_errors'] = lod_errors
+
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as f:
+        np.savez(f,
+                 version=CACHE_VERSION,
+                 centroids=centroids,
+                 meta=np.frombuffer(meta.encode('utf-8'), dtype=np.uint8),
+                 **arrays)
+    os.replace(tmp, path)
+
+
+def load(path):
+    """
+    Read a cache file written by save.
+
+    Returns:
+        dict with the arguments of save (lod_errors None when they were not saved), or None if the file is missing,
+        unreadable or from another cache version.
+    """
+    try:
+        with np.load(path) as f:
+            if int(f['version']) != CACHE_VERSION:
+                return None
+
+            meta = json.loads(f['meta'].tobytes().decode('utf-8'))
+
+            geometry = GeometryStore.from_arrays(dict(vertices=f['vertices'],
+                                                      ring_offsets=f['ring_offsets'],
+                                                      area_offsets=f['area_offsets'],
+                                                      file_rings=f['file_rings'],
+                                                      names=meta['names']))
+
+            return dict(geometry=geometry,
+                        centroids=f['centroids'],
+                        area_info=meta['area_info'],
+                        lod_errors=f['lod_errors'] if 'lod_errors' in f.files else None)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
@@ -0,0 +1,299 @@
+import numpy as np
+
+# (column, row) steps from a grid cell to the cells compared with it, visiting every pair of neighbouring cells once
+_NEIGHBOURS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+# steps from a grid cell to the 2 x 2 block of cells it starts
+_BLOCK = ((0, 0), (1, 0), (0, 1), (1, 1))
+
+# golden angle, spreads the directions given to circles sharing a center
+_GOLDEN = np.pi * (3. - np.sqrt(5.))
+
+# below this many circles every pair is compared directly, the grid costs more than it saves
+_DIRECT = 48
+_ALL_PAIRS = {}
+
+# the exact spot of a circle being placed comes from at most this many of the placed circles around it
+_NEAREST = 16
+
+# grid cells the first search for a free spot reaches, later passes double it
+_MAX_REACH = 4
+
+# raster of the free spots: pixels across the smallest radius, and the most pixels it may have
+_PIXELS_PER_RADIUS = 2
+_MAX_PIXELS = 2 ** 22
+
+# pixels across the widest window searched at full resolution
+_WINDOW = 128
+
+
+def _all_pairs(n):
+    """
+    Index pairs (i, j), i < j, of n items. Cached, the layout asks for the same few sizes thousands of times.
+    """
+    if n not in _ALL_PAIRS:
+        _ALL_PAIRS[n] = np.triu_indices(n, 1)
+
+    return _ALL_PAIRS[n]
+
+
+def _cell_pairs(query_cells, cells, steps):
+    """
+    Index pairs (i, j) of every query cell i and every cell j which is one of steps away from it. Cells are (n, 2) ints
+    with a free row and column on every side.
+    """
+    rows = max(query_cells[:, 1].max(), cells[:, 1].max()) + 2
+    keys = cells[:, 0] * rows + cells[:, 1]
+    query_keys = query_cells[:, 0] * rows + query_cells[:, 1]
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    pairs_i = []
+    pairs_j = []
+    for dx, dy in steps:
+        target = query_keys + dx * rows + dy
+        start = np.searchsorted(sorted_keys, target, 'left')
+        counts = np.searchsorted(sorted_keys, target, 'right') - start
+
+        pairs_i.append(np.repeat(np.arange(len(query_keys)), counts))
+        pairs_j.append(order[np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - start, counts)])
+
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def overlapping_pairs(xy, radii, padding=0.):
+    """
+    Every pair of circles closer than the sum of their radii plus padding. Neighbours are found through a uniform grid of
+    cells as wide as the largest possible distance between overlapping circles, so only circles in the same or adjacent
+    cells are compared.
+
+    Parameters:
+        xy (np.array): (n, 2) circle centers.
+        radii (np.array): (n,) circle radii.
+        padding (numeric): space to keep between circles.
+
+    Returns:
+        i, j (np.arrays): indices of the overlapping pairs, each pair once.
+        overlap (np.array): how far each pair would have to move apart to stop overlapping.
+    """
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    radii = np.asarray(radii, dtype=np.float64)
+    n = len(xy)
+
+    cell = 2. * radii.max() + padding if n else 0.
+    if n < 2 or cell <= 0.:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    if n <= _DIRECT:
+        i, j = _all_pairs(n)
+    else:
+        cells = np.floor((xy - xy.min(axis=0)) / cell).astype(np.int64) + 1
+        i, j = _cell_pairs(cells, cells, _NEIGHBOURS)
+
+        keep = (i < j) | (cells[i] != cells[j]).any(axis=1)  # pairs within a cell are met twice
+        i, j = i[keep], j[keep]
+
+    overlap = radii[i] + radii[j] + padding - np.hypot(*(xy[j] - xy[i]).T)
+    hit = overlap > 0
+
+    return i[hit], j[hit], overlap[hit]
+
+
+def _covered(points, centers, clearances):
+    """
+    True for each point inside any of the circles centers +- clearances, with a hair of tolerance for points on an edge.
+    """
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    if len(centers) <= _DIRECT or len(points) * len(centers) <= _DIRECT ** 3:
+        gaps = np.hypot(*(points[:, None] - centers[None]).transpose(2, 0, 1))
+        return (gaps < clearances * (1 - 1e-9)).any(axis=1)
+
+    # with cells twice the largest clearance, the circles covering a point are in the 2 x 2 block of cells around it
+    reach = clearances.max()
+    origin = np.minimum(points.min(axis=0) - reach, centers.min(axis=0))
+    i, j = _cell_pairs(np.floor((points - reach - origin) / (2 * reach)).astype(np.int64) + 1,
+                       np.floor((centers - origin) / (2 * reach)).astype(np.int64) + 1, _BLOCK)
+
+    covered = np.zeros(len(points), dtype=bool)
+    covered[i[np.hypot(*(points[i] - centers[j]).T) < clearances[j] * (1 - 1e-9)]] = True
+
+    return covered
+
+
+def _candidates(anchor, centers, clearances, fallback):
+    """
+    Positions which can be nearest to anchor outside of every circle centers +- clearances: anchor pushed straight out of each
+    circle (along fallback when it sits on the center) and the points where two circles cross. Compares every pair, for the
+    few circles nearest a circle being placed.
+    """
+    offsets = anchor - centers
+    distances = np.hypot(*offsets.T)
+    directions = np.where(distances[:, None] > 0, offsets / np.where(distances > 0, distances, 1.)[:, None], fallback)
+    pushed = centers + clearances[:, None] * directions
+
+    # crossings of each pair, a along the line between the centers and h off it
+    i, j = _all_pairs(len(centers))
+    delta = centers[j] - centers[i]
+    d = np.hypot(*delta.T)
+    cross = (d < clearances[i] + clearances[j]) & (d > np.abs(clearances[i] - clearances[j]))
+    i, j, delta, d = i[cross], j[cross], delta[cross], d[cross]
+
+    a = (clearances[i] ** 2 - clearances[j] ** 2 + d ** 2) / (2 * d)
+    h = np.sqrt(np.maximum(clearances[i] ** 2 - a ** 2, 0.))
+    base = centers[i] + delta * (a / d)[:, None]
+    normal = np.column_stack([-delta[:, 1], delta[:, 0]]) * (h / d)[:, None]
+
+    return np.concatenate([pushed, base + normal, base - normal])
+
+
+def place_circles(xy, radii, padding=0., max_distance=None):
+    """
+    Moves circles so that none overlap, each as little as it can. Circles clear of all others keep their place. The others
+    are placed one at a time, largest first, at their start when it is free and otherwise at the free position nearest to
+    it. Every circle first looks within _MAX_REACH cells of its start, so the room near a crowded spot goes to the circles
+    from there. Those with no room look again, in passes whose reach doubles, until every circle is placed or the map
+    (the box around the starts and a cell more) is full.
+
+    Free positions are found on a raster of the map holding, at every pixel, the distance to the edge of the nearest
+    placed circle. Placing a circle only updates the pixels around it, and a circle of radius r fits at every pixel further
+    than r (plus padding) from all edges, so the nearest of those is found with a few array operations in a window around
+    the start, which doubles until it holds one (windows wider than _WINDOW pixels are sampled). The pixel distances are
+    exact, so circles put on a pixel never overlap. The spot is then refined to the nearest exact position around the
+    pixel: the start pushed straight out of one placed circle or a point where two of them (grown by the radius being
+    placed) cross, taken from the _NEAREST placed circles around it.
+
+    Circles with no free spot on the map (or within max_distance) stay where they started, overlapping, and don't block
+    the circles placed after them.
+
+    Parameters:
+        xy (np.array): (n, 2) starting centers.
+        radii (np.array): (n,) circle radii.
+        padding (numeric): space to keep between circles.
+        max_distance (numeric): circles which would have to move further than this stay where they started (overlapping).
+            defaults to no limit but the map.
+
+    Returns:
+        xy (np.array): (n, 2) new centers.
+        moved (np.array): (n,) bool, True for the circles which moved.
+    """
+    anchors = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    radii = np.asarray(radii, dtype=np.float64)
+    xy = anchors.copy()
+    n = len(xy)
+    moved = np.zeros(n, dtype=bool)
+
+    i, j = overlapping_pairs(anchors, radii, padding)[:2]
+    if len(i) == 0:
+        return xy, moved
+
+    crowded = np.zeros(n, dtype=bool)
+    crowded[i] = crowded[j] = True
+
+    cell = 2. * radii.max() + padding
+    reach = radii.max() + padding  # beyond this from its edge a circle leaves room for any other
+
+    # raster of the map, the box around the starts and a cell more, with pixels of a fraction of the smallest radius
+    # unless that gets too many. outside a placed circle's window its distance is at least reach, which is all a circle
+    # needs
+    low = anchors.min(axis=0) - cell
+    high = anchors.max(axis=0) + cell
+    pixel = max(radii.min() / _PIXELS_PER_RADIUS, np.sqrt(np.prod(high - low) / _MAX_PIXELS))
+    xs = low[0] + pixel * np.arange(int((high[0] - low[0]) // pixel) + 2)
+    ys = low[1] + pixel * np.arange(int((high[1] - low[1]) // pixel) + 2)
+    edges = np.full((len(xs), len(ys)), np.inf)
+    if max_distance is None:
+        max_distance = np.hypot(*(high - low))
+
+    def window(center, half):
+        x0, y0 = (center - half - low) // pixel
+        x1, y1 = (center + half - low) // pixel + 2
+        return slice(max(int(x0), 0), max(int(x1), 0)), slice(max(int(y0), 0), max(int(y1), 0))
+
+    # placed circles by grid cell, the cells of overlapping_pairs
+    grid = {}
+
+    def place(k):
+        key = int(xy[k, 0] // cell), int(xy[k, 1] // cell)
+        grid.setdefault(key, []).append(k)
+
+        wx, wy = window(xy[k], radii[k] + reach)
+        gaps = np.hypot((xs[wx] - xy[k, 0])[:, None], (ys[wy] - xy[k, 1])[None]) - radii[k]
+        np.minimum(edges[wx, wy], gaps, out=edges[wx, wy])
+
+    def gather(center, half):
+        x0, y0 = ((center - half) // cell).astype(int)
+        x1, y1 = ((center + half) // cell).astype(int)
+        return np.array([m for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1) for m in grid.get((cx, cy), ())],
+                        dtype=np.int64)
+
+    def free_pixel(anchor, clearance, start, stop):
+        # nearest pixel a circle fits at, further than start from the anchor, in windows which double until one holds it
+        half = start
+        while True:
+            half = min(2 * half, stop)
+            wx, wy = window(anchor, half)
+            step = -(-(wx.stop - wx.start) // _WINDOW)  # wide windows are sampled, the spots found are as exact
+            wx, wy = slice(wx.start, wx.stop, step), slice(wy.start, wy.stop, step)
+            squares = ((xs[wx] - anchor[0]) ** 2)[:, None] + ((ys[wy] - anchor[1]) ** 2)[None]
+            squares[(edges[wx, wy] < clearance) | (squares > half ** 2)] = np.inf
+            best = np.unravel_index(np.argmin(squares), squares.shape)
+            if squares[best] < np.inf:
+                return np.array([xs[wx][best[0]], ys[wy][best[1]]]), step
+            if half >= stop:
+                return None, None
+
+    for k in np.flatnonzero(~crowded).tolist():
+        place(k)
+
+    # every circle gets the room near its start first, the ones without any look further in later passes, until they
+    # all fit or the map (or max_distance) is searched
+    left = sorted(np.flatnonzero(crowded).tolist(), key=lambda k: (-radii[k], k))
+    searched = 0.
+    stop = min(_MAX_REACH * cell, max_distance)
+    while left:
+        stuck = []
+        for k in left:
+            anchor = anchors[k]
+            clearance = radii[k] + padding
+
+            if not searched:
+                others = gather(anchor, cell)
+                if (np.hypot(*(xy[others] - anchor).T) >= radii[others] + clearance).all():
+                    place(k)
+                    continue
+
+            spot, step = free_pixel(anchor, clearance, max(searched, cell / 2), stop)
+            if spot is None:
+                stuck.append(k)
+                continue
+
+            # the nearest exact spot around the pixel is on the edges of the circles closest to it
+            distance = np.hypot(*(spot - anchor))
+            near = 2 * pixel * step
+            others = gather(spot, near + cell)
+            centers = xy[others]
+            clearances = radii[others] + clearance
+            nearest = np.argsort(np.hypot(*(centers - spot).T) - clearances)[:_NEAREST]
+            fallback = np.array([np.cos(k * _GOLDEN), np.sin(k * _GOLDEN)])  # way out for circles starting on a center
+
+            candidates = _candidates(anchor, centers[nearest], clearances[nearest], fallback)
+            candidates = candidates[(np.hypot(*(candidates - anchor).T) < distance) &
+                                    (np.hypot(*(candidates - spot).T) <= near)]
+            free = candidates[~_covered(candidates, centers, clearances)]
+            if len(free):
+                spot = free[np.argmin(np.hypot(*(free - anchor).T))]
+
+            xy[k] = spot
+            moved[k] = True
+            place(k)
+
+        # the map is full when no pixel is left for the smallest of the circles without room
+        if stop >= max_distance or not stuck or not (edges >= radii[stuck].min() + padding).any():
+            break
+        left = stuck
+        searched = stop
+        stop = min(2 * stop, max_distance)
+
+    return xy, moved
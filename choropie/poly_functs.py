@@ -1,28 +1,368 @@
+import numpy as np
+
+
+def flatten_rings(rings, dtype=np.float64):
+    """
+    Pack a list of rings into one coordinate buffer.
+
+    Parameters:
+        rings (list): list of rings, each a sequence of (x, y) vertices.
+        dtype (numpy dtype): dtype of the coordinate buffer.
+
+    Returns:
+        coords (np.array): (n_vertices, 2) array of every vertex, ring after ring.
+        offsets (np.array): (n_rings + 1,) array. ring i is coords[offsets[i]:offsets[i + 1]].
+    """
+    lengths = np.fromiter((len(ring) for ring in rings), dtype=np.int64, count=len(rings))
+
+    offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    coords = np.empty((offsets[-1], 2), dtype=dtype)
+    for ring, start, end in zip(rings, offsets[:-1], offsets[1:]):
+        coords[start:end] = ring
+
+    return coords, offsets
+
+
+def _ring_terms(coords, offsets):
+    """
+    Per vertex shoelace terms, pairing every vertex with the next one in its ring (the last wraps to the first).
+    """
+    x = coords[:, 0].astype(np.float64)
+    y = coords[:, 1].astype(np.float64)
+
+    nxt = np.arange(1, len(coords) + 1)
+    nxt[offsets[1:] - 1] = offsets[:-1]
+
+    x_next, y_next = x[nxt], y[nxt]
+    cross = (y * x_next) - (y_next * x)
+
+    return x, y, x_next, y_next, cross
+
+
+def areas_for_rings(coords, offsets):
+    """
+    Signed areas of every ring in a coordinate buffer (same sign convention as area_for_polygon). The terms of a ring are
+    summed pairwise by np.add.reduceat rather than one after another like the original loop, so results agree with it to
+    floating point rounding (around 1e-15 relative), not bit for bit.
+
+    Parameters:
+        coords (np.array): (n_vertices, 2) array as returned by flatten_rings.
+        offsets (np.array): (n_rings + 1,) ring offsets into coords. rings must not be empty.
+
+    Returns:
+        np.array of n_rings areas.
+    """
+    if len(offsets) < 2:
+        return np.zeros(0)
+
+    cross = _ring_terms(coords, offsets)[-1]
+
+    return np.add.reduceat(cross, offsets[:-1]) / 2.
+
+
+def centroids_for_rings(coords, offsets, areas=None):
+    """
+    Centroids of every ring in a coordinate buffer. Summed like areas_for_rings, so they agree with the original loop to
+    floating point rounding.
+
+    Parameters:
+        coords (np.array): (n_vertices, 2) array as returned by flatten_rings.
+        offsets (np.array): (n_rings + 1,) ring offsets into coords. rings must not be empty.
+        areas (np.array): optional precomputed areas_for_rings result.
+
+    Returns:
+        (n_rings, 2) array of (x, y) centroids.
+    """
+    if len(offsets) < 2:
+        return np.zeros((0, 2))
+
+    x, y, x_next, y_next, cross = _ring_terms(coords, offsets)
+    starts = offsets[:-1]
+
+    if areas is None:
+        areas = np.add.reduceat(cross, starts) / 2.
+
+    result = np.empty((len(starts), 2))
+    result[:, 0] = np.add.reduceat((x + x_next) * cross, starts) / (areas * 6.0)
+    result[:, 1] = np.add.reduceat((y + y_next) * cross, starts) / (areas * 6.0)
+
+    return result
+
+
+def largest_ring_centroids(coords, offsets, area_offsets):
+    """
+    Centroid of the largest ring of every area, where an area is a run of consecutive rings.
+
+    Parameters:
+        coords (np.array): (n_vertices, 2) array as returned by flatten_rings.
+        offsets (np.array): (n_rings + 1,) ring offsets into coords.
+        area_offsets (np.array): (n_areas + 1,) offsets into the rings. area i owns rings area_offsets[i]:area_offsets[i + 1].
+
+    Returns:
+        (n_areas, 2) array of (x, y) centroids. ties go to the first ring of the area.
+    """
+    areas = areas_for_rings(coords, offsets)
+    centroids = centroids_for_rings(coords, offsets, areas)
+
+    n_rings = len(offsets) - 1
+    ring_area = np.repeat(np.arange(len(area_offsets) - 1), np.diff(area_offsets))
+
+    # sort by area, then by descending ring area, then by ring position. first of each group wins
+    order = np.lexsort((np.arange(n_rings), -areas, ring_area))
+    max_rings = order[area_offsets[:-1]]
+
+    return centroids[max_rings]
+
+
 def area_for_polygon(polygon):
-    result = 0
-    imax = len(polygon) - 1
-    for i in range(0, imax):
-        result += (polygon[i][1] * polygon[i + 1][0]) - (polygon[i + 1][1] * polygon[i][0])
-    result += (polygon[imax][1] * polygon[0][0]) - (polygon[0][1] * polygon[imax][0])
-    return result / 2.
+    coords, offsets = flatten_rings([polygon])
+
+    return float(areas_for_rings(coords, offsets)[0])
 
 
 def centroid_for_polygon(polygon):
-    area = area_for_polygon(polygon)
-    imax = len(polygon) - 1
-
-    result_x = 0
-    result_y = 0
-    for i in range(0, imax):
-        result_x += (polygon[i][1] + polygon[i + 1][1]) * ((polygon[i][1] *
-                                                            polygon[i + 1][0]) - (polygon[i + 1][1] * polygon[i][0]))
-        result_y += (polygon[i][0] + polygon[i + 1][0]) * ((polygon[i][1] *
-                                                            polygon[i + 1][0]) - (polygon[i + 1][1] * polygon[i][0]))
-    result_x += (polygon[imax][1] + polygon[0][1]) * \
-        ((polygon[imax][1] * polygon[0][0]) - (polygon[0][1] * polygon[imax][0]))
-    result_y += (polygon[imax][0] + polygon[0][0]) * \
-        ((polygon[imax][1] * polygon[0][0]) - (polygon[0][1] * polygon[imax][0]))
-    result_x /= (area * 6.0)
-    result_y /= (area * 6.0)
-
-    return result_y, result_x
+    coords, offsets = flatten_rings([polygon])
+    x, y = centroids_for_rings(coords, offsets)[0]
+
+    return float(x), float(y)
+
+
+def transform_groups(coords, offsets, origins, new_origins, scales=1., rotations=0.):
+    """
+    Affine transform of groups of vertices, each about its own origin: rotate and scale around origin, then move origin to
+    new_origin.
+
+    Parameters:
+        coords (np.array): (n_vertices, 2) array of vertices, group after group.
+        offsets (np.array): (n_groups + 1,) offsets into coords. group i is coords[offsets[i]:offsets[i + 1]].
+        origins (np.array): (n_groups, 2) point each group is scaled and rotated around.
+        new_origins (np.array): (n_groups, 2) where each origin ends up.
+        scales (numeric or np.array): scale factor of each group.
+        rotations (numeric or np.array): counterclockwise rotation of each group in degrees.
+
+    Returns:
+        (n_vertices, 2) float64 array of transformed vertices.
+    """
+    n_groups = len(offsets) - 1
+    counts = np.diff(offsets)
+
+    theta = np.radians(np.broadcast_to(np.asarray(rotations, dtype=np.float64), (n_groups,)))
+    scales = np.broadcast_to(np.asarray(scales, dtype=np.float64), (n_groups,))
+
+    # one 2x2 matrix per group holding rotation and scale
+    matrices = np.empty((n_groups, 2, 2))
+    matrices[:, 0, 0] = np.cos(theta) * scales
+    matrices[:, 0, 1] = -np.sin(theta) * scales
+    matrices[:, 1, 0] = np.sin(theta) * scales
+    matrices[:, 1, 1] = np.cos(theta) * scales
+
+    group = np.repeat(np.arange(n_groups), counts)
+    distances = np.asarray(coords, dtype=np.float64) - np.asarray(origins, dtype=np.float64).reshape(-1, 2)[group]
+
+    return np.einsum('nij,nj->ni', matrices[group], distances) + np.asarray(new_origins, dtype=np.float64).reshape(-1, 2)[group]
+
+
+def pie_wedges(ratios, pie_offsets, num_points=30):
+    """
+    Marker vertices of every pie wedge, for many pies at once.
+
+    Wedges start at angle 0 and run counterclockwise in the order given. Each wedge is scaled the way matplotlib scales custom
+    scatter markers (largest absolute coordinate becomes 0.5), so that drawing the wedges with a marker size gives the same
+    result as scatter(marker=wedge).
+
+    Parameters:
+        ratios (np.array): fraction of the pie taken by each wedge, pie after pie.
+        pie_offsets (np.array): (n_pies + 1,) offsets into ratios. pie i is ratios[pie_offsets[i]:pie_offsets[i + 1]].
+        num_points (int): number of points on the arc of each wedge.
+
+    Returns:
+        (n_wedges, num_points + 1, 2) array. the first vertex of each wedge is the pie center.
+    """
+    ratios = np.asarray(ratios, dtype=np.float64)
+    pie_offsets = np.asarray(pie_offsets, dtype=np.int64)
+
+    # angle where each wedge starts: sum of the ratios before it in the same pie
+    ends = np.cumsum(ratios)
+    starts = ends - ratios
+    starts -= np.repeat(starts[pie_offsets[:-1]], np.diff(pie_offsets))
+
+    angles = 2 * np.pi * (starts[:, None] + ratios[:, None] * np.linspace(0, 1, num_points)[None, :])
+
+    verts = np.zeros((len(ratios), num_points + 1, 2))
+    verts[:, 1:, 0] = np.cos(angles)
+    verts[:, 1:, 1] = np.sin(angles)
+
+    verts *= (0.5 / np.abs(verts).max(axis=(1, 2)))[:, None, None]
+
+    return verts
+
+
+def ring_junctions(coords, offsets):
+    """
+    Find the vertices where a boundary shared between rings starts or ends. A vertex is a junction when, across every ring
+    it appears in, it has more than two distinct neighbours. Vertices along a stretch of boundary that several rings share
+    keep the same two neighbours everywhere, so they are not junctions.
+
+    Parameters:
+        coords (np.array): (n_vertices, 2) array as returned by flatten_rings.
+        offsets (np.array): (n_rings + 1,) ring offsets into coords.
+
+    Returns:
+        boolean np.array of n_vertices.
+    """
+    n_rings = len(offsets) - 1
+    if n_rings < 1:
+        return np.zeros(len(coords), dtype=bool)
+
+    starts, ends = offsets[:-1], offsets[1:]
+
+    # the closing vertex of a closed ring repeats the first one. leave it out of the neighbour lookups
+    closed = (ends - starts > 1) & np.all(coords[ends - 1] == coords[starts], axis=1)
+    last = np.where(closed, ends - 2, ends - 1)
+
+    ring = np.repeat(np.arange(n_rings), np.diff(offsets))
+    idx = np.arange(len(coords))
+    valid = idx <= last[ring]
+
+    prev = idx - 1
+    prev[starts] = last
+    nxt = idx + 1
+    nxt[last] = starts
+
+    # the same id for vertices at the same position, from a sort of the coordinates
+    order = np.lexsort((coords[:, 1], coords[:, 0]))
+    new = np.ones(len(coords), dtype=bool)
+    new[1:] = (coords[order[1:]] != coords[order[:-1]]).any(axis=1)
+    ids = np.empty(len(coords), dtype=np.int64)
+    ids[order] = np.cumsum(new) - 1
+    n_ids = ids.max() + 1
+
+    # every distinct (vertex, neighbour) pair once, as one int64 key
+    pairs = np.unique(np.concatenate([ids[valid] * n_ids + ids[prev[valid]], ids[valid] * n_ids + ids[nxt[valid]]]))
+
+    junction_ids = np.bincount(pairs // n_ids, minlength=n_ids) > 2
+
+    return junction_ids[ids]
+
+
+def simplification_errors(coords, offsets, fixed=None):
+    """
+    The Douglas-Peucker error of every vertex in a coordinate buffer: simplify_rings keeps a vertex at any tolerance below
+    its error. The recursion splits a stretch at its farthest vertex whatever the tolerance, and only stops sooner at
+    larger ones, so a single run down to the last vertex gives every level. A vertex's error is its distance from the
+    stretch it splits, capped by the errors of the splits above it.
+
+    Rings are walked as in simplify_rings. Each round splits every stretch of every ring at once, so the work is a few
+    array operations per level of the recursion.
+
+    Parameters:
+        coords (np.array): (n_vertices, 2) array as returned by flatten_rings.
+        offsets (np.array): (n_rings + 1,) ring offsets into coords.
+        fixed (np.array): optional boolean array of n_vertices to always keep.
+
+    Returns:
+        np.array of n_vertices, inf for the vertices always kept.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    fixed = np.zeros(len(coords), dtype=bool) if fixed is None else np.asarray(fixed, dtype=bool)
+    errors = np.full(len(coords), np.inf)
+    if not len(coords):
+        return errors
+
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    closed = (lengths > 2) & np.all(coords[np.maximum(starts + lengths - 1, 0)] == coords[starts], axis=1)
+    distinct = np.where(closed, lengths - 1, lengths)
+
+    # a closed ring is walked from its first fixed vertex, or from its lowest one (by x, then y), and back to it
+    ring = np.repeat(np.arange(len(lengths)), lengths)
+    index = np.arange(len(coords))
+    inside = index - starts[ring] < distinct[ring]
+    order = np.lexsort((index, coords[:, 1], coords[:, 0], ~fixed, ring))
+    order = order[inside[order]]
+    heads = np.ones(len(order), dtype=bool)
+    heads[1:] = ring[order[1:]] != ring[order[:-1]]
+    first = starts.copy()
+    first[ring[order[heads]]] = order[heads]
+
+    walks = np.where(closed, distinct + 1, lengths)
+    walk_ring = np.repeat(np.arange(len(lengths)), walks)
+    step = np.arange(walks.sum()) - np.repeat(np.cumsum(walks) - walks, walks)
+    walk = np.where(closed[walk_ring],
+                    starts[walk_ring] + (first[walk_ring] - starts[walk_ring] + step) % np.maximum(distinct[walk_ring], 1),
+                    starts[walk_ring] + step)
+
+    # stretches between consecutive fixed vertices (and the ends of the walk) of each ring
+    anchors = np.flatnonzero(fixed[walk] | (step == 0) | (step == walks[walk_ring] - 1))
+    same = walk_ring[anchors[1:]] == walk_ring[anchors[:-1]]
+    a, b = anchors[:-1][same], anchors[1:][same]
+    bound = np.full(len(a), np.inf)
+
+    while True:
+        inner = b - a - 1
+        split = inner > 0
+        a, b, bound, inner = a[split], b[split], bound[split], inner[split]
+        if not len(a):
+            break
+
+        # distance of every inner vertex from the line through the ends of its stretch
+        stretch = np.repeat(np.arange(len(a)), inner)
+        heads = np.cumsum(inner) - inner
+        position = np.arange(inner.sum()) - heads[stretch] + a[stretch] + 1
+
+        origin = coords[walk[a]]
+        d = coords[walk[b]] - origin
+        norm = np.hypot(d[:, 0], d[:, 1])
+        seg = coords[walk[position]] - origin[stretch]
+        dist = np.where(norm[stretch] == 0, np.hypot(seg[:, 0], seg[:, 1]),
+                        np.abs(d[stretch, 0] * seg[:, 1] - d[stretch, 1] * seg[:, 0]) / np.where(norm == 0, 1., norm)[stretch])
+
+        # the first farthest vertex of each stretch splits it
+        farthest = np.maximum.reduceat(dist, heads)
+        k = np.minimum.reduceat(np.where(dist == farthest[stretch], position, len(walk)), heads)
+        error = np.minimum(farthest, bound)
+        errors[walk[k]] = error
+
+        a, b, bound = np.concatenate([a, k]), np.concatenate([k, b]), np.concatenate([error, error])
+
+    # the closing vertex of a closed ring follows its first
+    errors[(starts + lengths - 1)[closed]] = errors[starts[closed]]
+
+    return errors
+
+
+def simplify_rings(coords, offsets, tolerance, fixed=None, min_points=4, errors=None):
+    """
+    Douglas-Peucker simplification of every ring in a coordinate buffer.
+
+    Vertices marked in fixed (for example ring_junctions) are always kept and each stretch between them is simplified on its
+    own. A closed ring is walked from one of its fixed vertices, or from its lowest vertex (by x, then y) when it has none,
+    so where it starts in the file doesn't matter. Boundaries shared by neighbouring rings then reduce to the same vertices,
+    so no gaps or overlaps open between them. Open rings keep their ends. No ring drops below min_points vertices.
+
+    Parameters:
+        coords (np.array): (n_vertices, 2) array as returned by flatten_rings.
+        offsets (np.array): (n_rings + 1,) ring offsets into coords.
+        tolerance (numeric): maximum distance, in coordinate units, between a removed vertex and the simplified ring.
+        fixed (np.array): optional boolean array of n_vertices to always keep.
+        min_points (int): smallest number of vertices left in a ring.
+        errors (np.array): simplification_errors of coords, offsets and fixed. worked out when not passed, pass them to
+            simplify the same rings at several tolerances.
+
+    Returns:
+        boolean np.array of n_vertices, True for the vertices to keep. the closing vertex of a closed ring is kept with its
+        first vertex.
+    """
+    if errors is None:
+        errors = simplification_errors(coords, offsets, fixed)
+    keep = errors > tolerance
+
+    lengths = np.diff(offsets)
+    counts = np.bincount(np.repeat(np.arange(len(lengths)), lengths), keep, minlength=len(lengths))
+    for start, length in zip(offsets[:-1][counts < np.minimum(min_points, lengths)].tolist(),
+                             lengths[counts < np.minimum(min_points, lengths)].tolist()):
+        keep[start + np.linspace(0, length - 1, min(min_points, length)).astype(np.int64)] = True
+
+    return keep
@@ -0,0 +1,169 @@
+"""
+Geometry preprocessing of large shp files across a process pool. The vertices are put in shared memory once and every
+worker takes contiguous chunks of them (whole areas for centroids and bounds), so only offsets and the small per area
+results are pickled. Every step is elementwise or per ring, so the results are the same as the serial path bit for bit.
+"""
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from choropie import poly_functs as sc
+
+# below this many vertices the pool costs more than it saves and the serial path is used
+MIN_VERTICES = 1000000
+
+# chunks per worker, to even out uneven chunks
+CHUNKS_PER_WORKER = 4
+
+
+def resolve_workers(workers, n_vertices):
+    """
+    Number of processes to use for n_vertices: workers, all cpus for -1, 1 (serial) for None or small files.
+    """
+    if workers is None or n_vertices < MIN_VERTICES:
+        return 1
+    if workers < 0:
+        return os.cpu_count() or 1
+
+    return max(int(workers), 1)
+
+
+class _SharedArray(object):
+    """
+    Copy of an array in shared memory. Workers attach to it by (name, shape, dtype) instead of receiving the data.
+    """
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.spec = (self.memory.name, array.shape, array.dtype.str)
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.memory.buf)
+        self.array[...] = array
+
+    def close(self):
+        del self.array
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _attach(spec):
+    """
+    Array view of shared memory created by _SharedArray, and the SharedMemory to close once done with it.
+    """
+    name, shape, dtype = spec
+    memory = shared_memory.SharedMemory(name=name)
+
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf), memory
+
+
+def _project_chunk(args):
+    """
+    Projects lonlat[start:stop] into coords[start:stop].
+    """
+    projector, lonlat_spec, coords_spec, start, stop = args
+    lonlat, lonlat_memory = _attach(lonlat_spec)
+    coords, coords_memory = _attach(coords_spec)
+    try:
+        x, y = projector(lonlat[start:stop, 0], lonlat[start:stop, 1])
+        coords[start:stop, 0] = x
+        coords[start:stop, 1] = y
+    finally:
+        del lonlat, coords
+        lonlat_memory.close()
+        coords_memory.close()
+
+
+def _geometry_chunk(args):
+    """
+    Centroids and ring bounds of a run of whole areas.
+    """
+    vertices_spec, ring_offsets, area_offsets = args
+    vertices, memory = _attach(vertices_spec)
+    try:
+        chunk = vertices[ring_offsets[0]:ring_offsets[-1]]
+        offsets = ring_offsets - ring_offsets[0]
+
+        centroids = sc.largest_ring_centroids(chunk, offsets, area_offsets - area_offsets[0])
+        bounds = np.column_stack([np.minimum.reduceat(chunk, offsets[:-1]), np.maximum.reduceat(chunk, offsets[:-1])])
+    finally:
+        del vertices, chunk
+        memory.close()
+
+    return centroids, bounds
+
+
+def _splits(weights_offsets, n_chunks):
+    """
+    Boundaries splitting items into about n_chunks runs of equal weight, from the (n_items + 1,) cumulative weights.
+    """
+    targets = np.linspace(0, weights_offsets[-1], n_chunks + 1)
+    splits = np.unique(np.searchsorted(weights_offsets, targets))
+
+    return np.unique(np.concatenate([[0], splits, [len(weights_offsets) - 1]]))
+
+
+def project(projector, lonlat, workers):
+    """
+    projector applied to every vertex, in chunks across workers processes.
+
+    Parameters:
+        projector (Projection): numpy projection, see choropie.projections.
+        lonlat (np.array): (n_vertices, 2) lon, lat.
+        workers (int): processes.
+
+    Returns:
+        (n_vertices, 2) projected coordinates.
+    """
+    if workers <= 1 or len(lonlat) == 0:
+        return np.column_stack(projector(lonlat[:, 0], lonlat[:, 1]))
+
+    splits = _splits(np.arange(len(lonlat) + 1), workers * CHUNKS_PER_WORKER)
+
+    source = _SharedArray(np.asarray(lonlat, dtype=np.float64))
+    target = _SharedArray(np.empty((len(lonlat), 2)))
+    try:
+        jobs = [(projector, source.spec, target.spec, start, stop) for start, stop in zip(splits[:-1], splits[1:])]
+        with multiprocessing.get_context().Pool(workers) as pool:
+            pool.map(_project_chunk, jobs)
+
+        return target.array.copy()
+    finally:
+        source.close()
+        target.close()
+
+
+def centroids_and_bounds(geometry, workers):
+    """
+    Centroids of the largest ring of every area and bounding boxes of every ring of a GeometryStore, in chunks of whole
+    areas across workers processes.
+
+    Parameters:
+        geometry (GeometryStore): the geometry.
+        workers (int): processes.
+
+    Returns:
+        centroids (np.array): (n_areas, 2) as GeometryStore.centroids.
+        bounds (np.array): (n_rings, 4) as GeometryStore.ring_bounds.
+    """
+    if workers <= 1 or geometry.n_areas == 0:
+        return geometry.centroids(), geometry.ring_bounds()
+
+    # chunks of whole areas with about the same number of vertices
+    area_vertices = geometry.ring_offsets[geometry.area_offsets]
+    splits = _splits(area_vertices, workers * CHUNKS_PER_WORKER)
+
+    vertices = _SharedArray(geometry.vertices)
+    try:
+        jobs = []
+        for first, last in zip(splits[:-1], splits[1:]):
+            area_offsets = geometry.area_offsets[first:last + 1]
+            jobs.append((vertices.spec, geometry.ring_offsets[area_offsets[0]:area_offsets[-1] + 1], area_offsets))
+
+        with multiprocessing.get_context().Pool(workers) as pool:
+            results = pool.map(_geometry_chunk, jobs)
+    finally:
+        vertices.close()
+
+    return np.concatenate([centroids for centroids, bounds in results]), np.concatenate([bounds for centroids, bounds in results])
@@ -0,0 +1,128 @@
+import contextlib
+import functools
+import time
+import tracemalloc
+
+# returned by Profiler.phase when profiling is off, so disabled phases cost one attribute check
+_DISABLED = contextlib.nullcontext()
+
+
+class Profiler(object):
+    """
+    Records wall time, counts (such as artists and vertices drawn) and optionally tracemalloc peaks of named phases. Phases
+    nest: a record's depth and parent tell which phase it ran in. Records are appended when a phase ends, so inner phases
+    come before the phase holding them.
+
+    Attributes:
+        enabled (bool): record phases. can be switched at any time.
+        trace_memory (bool): record the tracemalloc peak of each phase, starting tracemalloc if it isn't tracing already.
+            tracing slows python allocations down noticeably.
+        callback (function): called with every record as it is made.
+        records (list of dicts): phase, parent, depth, seconds, peak_bytes (None without trace_memory) and any counts.
+    """
+
+    def __init__(self, enabled=False, trace_memory=False, callback=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.records = []
+        self.__stack = []
+
+    def phase(self, name):
+        """
+        Context manager timing a phase.
+        """
+        if not self.enabled:
+            return _DISABLED
+
+        return self.__phase(name)
+
+    @contextlib.contextmanager
+    def __phase(self, name):
+        record = dict(phase=name,
+                      parent=self.__stack[-1]['record']['phase'] if self.__stack else None,
+                      depth=len(self.__stack),
+                      seconds=None,
+                      peak_bytes=None)
+        frame = dict(record=record, peak=0)
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+            current, peak = tracemalloc.get_traced_memory()
+            if self.__stack:
+                # the peak is shared, keep the outer phase's peak so far before resetting it
+                self.__stack[-1]['peak'] = max(self.__stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = current
+
+        self.__stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self.__stack.pop()
+
+            if self.trace_memory and tracemalloc.is_tracing():
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_bytes'] = peak - frame['base']
+                if self.__stack:
+                    self.__stack[-1]['peak'] = max(self.__stack[-1]['peak'], peak)
+
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def count(self, **counts):
+        """
+        Adds counts (for example artists=10, vertices=2000) to the innermost running phase.
+        """
+        if self.enabled and self.__stack:
+            record = self.__stack[-1]['record']
+            for key, value in counts.items():
+                record[key] = record.get(key, 0) + value
+
+    def totals(self):
+        """
+        Calls, total seconds, largest peak_bytes and summed counts of every phase name.
+
+        Returns:
+            dict of phase name: dict.
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['phase'], dict(calls=0, seconds=0., peak_bytes=None))
+            total['calls'] += 1
+            total['seconds'] += record['seconds']
+
+            if record['peak_bytes'] is not None:
+                total['peak_bytes'] = max(total['peak_bytes'] or 0, record['peak_bytes'])
+
+            for key, value in record.items():
+                if key not in ('phase', 'parent', 'depth', 'seconds', 'peak_bytes'):
+                    total[key] = total.get(key, 0) + value
+
+        return totals
+
+    def clear(self):
+        """
+        Drops the records.
+        """
+        self.records = []
+
+
+def profiled(name):
+    """
+    Decorator recording a method as a phase of self.stats.
+    """
+    def decorator(funct):
+        @functools.wraps(funct)
+        def wrapper(self, *args, **kwargs):
+            with self.stats.phase(name):
+                return funct(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,473 @@
+import abc
+
+import numpy as np
+
+# default radius of Basemap's sphere
+RSPHERE = 6370997.
+
+# semi-major axis and inverse flattening of the ellipsoids accepted as ellps
+ELLIPSOIDS = dict(WGS84=(6378137., 298.257223563),
+                  GRS80=(6378137., 298.257222101),
+                  clrk66=(6378206.4, 294.9786982),
+                  sphere=(6370997., None))
+
+EPS10 = 1e-10
+
+
+def _wrap(lam):
+    """
+    Longitudes in radians wrapped into [-pi, pi], leaving values already in range untouched.
+    """
+    return np.where(np.abs(lam) > np.pi, (lam + np.pi) % (2 * np.pi) - np.pi, lam)
+
+
+def _tsfn(phi, e):
+    """
+    Conformal colatitude function t(phi) of Snyder (15-9), the tsfn of PROJ.
+    """
+    sinphi = e * np.sin(phi)
+    return np.tan(.5 * (np.pi / 2 - phi)) / np.power((1. - sinphi) / (1. + sinphi), .5 * e)
+
+
+def _phi2(ts, e, iterations=15):
+    """
+    Latitude from t(phi), the inverse of _tsfn.
+    """
+    phi = np.pi / 2 - 2. * np.arctan(ts)
+    for _ in range(iterations):
+        con = e * np.sin(phi)
+        new = np.pi / 2 - 2. * np.arctan(ts * np.power((1. - con) / (1. + con), .5 * e))
+        done = np.all(np.abs(new - phi) < 1e-14)
+        phi = new
+        if done:
+            break
+
+    return phi
+
+
+def _msfn(phi, es):
+    return np.cos(phi) / np.sqrt(1. - es * np.sin(phi) ** 2)
+
+
+class Projection(abc.ABC):
+    """
+    Vectorized map projection with the interface of Basemap.__call__: lon, lat in degrees to map x, y in meters, or back
+    with inverse=True. Whole arrays are projected in one call. Subclasses implement _forward and _inverse on the unit
+    sphere (or ellipsoid) in radians.
+
+    Attributes:
+        name (string): Basemap name of the projection.
+        a (float): semi-major axis in meters.
+        es (float): squared eccentricity, 0 for a sphere.
+        x_0, y_0 (float): false easting and northing, added after projecting.
+    """
+    name = None
+
+    def __init__(self, a, es=0., x_0=0., y_0=0.):
+        self.a = float(a)
+        self.es = float(es)
+        self.e = np.sqrt(self.es)
+        self.x_0 = float(x_0)
+        self.y_0 = float(y_0)
+
+    def __call__(self, x, y, inverse=False):
+        """
+        Projects lon, lat (or unprojects x, y with inverse) given as scalars, sequences or arrays.
+
+        Returns:
+            x, y (or lon, lat) as floats for scalar input, np.arrays otherwise.
+        """
+        scalar = np.ndim(x) == 0 and np.ndim(y) == 0
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            out = self.inverse(x, y) if inverse else self.forward(x, y)
+
+        if scalar:
+            return float(out[0]), float(out[1])
+
+        return out
+
+    def forward(self, lon, lat):
+        """
+        lon, lat arrays in degrees to x, y arrays in meters.
+        """
+        x, y = self._forward(np.radians(lon), np.radians(np.clip(lat, -90., 90.)))
+
+        return self.a * x + self.x_0, self.a * y + self.y_0
+
+    def inverse(self, x, y):
+        """
+        x, y arrays in meters to lon, lat arrays in degrees.
+        """
+        lam, phi = self._inverse((x - self.x_0) / self.a, (y - self.y_0) / self.a)
+
+        return np.degrees(lam), np.degrees(phi)
+
+    @abc.abstractmethod
+    def _forward(self, lam, phi):
+        """
+        lam, phi arrays in radians to x, y arrays in units of a, before the false easting and northing.
+        """
+
+    @abc.abstractmethod
+    def _inverse(self, x, y):
+        """
+        x, y arrays in units of a, without the false easting and northing, to lam, phi arrays in radians.
+        """
+
+    def set_origin(self, lon, lat):
+        """
+        Sets x_0 and y_0 so that lon, lat projects to 0, 0, the way Basemap places its lower left corner.
+        """
+        self.x_0 = self.y_0 = 0.
+        x, y = self(lon, lat)
+        self.x_0, self.y_0 = -x, -y
+
+
+class Equirectangular(Projection):
+    """
+    Basemap's "cyl": map coordinates are lon, lat in degrees.
+    """
+    name = 'cyl'
+
+    def __init__(self):
+        Projection.__init__(self, 1.)
+
+    def forward(self, lon, lat):
+        return lon + 0., lat + 0.
+
+    def inverse(self, x, y):
+        return x + 0., y + 0.
+
+    # forward and inverse above skip the conversion to radians, so lon, lat come back exactly
+    def _forward(self, lam, phi):
+        return lam, phi
+
+    def _inverse(self, x, y):
+        return x, y
+
+    def set_origin(self, lon, lat):
+        pass
+
+
+class Mercator(Projection):
+    """
+    Basemap's "merc". x is measured from the lower left corner's longitude lon_1, as Basemap does, so maps crossing the
+    antimeridian don't wrap.
+
+    Parameters:
+        lat_ts (numeric): latitude of true scale in degrees.
+        lon_1 (numeric): longitude at x = 0 (before x_0), the lower left corner of the map.
+    """
+    name = 'merc'
+
+    def __init__(self, a, es=0., lat_ts=0., lon_1=0., x_0=0., y_0=0.):
+        Projection.__init__(self, a, es, x_0, y_0)
+        self.lam_1 = np.radians(lon_1)
+        self.k0 = _msfn(np.radians(lat_ts), self.es)
+
+    def _forward(self, lam, phi):
+        if self.es:
+            y = np.arcsinh(np.tan(phi)) - self.e * np.arctanh(self.e * np.sin(phi))
+        else:
+            y = np.arcsinh(np.tan(phi))
+
+        return self.k0 * (lam - self.lam_1), self.k0 * y
+
+    def _inverse(self, x, y):
+        if self.es:
+            phi = _phi2(np.exp(-y / self.k0), self.e)
+        else:
+            phi = np.arctan(np.sinh(y / self.k0))
+
+        return x / self.k0 + self.lam_1, phi
+
+
+class LambertConformal(Projection):
+    """
+    Basemap's "lcc", Lambert conformal conic with one or two standard parallels.
+
+    Parameters:
+        lat_1, lat_2 (numeric): standard parallels in degrees.
+        lat_0, lon_0 (numeric): origin in degrees.
+        k_0 (numeric): scale factor at the standard parallels.
+    """
+    name = 'lcc'
+
+    def __init__(self, a, es=0., lat_1=0., lat_2=None, lat_0=0., lon_0=0., k_0=1., x_0=0., y_0=0.):
+        Projection.__init__(self, a, es, x_0, y_0)
+        phi1 = np.radians(lat_1)
+        phi2 = phi1 if lat_2 is None else np.radians(lat_2)
+        phi0 = np.radians(lat_0)
+        self.lam0 = np.radians(lon_0)
+        self.k0 = float(k_0)
+
+        if abs(phi1 + phi2) < EPS10:
+            raise ValueError('lat_1 and lat_2 of "lcc" can not be symmetric about the equator')
+
+        secant = abs(phi1 - phi2) >= EPS10
+        if self.es:
+            m1 = _msfn(phi1, self.es)
+            ml1 = _tsfn(phi1, self.e)
+            n = np.sin(phi1)
+            if secant:
+                n = np.log(m1 / _msfn(phi2, self.es)) / np.log(ml1 / _tsfn(phi2, self.e))
+            self.c = m1 * np.power(ml1, -n) / n
+            self.rho0 = 0. if abs(abs(phi0) - np.pi / 2) < EPS10 else self.c * np.power(_tsfn(phi0, self.e), n)
+        else:
+            n = np.sin(phi1)
+            if secant:
+                n = np.log(np.cos(phi1) / np.cos(phi2)) / np.log(np.tan(np.pi / 4 + .5 * phi2) / np.tan(np.pi / 4 + .5 * phi1))
+            self.c = np.cos(phi1) * np.power(np.tan(np.pi / 4 + .5 * phi1), n) / n
+            self.rho0 = 0. if abs(abs(phi0) - np.pi / 2) < EPS10 else self.c * np.power(np.tan(np.pi / 4 + .5 * phi0), -n)
+        self.n = float(n)
+
+    def _forward(self, lam, phi):
+        if self.es:
+            rho = self.c * np.power(_tsfn(phi, self.e), self.n)
+        else:
+            rho = self.c * np.power(np.tan(np.pi / 4 + .5 * phi), -self.n)
+        rho = np.where(np.abs(np.abs(phi) - np.pi / 2) < EPS10, 0., rho)
+
+        lam = self.n * _wrap(lam - self.lam0)
+
+        return self.k0 * rho * np.sin(lam), self.k0 * (self.rho0 - rho * np.cos(lam))
+
+    def _inverse(self, x, y):
+        x = x / self.k0
+        y = self.rho0 - y / self.k0
+        rho = np.hypot(x, y)
+        if self.n < 0.:
+            rho, x, y = -rho, -x, -y
+
+        if self.es:
+            phi = _phi2(np.power(rho / self.c, 1. / self.n), self.e)
+        else:
+            phi = 2. * np.arctan(np.power(self.c / rho, 1. / self.n)) - np.pi / 2
+        lam = np.arctan2(x, y) / self.n
+
+        center = rho == 0.
+        phi = np.where(center, np.copysign(np.pi / 2, self.n), phi)
+        lam = np.where(center, 0., lam)
+
+        return _wrap(lam + self.lam0), phi
+
+
+# Krüger series of the transverse mercator to sixth order in the third flattening n (Karney, 2011), as coefficients of
+# n ** 1 ... n ** 6 for each term
+_ALPHA = ((1 / 2, -2 / 3, 5 / 16, 41 / 180, -127 / 288, 7891 / 37800),
+          (0, 13 / 48, -3 / 5, 557 / 1440, 281 / 630, -1983433 / 1935360),
+          (0, 0, 61 / 240, -103 / 140, 15061 / 26880, 167603 / 181440),
+          (0, 0, 0, 49561 / 161280, -179 / 168, 6601661 / 7257600),
+          (0, 0, 0, 0, 34729 / 80640, -3418889 / 1995840),
+          (0, 0, 0, 0, 0, 212378941 / 319334400))
+_BETA = ((1 / 2, -2 / 3, 37 / 96, -1 / 360, -81 / 512, 96199 / 604800),
+         (0, 1 / 48, 1 / 15, -437 / 1440, 46 / 105, -1118711 / 3870720),
+         (0, 0, 17 / 480, -37 / 840, -209 / 4480, 5569 / 90720),
+         (0, 0, 0, 4397 / 161280, -11 / 504, -830251 / 7257600),
+         (0, 0, 0, 0, 4583 / 161280, -108847 / 3991680),
+         (0, 0, 0, 0, 0, 20648693 / 638668800))
+
+
+def _clenshaw(coeffs, zeta):
+    """
+    Sum of coeffs[j - 1] * sin(2 * j * zeta) over j by Clenshaw summation. zeta is complex, xi + i eta, which sums the
+    sin(2j xi) cosh(2j eta) and cos(2j xi) sinh(2j eta) terms of the Krüger series at once.
+    """
+    two_cos = 2. * np.cos(2. * zeta)
+    b1 = b2 = 0.
+    for coeff in coeffs[::-1]:
+        b1, b2 = coeff + two_cos * b1 - b2, b1
+
+    return b1 * np.sin(2. * zeta)
+
+
+class TransverseMercator(Projection):
+    """
+    Basemap's "tmerc". Uses the Krüger series on ellipsoids, like PROJ's default algorithm, and the closed form on spheres.
+
+    Parameters:
+        lat_0, lon_0 (numeric): origin in degrees.
+        k_0 (numeric): scale factor on the central meridian.
+    """
+    name = 'tmerc'
+
+    def __init__(self, a, es=0., lat_0=0., lon_0=0., k_0=1., x_0=0., y_0=0.):
+        Projection.__init__(self, a, es, x_0, y_0)
+        self.phi0 = np.radians(lat_0)
+        self.lam0 = np.radians(lon_0)
+        self.k0 = float(k_0)
+
+        n = self.es / (1. + np.sqrt(1. - self.es)) ** 2
+        powers = n ** np.arange(1, 7)
+        self.alpha = np.array(_ALPHA) @ powers
+        self.beta = np.array(_BETA) @ powers
+        self.rectifying = (1. + n ** 2 / 4 + n ** 4 / 64 + n ** 6 / 256) / (1. + n)  # in units of a
+
+        # meridian distance of the origin
+        self.ml0 = 0.
+        if self.es:
+            self.ml0 = self._forward(np.array(self.lam0), np.array(self.phi0))[1]
+
+    def __taup(self, tau):
+        """
+        tan of the conformal latitude from tan of the latitude.
+        """
+        sigma = np.sinh(self.e * np.arctanh(self.e * tau / np.hypot(1., tau)))
+        return tau * np.hypot(1., sigma) - sigma * np.hypot(1., tau)
+
+    def _forward(self, lam, phi):
+        lam = _wrap(lam - self.lam0)
+
+        if not self.es:
+            b = np.cos(phi) * np.sin(lam)
+            return self.k0 * np.arctanh(b), self.k0 * (np.arctan2(np.tan(phi), np.cos(lam)) - self.phi0)
+
+        taup = self.__taup(np.tan(phi))
+        zeta = np.arctan2(taup, np.cos(lam)) + 1j * np.arcsinh(np.sin(lam) / np.hypot(taup, np.cos(lam)))
+        zeta = zeta + _clenshaw(self.alpha, zeta)
+        xi, eta = zeta.real, zeta.imag
+
+        return self.k0 * self.rectifying * eta, self.k0 * self.rectifying * xi - self.ml0
+
+    def _inverse(self, x, y):
+        if not self.es:
+            x, d = x / self.k0, y / self.k0 + self.phi0
+            return _wrap(np.arctan2(np.sinh(x), np.cos(d)) + self.lam0), np.arcsin(np.sin(d) / np.cosh(x))
+
+        zeta = ((y + self.ml0) + 1j * x) / (self.k0 * self.rectifying)
+        zeta = zeta - _clenshaw(self.beta, zeta)
+        xi, eta = zeta.real, zeta.imag
+
+        taup = np.sin(xi) / np.hypot(np.sinh(eta), np.cos(xi))
+        lam = np.arctan2(np.sinh(eta), np.cos(xi))
+
+        # newton's method for tan of the latitude (Karney, 2011)
+        tau = taup / (1. - self.es)
+        for _ in range(5):
+            taupa = self.__taup(tau)
+            dtau = ((taup - taupa) / np.hypot(1., taupa) * (1. + (1. - self.es) * tau ** 2) /
+                    ((1. - self.es) * np.hypot(1., tau)))
+            tau = tau + dtau
+            if not np.any(np.abs(dtau) > 1e-15 * np.maximum(1., np.abs(tau))):
+                break
+
+        return _wrap(lam + self.lam0), np.arctan(tau)
+
+
+class BasemapProjection(object):
+    """
+    Projection backed by a Basemap instance, for the projections without a numpy implementation. Projects with PROJ
+    through pyproj, which is vectorized as well but slower.
+    """
+
+    def __init__(self, basemap):
+        self.basemap = basemap
+        self.name = basemap.projection
+
+    def __call__(self, x, y, inverse=False):
+        scalar = np.ndim(x) == 0 and np.ndim(y) == 0
+        x, y = self.basemap(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), inverse=inverse)
+
+        if scalar:
+            return float(x), float(y)
+
+        return np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+
+
+PROJECTIONS = dict(cyl=Equirectangular, merc=Mercator, lcc=LambertConformal, tmerc=TransverseMercator)
+
+
+def _ellipsoid(projection, ellps=None, rsphere=RSPHERE):
+    """
+    Semi-major axis and squared eccentricity the way Basemap passes them to PROJ.
+    """
+    if ellps is not None:
+        if ellps not in ELLIPSOIDS:
+            raise ValueError('ellps "%s" is not one of %s' % (ellps, ', '.join(ELLIPSOIDS)))
+        a, rf = ELLIPSOIDS[ellps]
+        return a, 0. if rf is None else (2. - 1. / rf) / rf
+
+    if np.ndim(rsphere):
+        a, b = max(rsphere), min(rsphere)
+        return a, 1. - (b / a) ** 2
+
+    if projection == 'tmerc':
+        # Basemap passes the sphere of tmerc as "bR_a", which PROJ ignores for its default WGS84 ellipsoid
+        return _ellipsoid(projection, 'WGS84')
+
+    return rsphere, 0.
+
+
+def _make(projection, a, es, params, llcrnrlon):
+    if projection == 'cyl':
+        return Equirectangular()
+    if projection == 'merc':
+        return Mercator(a, es, lat_ts=params.get('lat_ts') or 0., lon_1=llcrnrlon)
+    if projection == 'lcc':
+        return LambertConformal(a, es, lat_1=params['lat_1'], lat_2=params.get('lat_2'), lat_0=params.get('lat_0') or 0.,
+                                lon_0=params['lon_0'], k_0=params.get('k_0') or 1.)
+    return TransverseMercator(a, es, lat_0=params['lat_0'], lon_0=params['lon_0'], k_0=params.get('k_0') or 1.)
+
+
+def from_basemap_kwargs(basemap_kwargs):
+    """
+    Projection of a map without creating the Basemap, resolving defaults the way Basemap does. x, y match the Basemap
+    made from the same kwargs to well under a millimeter.
+
+    Maps given by width and height instead of their corners, and projections without a numpy implementation, need
+    Basemap to resolve the region: those make the Basemap and return its projection as from_basemap does, or a
+    BasemapProjection.
+
+    Parameters:
+        basemap_kwargs (dict): the kwargs passed into Basemap.
+
+    Returns:
+        Projection or BasemapProjection
+    """
+    projection = basemap_kwargs.get('projection', 'cyl')
+    corners = [basemap_kwargs.get(key) for key in ('llcrnrlon', 'llcrnrlat', 'urcrnrlon', 'urcrnrlat')]
+    if projection not in PROJECTIONS or None in corners:
+        from mpl_toolkits.basemap import Basemap
+
+        basemap = Basemap(**basemap_kwargs)
+        return from_basemap(basemap) or BasemapProjection(basemap)
+
+    params = dict(basemap_kwargs)
+    if projection == 'lcc':
+        if params.get('lat_1') is None:
+            params['lat_1'] = params.get('lat_0')
+        if params.get('lat_1') is None or params.get('lon_0') is None:
+            raise ValueError('"lcc" needs lat_1 (or lat_0) and lon_0')
+    if projection == 'tmerc' and (params.get('lat_0') is None or params.get('lon_0') is None):
+        raise ValueError('"tmerc" needs lat_0 and lon_0')
+
+    a, es = _ellipsoid(projection, params.get('ellps'), params.get('rsphere', RSPHERE))
+
+    proj = _make(projection, a, es, params, corners[0])
+    proj.set_origin(corners[0], corners[1])
+
+    return proj
+
+
+def from_basemap(basemap):
+    """
+    Numpy projection of a Basemap instance, from the projection parameters it resolved. Returns None for projections
+    without a numpy implementation.
+    """
+    if basemap.projection not in PROJECTIONS:
+        return None
+
+    params = basemap.projparams
+    if 'a' in params and 'b' in params:
+        a, es = _ellipsoid(basemap.projection, rsphere=(params['a'], params['b']))
+    else:
+        a, es = _ellipsoid(basemap.projection, rsphere=params.get('R', params.get('bR_a')))
+
+    proj = _make(basemap.projection, a, es, params, basemap.llcrnrlon)
+    proj.x_0 = 0. if basemap.projection == 'merc' else float(params.get('x_0', 0.))
+    proj.y_0 = float(params.get('y_0', 0.))
+
+    return proj
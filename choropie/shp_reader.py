@@ -0,0 +1,404 @@
+"""
+Memory mapped shp file reader. The .shp and .shx files are mapped into memory and the parts and points of every shape
+are read as numpy views of the map, so no Python object is made per vertex. The .dbf table is read one column at a time
+from a (n_records, record_length) view of its file.
+"""
+import os
+
+import numpy as np
+
+# shape type names, as in the shp file specification
+SHAPE_TYPES = {0: 'NULL', 1: 'POINT', 3: 'POLYLINE', 5: 'POLYGON', 8: 'MULTIPOINT', 11: 'POINTZ', 13: 'POLYLINEZ',
+               15: 'POLYGONZ', 18: 'MULTIPOINTZ', 21: 'POINTM', 23: 'POLYLINEM', 25: 'POLYGONM', 28: 'MULTIPOINTM',
+               31: 'MULTIPATCH'}
+
+# shape types stored as parts of x, y points. the z and m types keep their extra values after the points
+RING_TYPES = (3, 5, 13, 15, 23, 25)
+
+
+def _int32s(data, offsets, dtype='<i4'):
+    """
+    The 32 bit ints starting at each byte offset of data.
+    """
+    return data[np.asarray(offsets, dtype=np.int64)[:, None] + np.arange(4)].view(dtype).ravel().astype(np.int64)
+
+
+def _parse_numbers(values, integer):
+    """
+    Numeric dbf values (bytes, stripped) as float64, or int64 when integer. Values which don't parse are reported missing.
+
+    Returns:
+        values (np.array): the numbers.
+        valid (np.array): bool, False for missing values.
+    """
+    valid = values != b''
+    try:
+        if integer:
+            try:
+                numbers = values[valid].astype(np.int64)
+            except (ValueError, OverflowError):  # ints written as floats, like pyshp read them
+                numbers = np.trunc(values[valid].astype(np.float64)).astype(np.int64)
+        else:
+            numbers = values[valid].astype(np.float64)
+    except ValueError:
+        parsed = []
+        for value in values[valid].tolist():
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                parsed.append(np.nan)
+        numbers = np.array(parsed)
+        valid[valid] = ~np.isnan(numbers)
+        numbers = numbers[~np.isnan(numbers)]
+        if integer:
+            numbers = np.trunc(numbers).astype(np.int64)
+
+    out = np.zeros(len(values), dtype=numbers.dtype)
+    out[valid] = numbers
+
+    return out, valid
+
+
+class ShpReader(object):
+    """
+    Reader of the .shp, .shx and .dbf files of a shp file. Each file is mapped on first use, so reading the attribute table
+    never touches the geometry.
+
+    Attributes:
+        shp_file (string): path to shp file without extension.
+        encoding (string): encoding of the text columns of the dbf file.
+    """
+
+    def __init__(self, shp_file, encoding='utf-8'):
+        """
+        Parameters:
+        Positional:
+            shp_file (string): path to shp file without extension.
+        Optional:
+            encoding (string): encoding of the text columns of the dbf file.
+        """
+        self.shp_file = shp_file
+        self.encoding = encoding
+
+        self.__maps = {}
+        self.__headers = None
+        self.__fields = None
+
+    def __map(self, extension):
+        """
+        Read only uint8 memory map of one of the files.
+        """
+        if extension not in self.__maps:
+            path = '%s.%s' % (self.shp_file, extension)
+            if not os.path.exists(path):
+                raise IOError('cannot locate %s' % path)
+            self.__maps[extension] = np.memmap(path, dtype=np.uint8, mode='r').view(np.ndarray)
+
+        return self.__maps[extension]
+
+    @property
+    def shape_type(self):
+        """
+        Shape type of the shp file, from its header. see SHAPE_TYPES.
+        """
+        return int(_int32s(self.__map('shp'), [32])[0])
+
+    @property
+    def bbox(self):
+        """
+        x0, y0, x1, y1 of the shp file, from its header.
+        """
+        return self.__map('shp')[36:68].view('<f8').copy()
+
+    def __record_headers(self):
+        """
+        Content offset, shape type, number of parts and number of points of every shape, read from the .shx index and the
+        first bytes of each record.
+        """
+        if self.__headers is None:
+            shp = self.__map('shp')
+            index = self.__map('shx')[100:].view('>i4').reshape(-1, 2)
+
+            starts = index[:, 0].astype(np.int64) * 2 + 8  # word offset of the record header, content after it
+            types = _int32s(shp, starts)
+
+            unknown = ~np.isin(types, (0,) + RING_TYPES)
+            if unknown.any():
+                name = SHAPE_TYPES.get(int(types[unknown][0]), str(types[unknown][0]))
+                raise ValueError('%s.shp has shapes of type %s, only polygons and polylines can be read' % (self.shp_file, name))
+
+            # null shapes are only their type
+            rings = types != 0
+            n_parts = np.zeros(len(starts), dtype=np.int64)
+            n_points = np.zeros(len(starts), dtype=np.int64)
+            n_parts[rings] = _int32s(shp, starts[rings] + 36)
+            n_points[rings] = _int32s(shp, starts[rings] + 40)
+
+            self.__headers = starts, types, n_parts, n_points
+
+        return self.__headers
+
+    @property
+    def n_shapes(self):
+        """
+        Number of shapes, from the .shx index.
+        """
+        return (len(self.__map('shx')) - 100) // 8
+
+    def ring_counts(self):
+        """
+        Number of rings (parts) of every shape. Only the record headers are read.
+        """
+        return self.__record_headers()[2].copy()
+
+    def shape(self, number):
+        """
+        Parts and points of one shape, as views of the mapped file.
+
+        Parameters:
+            number (int): shape number, from 0.
+
+        Returns:
+            parts (np.array): (n_parts,) little endian int32 start of each part in points.
+            points (np.array): (n_points, 2) little endian float64 x, y.
+        """
+        starts, types, n_parts, n_points = self.__record_headers()
+        shp = self.__map('shp')
+
+        parts = starts[number] + 44
+        points = parts + 4 * n_parts[number]
+
+        return (shp[parts:points].view('<i4'),
+                shp[points:points + 16 * n_points[number]].view('<f8').reshape(-1, 2))
+
+    def rings(self):
+        """
+        Every point of every shape in one array, with offsets to where its rings and shapes start.
+
+        Returns:
+            points (np.array): (n_vertices, 2) float64 x, y in file order.
+            ring_offsets (np.array): (n_rings + 1,) ring offsets into points.
+            shape_offsets (np.array): (n_shapes + 1,) offsets of the first ring of every shape into ring_offsets.
+        """
+        starts, types, n_parts, n_points = self.__record_headers()
+        shp = self.__map('shp')
+
+        shape_offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(n_parts, out=shape_offsets[1:])
+        point_offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(n_points, out=point_offsets[1:])
+
+        # part starts of every shape, moved from record to file point numbers
+        shapes = np.repeat(np.arange(len(starts)), n_parts)
+        local = np.arange(shape_offsets[-1]) - shape_offsets[shapes]
+        ring_offsets = np.append(_int32s(shp, starts[shapes] + 44 + 4 * local) + point_offsets[shapes], point_offsets[-1])
+
+        points = np.empty((point_offsets[-1], 2))
+        first = starts + 44 + 4 * n_parts
+        for shape in np.flatnonzero(n_points).tolist():
+            start = first[shape]
+            points[point_offsets[shape]:point_offsets[shape + 1]] = \
+                shp[start:start + 16 * n_points[shape]].view('<f8').reshape(-1, 2)
+
+        return points, ring_offsets, shape_offsets
+
+    @property
+    def fields(self):
+        """
+        (name, type, length, decimals) of every dbf column.
+        """
+        return [field[:4] for field in self.__dbf_fields()]
+
+    def __dbf_fields(self):
+        """
+        (name, type, length, decimals, offset in the record) of every dbf column.
+        """
+        if self.__fields is None:
+            dbf = self.__map('dbf')
+
+            fields = []
+            offset = 1  # after the deletion flag
+            for start in range(32, int(dbf[8:10].view('<u2')[0]) - 1, 32):
+                if dbf[start] == 0x0D:
+                    break
+                descriptor = dbf[start:start + 32].tobytes()
+                name = descriptor[:11].split(b'\x00')[0].decode(self.encoding).strip()
+                fields.append((name, chr(descriptor[11]), descriptor[16], descriptor[17], offset))
+                offset += descriptor[16]
+
+            self.__fields = fields
+
+        return self.__fields
+
+    @property
+    def n_records(self):
+        """
+        Number of dbf records, from its header.
+        """
+        return int(self.__map('dbf')[4:8].view('<u4')[0])
+
+    def __records(self, rows=None):
+        """
+        (n_records, record_length) view of the dbf records, the deletion flag in the first column. Only the selected rows
+        when rows is given, so the other records are never read.
+        """
+        dbf = self.__map('dbf')
+        header_length, record_length = dbf[8:12].view('<u2').tolist()
+        n_records = min(self.n_records, (len(dbf) - header_length) // record_length)
+
+        records = dbf[header_length:header_length + n_records * record_length].reshape(n_records, record_length)
+        if rows is None:
+            return records
+
+        return records[rows if isinstance(rows, slice) else np.asarray(rows).reshape(-1)]
+
+    def __column(self, records, field):
+        """
+        Values of one dbf column and whether each is set. numbers as int64 or float64, dates as datetime64[D], logicals as
+        bools and anything else as text.
+        """
+        name, kind, length, decimals, offset = field
+        raw = np.ascontiguousarray(records[:, offset:offset + length]).view('S%d' % max(length, 1)).ravel()
+
+        if kind in ('N', 'F'):
+            return _parse_numbers(np.char.strip(np.char.replace(raw, b'*', b'')), not decimals)
+
+        if kind == 'D':
+            days = np.char.strip(raw)
+            valid = np.char.strip(np.char.replace(days, b'0', b'')) != b''
+            values = np.full(len(raw), np.datetime64('NaT'), dtype='datetime64[D]')
+            for index in np.flatnonzero(valid).tolist():
+                day = days[index]
+                try:
+                    values[index] = np.datetime64('%s-%s-%s' % (day[:4].decode(), day[4:6].decode(), day[6:8].decode()))
+                except ValueError:
+                    valid[index] = False
+            return values, valid
+
+        if kind == 'L':
+            values = np.isin(raw, [b'Y', b'y', b'T', b't', b'1'])
+            return values, values | np.isin(raw, [b'N', b'n', b'F', b'f', b'0'])
+
+        # dbf code pages extend ascii, so columns of ascii text are cast without decoding value by value
+        try:
+            values = raw.astype('U%d' % max(length, 1))
+        except UnicodeDecodeError:
+            values = np.char.decode(raw, self.encoding)
+
+        return np.char.strip(values), np.ones(len(values), dtype=bool)
+
+    def __selected_fields(self, columns):
+        """
+        Fields of the named columns, all of them for None.
+        """
+        fields = self.__dbf_fields()
+        if columns is None:
+            return fields
+
+        by_name = {field[0]: field for field in fields}
+        missing = [column for column in columns if column not in by_name]
+        if missing:
+            raise KeyError('%s.dbf has no column %s' % (self.shp_file, ', '.join(map(str, missing))))
+
+        return [by_name[column] for column in columns]
+
+    def table(self, columns=None, rows=None):
+        """
+        dbf attribute table, one array per column.
+
+        Parameters:
+            columns (list of strings): names of the columns to read. all of them by default.
+            rows (slice or array like): record numbers (from 0) or bool mask of the records to read. all of them by default.
+
+        Returns:
+            dict of column name: np.array. numbers are int64, or float64 with nan for missing values, dates datetime64[D]
+            with NaT for missing values, logicals object arrays of True, False and None, and text str arrays.
+        """
+        records = self.__records(rows)
+
+        table = {}
+        for field in self.__selected_fields(columns):
+            values, valid = self.__column(records, field)
+            if not valid.all():
+                if values.dtype.kind in 'iu':
+                    values = values.astype(np.float64)
+                if values.dtype.kind == 'f':
+                    values[~valid] = np.nan
+                elif values.dtype.kind == 'b':
+                    values = values.astype(object)
+                    values[~valid] = None
+            table[field[0]] = values
+
+        return table
+
+    def records(self, columns=None, rows=None):
+        """
+        dbf attribute table as a dict of column name: value per record, with the values pyshp (and Basemap) read: Python
+        ints, floats, strings, dates and bools, None for missing values.
+
+        Parameters:
+            columns (list of strings): names of the columns to read. all of them by default.
+            rows (slice or array like): records to read, see table.
+        """
+        records = self.__records(rows)
+
+        names = []
+        columns_values = []
+        for field in self.__selected_fields(columns):
+            values, valid = self.__column(records, field)
+            values = values.tolist()
+            if not valid.all():
+                values = [value if ok else None for value, ok in zip(values, valid.tolist())]
+            names.append(field[0])
+            columns_values.append(values)
+
+        return [dict(zip(names, row)) for row in zip(*columns_values)] if names else [{} for _ in range(len(records))]
+
+    def ring_info(self, columns=None, rows=None):
+        """
+        Attributes of every ring, as Basemap."area"_info: the dbf record of its shape, with its RINGNUM and SHAPENUM.
+        Only the record headers of the shp file are read.
+
+        Parameters:
+            columns (list of strings): names of the columns to read. all of them by default.
+            rows (slice or array like): shapes to read, see table.
+        """
+        numbers = np.arange(1, self.n_shapes + 1)
+        counts = self.ring_counts()
+        if rows is not None:
+            rows = rows if isinstance(rows, slice) else np.asarray(rows).reshape(-1)
+            numbers, counts = numbers[rows], counts[rows]
+
+        info = []
+        for number, record, n_rings in zip(numbers.tolist(), self.records(columns, rows), counts.tolist()):
+            for ring in range(1, n_rings + 1):
+                info.append(dict(record, RINGNUM=ring, SHAPENUM=number))
+
+        return info
+
+
+def read_lonlat(shp_file, columns=None):
+    """
+    Reads the rings of a polygon shp file the way Basemap.readshapefile does, without projecting them.
+
+    Parameters:
+        shp_file (string): path to shp file without extension.
+        columns (list of strings): dbf columns to keep in area_info. all of them by default.
+
+    Returns:
+        lonlat (np.array): (n_vertices, 2) lon, lat of every ring in file order, lat clipped to [-90, 90].
+        ring_offsets (np.array): (n_rings + 1,) ring offsets into lonlat.
+        area_info (list of dicts): shp attributes of each ring, with its RINGNUM and SHAPENUM like Basemap's.
+    """
+    for extension in ('shp', 'shx', 'dbf'):
+        if not os.path.exists('%s.%s' % (shp_file, extension)):
+            raise IOError('cannot locate %s.%s' % (shp_file, extension))
+
+    reader = ShpReader(shp_file)
+    lonlat, ring_offsets, shape_offsets = reader.rings()
+    if len(lonlat) and (np.abs(lonlat[:, 0]).max() > 721. or np.abs(lonlat[:, 1]).max() > 90.01):
+        raise ValueError('shapefile must have lat/lon vertices - it looks like this one has vertices in map projection '
+                         'coordinates')
+    np.clip(lonlat[:, 1], -90., 90., out=lonlat[:, 1])
+
+    return lonlat, ring_offsets, reader.ring_info(columns)
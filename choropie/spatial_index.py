@@ -0,0 +1,192 @@
+import numpy as np
+
+from choropie import poly_functs as sc
+
+
+class SpatialIndex(object):
+    """
+    Uniform grid over the bounding boxes of shapefile rings. Assigns whole arrays of points to areas, only running the exact
+    point in polygon test against the few rings registered in each point's grid cell. Holes are resolved per area by the
+    even-odd rule, so points in an enclave go to the enclave.
+
+    Attributes:
+        names (list): area name of each ring (may have duplicates).
+        coords (np.array): (n_vertices, 2) vertices of every ring.
+        offsets (np.array): (n_rings + 1,) ring offsets into coords.
+        bounds (np.array): (n_rings, 4) ring bounding boxes as x0, y0, x1, y1.
+        cell_size (float): width and height of a grid cell.
+    """
+
+    def __init__(self, names, coords, offsets, cell_size=None):
+        """
+        Parameters:
+        Positional:
+            names (list): area name of each ring.
+            coords (np.array): (n_vertices, 2) vertices of every ring, as returned by poly_functs.flatten_rings.
+            offsets (np.array): (n_rings + 1,) ring offsets into coords.
+        Optional:
+            cell_size (numeric): grid cell size in coordinate units. defaults to the median ring extent.
+        """
+        self.names = list(names)
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+        starts = self.offsets[:-1]
+        self.bounds = np.column_stack([np.minimum.reduceat(self.coords[:, 0], starts),
+                                       np.minimum.reduceat(self.coords[:, 1], starts),
+                                       np.maximum.reduceat(self.coords[:, 0], starts),
+                                       np.maximum.reduceat(self.coords[:, 1], starts)])
+
+        self.__origin = self.bounds[:, :2].min(axis=0)
+        extent = self.bounds[:, 2:].max(axis=0) - self.__origin
+
+        if cell_size is None:
+            cell_size = np.median(np.maximum(self.bounds[:, 2] - self.bounds[:, 0], self.bounds[:, 3] - self.bounds[:, 1]))
+        # keep the grid from growing past a few cells per ring
+        cell_size = max(cell_size, np.sqrt(extent.prod() / (4. * len(starts))), np.finfo(float).eps)
+        self.cell_size = float(cell_size)
+
+        self.__shape = (np.floor(extent / self.cell_size).astype(np.int64) + 1)
+        nx, ny = self.__shape
+
+        # register every ring in every cell its bounding box overlaps
+        lo = self.__cells(self.bounds[:, :2])
+        hi = self.__cells(self.bounds[:, 2:])
+        widths = hi[:, 0] - lo[:, 0] + 1
+        counts = widths * (hi[:, 1] - lo[:, 1] + 1)
+
+        rings = np.repeat(np.arange(len(starts)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = ((lo[rings, 1] + local // widths[rings]) * nx) + lo[rings, 0] + local % widths[rings]
+
+        # rings sorted by cell, in file order within a cell
+        order = np.lexsort((rings, cells))
+        self.__cell_rings = rings[order]
+        self.__cell_offsets = np.zeros(nx * ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=nx * ny), out=self.__cell_offsets[1:])
+
+        self.__paths = [None] * len(starts)
+
+        # area code of every ring, areas numbered in order of their first ring
+        codes = {}
+        self.__ring_areas = np.array([codes.setdefault(name, len(codes)) for name in self.names], dtype=np.int64)
+
+    @classmethod
+    def from_rings(cls, names, rings, cell_size=None):
+        """
+        Build an index from a list of rings, such as Basemap."area" and ChoroPie.area_names.
+        """
+        coords, offsets = sc.flatten_rings(rings)
+
+        return cls(names, coords, offsets, cell_size)
+
+    @classmethod
+    def from_shapefile(cls, shp_file, shp_key, cell_size=None):
+        """
+        Build an index over a shp file in lon, lat coordinates.
+
+        Parameters:
+            shp_file (string): path to shp file without extension.
+            shp_key (string): the attribute in the shape file which holds the area names.
+        """
+        from choropie import shp_reader
+
+        lonlat, offsets, area_info = shp_reader.read_lonlat(shp_file, [shp_key])
+
+        return cls([area[shp_key] for area in area_info], lonlat, offsets, cell_size)
+
+    def __cells(self, xy):
+        """
+        Grid cell (column, row) for each coordinate, clipped to the grid.
+        """
+        cells = np.floor((xy - self.__origin) / self.cell_size).astype(np.int64)
+
+        return np.clip(cells, 0, self.__shape - 1)
+
+    def path(self, ring):
+        """
+        matplotlib Path of a ring, built on first use.
+        """
+        if self.__paths[ring] is None:
+            import matplotlib.path as mplPath
+
+            self.__paths[ring] = mplPath.Path(self.coords[self.offsets[ring]:self.offsets[ring + 1]])
+
+        return self.__paths[ring]
+
+    def contains_points(self, points):
+        """
+        Find the area containing each point, with holes: an area contains a point when an odd number of its rings do, so
+        a point in a hole belongs to the area filling the hole (an enclave) or to none. When several areas contain a
+        point, the first in file order wins.
+
+        Parameters:
+            points (array like): (n, 2) coordinates in the same coordinate system as the rings.
+
+        Returns:
+            np.array of the first ring (in file order) of the winning area containing each point, -1 where no area
+            contains the point.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype=np.int64)
+
+        inside = np.flatnonzero(((points >= self.bounds[:, :2].min(axis=0)) &
+                                 (points <= self.bounds[:, 2:].max(axis=0))).all(axis=1))
+        cells = self.__cells(points[inside])
+        cells = cells[:, 1] * self.__shape[0] + cells[:, 0]
+
+        # group points by cell
+        order = np.argsort(cells, kind='stable')
+        cells, inside = cells[order], inside[order]
+        splits = np.flatnonzero(np.diff(cells)) + 1
+
+        # every (point, ring) pair where the ring contains the point
+        hit_points = []
+        hit_rings = []
+        for cell, idx in zip(cells[np.append(0, splits)] if len(cells) else [], np.split(inside, splits)):
+            pts = points[idx]
+            for ring in self.__cell_rings[self.__cell_offsets[cell]:self.__cell_offsets[cell + 1]]:
+                x0, y0, x1, y1 = self.bounds[ring]
+                candidates = np.flatnonzero((pts[:, 0] >= x0) & (pts[:, 0] <= x1) & (pts[:, 1] >= y0) & (pts[:, 1] <= y1))
+
+                if len(candidates):
+                    hits = candidates[self.path(ring).contains_points(pts[candidates])]
+                    hit_points.append(idx[hits])
+                    hit_rings.append(np.full(len(hits), ring, dtype=np.int64))
+
+        if not hit_points:
+            return result
+
+        hit_points = np.concatenate(hit_points)
+        hit_rings = np.concatenate(hit_rings)
+
+        # rings containing each point, counted per area. sorted by point, then area, then ring
+        hit_areas = self.__ring_areas[hit_rings]
+        order = np.lexsort((hit_rings, hit_areas, hit_points))
+        hit_points, hit_areas, hit_rings = hit_points[order], hit_areas[order], hit_rings[order]
+
+        first = np.flatnonzero(np.append(True, (hit_points[1:] != hit_points[:-1]) | (hit_areas[1:] != hit_areas[:-1])))
+        counts = np.diff(np.append(first, len(hit_points)))
+        first = first[counts % 2 == 1]
+
+        # the first area with an odd count of each point, through its first ring
+        winners = first[np.append(True, hit_points[first][1:] != hit_points[first][:-1])]
+        result[hit_points[winners]] = hit_rings[winners]
+
+        return result
+
+    def find_areas(self, points):
+        """
+        Area name for each point.
+
+        Parameters:
+            points (array like): (n, 2) coordinates in the same coordinate system as the rings.
+
+        Returns:
+            np.array (object) of area names, None where no area contains the point.
+        """
+        rings = self.contains_points(points)
+
+        names = np.array(self.names + [None], dtype=object)
+
+        return names[rings]
@@ -0,0 +1,222 @@
+import hashlib
+import io
+import math
+import multiprocessing
+import os
+import shutil
+
+import numpy as np
+import matplotlib as mpl
+
+TILE_SIZE = 256
+
+# latitude where web mercator tiles end
+MAX_LAT = math.degrees(math.atan(math.sinh(math.pi)))
+
+# ChoroPie drawing the tiles in this process and the hashes it has already returned
+_MAP = None
+_SENT = set()
+
+
+def tile_bounds(z, x, y):
+    """
+    Corners of a web mercator (slippy map) tile.
+
+    Returns:
+        lon0, lat0, lon1, lat1 of the lower left and upper right corners.
+    """
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360. - 180., lat(y + 1), (x + 1) / n * 360. - 180., lat(y)
+
+
+def tiles_for_bounds(lon0, lat0, lon1, lat1, z):
+    """
+    Every tile of zoom z overlapping a lon, lat box, as (z, x, y) tuples.
+    """
+    n = 2 ** z
+
+    def column(lon):
+        return min(max(int((lon + 180.) / 360. * n), 0), n - 1)
+
+    def row(lat):
+        lat = math.radians(min(max(lat, -MAX_LAT), MAX_LAT))
+        return min(max(int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n), 0), n - 1)
+
+    return [(z, x, y) for x in range(column(lon0), column(lon1) + 1) for y in range(row(lat1), row(lat0) + 1)]
+
+
+def _prepare(m, tile_size, dpi):
+    """
+    Turns a drawn ChoroPie into a tile renderer: the main axes fill a tile sized figure, colorbar and legend are hidden.
+    """
+    for axes in m.fig.axes:
+        if axes is not m.ax:
+            axes.set_visible(False)
+
+    legend = m.ax.get_legend()
+    if legend is not None:
+        legend.set_visible(False)
+
+    m.fig.set_dpi(dpi)
+    m.fig.set_size_inches(tile_size / dpi, tile_size / dpi)
+    m.ax.set_position([0, 0, 1, 1])
+    m.ax.set_axis_off()
+    m.ax.set_aspect('auto')
+
+
+def _background(m):
+    """
+    The rgba8 pixels of the figure and axes backgrounds, which a tile with nothing drawn in it is filled with.
+    """
+    colors = mpl.colors.to_rgba_array([m.fig.get_facecolor(), m.ax.get_facecolor()])
+
+    return np.round(colors * 255).astype(np.uint8)
+
+
+def _init_worker(factory, tile_size, dpi):
+    global _MAP
+
+    if factory is not None:
+        _MAP = factory()
+    _SENT.clear()
+
+    _prepare(_MAP, tile_size, dpi)
+
+
+def _render_tile(args):
+    """
+    Renders one tile with _MAP.
+
+    Returns:
+        tile, sha1 of the png (None for empty tiles) and the png bytes (None for empty tiles and for contents this process
+        returned before).
+    """
+    tile, tile_size, pie_margin = args
+    m = _MAP
+
+    lon0, lat0, lon1, lat1 = tile_bounds(*tile)
+    (x0, x1), (y0, y1) = m.project([lon0, lon1], [lat0, lat1])
+
+    # no shape reaches into the tile
+    if not m.bounds_intersect(x0, y0, x1, y1):
+        return tile, None, None
+
+    m.zoom_to_bounds(x0, y0, x1, y1, cull=True, margin=pie_margin * (x1 - x0) / tile_size)
+    m.fig.canvas.draw()
+
+    # nothing but background. a tile of one color can also lie wholly inside a filled area, which is kept
+    rgba = np.asarray(m.fig.canvas.buffer_rgba())
+    if (rgba == rgba[0, 0]).all() and any((rgba[0, 0] == color).all() for color in _background(m)):
+        return tile, None, None
+
+    buffer = io.BytesIO()
+    mpl.image.imsave(buffer, rgba, format='png')
+    data = buffer.getvalue()
+    digest = hashlib.sha1(data).hexdigest()
+
+    if digest in _SENT:
+        return tile, digest, None
+    _SENT.add(digest)
+
+    return tile, digest, data
+
+
+def render_tiles(out_dir, zooms, choropie=None, factory=None, workers=None, tile_size=TILE_SIZE, dpi=100, pie_margin=64):
+    """
+    Renders web mercator z/x/y png tiles of a map into out_dir/z/x/y.png.
+
+    Tiles are drawn from the projected geometry of the ChoroPie, culled to the shapes and pies reaching into each tile.
+    Tiles no shape reaches into and tiles with nothing but background are skipped. Tiles with the same content are written
+    once and hard linked (copied where links aren't supported).
+
+    Parameters:
+        out_dir (string): directory for the tiles.
+        zooms (iterable): zoom levels to render.
+        choropie (ChoroPie): a drawn map created with projection="merc". with several workers it is shared by forking, which
+            needs the fork start method. it is resized and zoomed for tiles, so pass an instance made for the purpose.
+        factory (function): alternative to choropie. a picklable function without arguments returning a drawn ChoroPie,
+            called once in every worker (and once here for the tile list). pass a cache_dir to ChoroPie so that workers
+            load the projected geometry instead of reading the shp file.
+        workers (int): processes. defaults to the number of cpus, 1 renders in this process.
+        tile_size (int): tile width and height in pixels.
+        dpi (numeric): dpi of the tiles. pie and line sizes are in points, so this sets their size in pixels.
+        pie_margin (numeric): pies centered up to this many pixels outside of a tile are drawn in it.
+
+    Returns:
+        dict with tiles ((z, x, y) tuples as keys, content sha1 as value) and the number of tiles written, linked
+        (duplicate content) and skipped.
+    """
+    global _MAP
+
+    if choropie is None:
+        if factory is None:
+            raise ValueError('pass a ChoroPie or a factory')
+        choropie = factory()
+
+    if choropie.projection != 'merc':
+        raise ValueError('tiles need a ChoroPie created with projection="merc", not "%s"' % choropie.projection)
+
+    workers = os.cpu_count() if workers is None else workers
+
+    tiles = [tile for z in zooms
+             for tile in tiles_for_bounds(choropie.llcrnrlon, choropie.llcrnrlat, choropie.urcrnrlon, choropie.urcrnrlat, z)]
+    jobs = [(tile, tile_size, pie_margin) for tile in tiles]
+
+    result = dict(tiles={}, written=0, linked=0, skipped=0)
+    paths = {}
+
+    def store(tile, digest, data):
+        if digest is None:
+            result['skipped'] += 1
+            return
+
+        path = os.path.join(out_dir, *[str(i) for i in tile]) + '.png'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if digest in paths:
+            try:
+                os.link(paths[digest], path)
+            except OSError:
+                shutil.copyfile(paths[digest], path)
+            result['linked'] += 1
+        else:
+            with open(path, 'wb') as f:
+                f.write(data)
+            paths[digest] = path
+            result['written'] += 1
+
+        result['tiles'][tile] = digest
+
+    if workers <= 1:
+        _MAP = choropie
+        try:
+            _init_worker(None, tile_size, dpi)
+            for job in jobs:
+                store(*_render_tile(job))
+        finally:
+            _MAP = None
+        return result
+
+    if factory is not None:
+        context = multiprocessing.get_context()
+        initargs = (factory, tile_size, dpi)
+    else:
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError('sharing a ChoroPie with workers needs the fork start method, pass a factory instead')
+        context = multiprocessing.get_context('fork')
+        initargs = (None, tile_size, dpi)
+        _MAP = choropie
+
+    try:
+        with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            # contiguous chunks keep neighbouring tiles (and their level of detail) in one worker
+            for tile, digest, data in pool.imap_unordered(_render_tile, jobs, chunksize=max(1, len(jobs) // (workers * 4))):
+                store(tile, digest, data)
+    finally:
+        _MAP = None
+
+    return result
@@ -0,0 +1,62 @@
+import matplotlib
+import numpy as np
+import pytest
+
+matplotlib.use('Agg')
+
+
+def write_shapefile(path, shapes, records, fields=(('NAME', 'C', 40, 0),)):
+    """
+    Write a polygon shp file with pyshp.
+
+    Parameters:
+        path (string): path without extension.
+        shapes (list): rings of every shape, each a list of (lon, lat) vertices.
+        records (list): dbf record of every shape.
+        fields (list of tuples): (name, type, length, decimals) of every dbf column.
+    """
+    import shapefile
+
+    with shapefile.Writer(path, shapeType=shapefile.POLYGON) as writer:
+        for field in fields:
+            writer.field(*field)
+        for rings, record in zip(shapes, records):
+            writer.poly([[list(vertex) for vertex in ring] for ring in rings])
+            writer.record(*record)
+
+    return path
+
+
+def grid_shapes(nx, ny, size=1., origin=(-100., 30.)):
+    """
+    nx x ny squares sharing their edges, every edge split into a few vertices, as closed clockwise rings.
+    """
+    steps = np.linspace(0., size, 4)[:-1]
+    shapes = []
+    for i in range(nx):
+        for j in range(ny):
+            x0, y0 = origin[0] + i * size, origin[1] + j * size
+            ring = ([(x0, y0 + d) for d in steps] + [(x0 + d, y0 + size) for d in steps] +
+                    [(x0 + size, y0 + size - d) for d in steps] + [(x0 + size - d, y0) for d in steps] + [(x0, y0)])
+            shapes.append([ring])
+
+    return shapes
+
+
+@pytest.fixture(scope='session')
+def grid_shp(tmp_path_factory):
+    """
+    12 x 8 grid of one degree squares named A0 ... A95, the last one with a hole shaped second ring.
+    """
+    shapes = grid_shapes(12, 8)
+    x0, y0 = shapes[-1][0][0]
+    shapes[-1].append([(x0 + .25, y0 + .25), (x0 + .75, y0 + .25), (x0 + .75, y0 + .75), (x0 + .25, y0 + .75), (x0 + .25, y0 + .25)])
+    records = [('A%d' % i, i * 1000, i / 8.) for i in range(len(shapes))]
+
+    return write_shapefile(str(tmp_path_factory.mktemp('grid') / 'grid'), shapes, records,
+                           (('NAME', 'C', 40, 0), ('ALAND', 'N', 14, 0), ('SHARE', 'N', 12, 4)))
+
+
+@pytest.fixture(scope='session')
+def basemap_kwargs():
+    return dict(projection='merc', llcrnrlat=25, urcrnrlat=42, llcrnrlon=-105, urcrnrlon=-84)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from choropie import ChoroPie as cp
+from choropie.aggregate import PointAggregator
+from choropie.spatial_index import SpatialIndex
+from conftest import write_shapefile
+
+
+def events(n=5000, seed=3):
+    """
+    Points over the grid shp file and around it, with categories (some missing) and weights.
+    """
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(dict(lon=rng.uniform(-101, -87, n), lat=rng.uniform(29, 39, n),
+                              race=rng.choice(['a', 'b', 'c', None], n, p=[.5, .3, .15, .05]),
+                              weight=rng.uniform(0, 3, n)))
+    frame.loc[:9, 'lat'] = np.nan
+
+    return frame
+
+
+def test_chunks_match_one_pass(tmp_path, grid_shp):
+    frame = events()
+    index = SpatialIndex.from_shapefile(grid_shp, 'NAME')
+    area = pd.Series(index.find_areas(frame[['lon', 'lat']].values), index=frame.index)
+
+    # every point at once, with pandas
+    counts = area.value_counts()
+    by_race = frame.assign(area=area).dropna(subset=['area', 'race']).groupby(['area', 'race']).size()
+    weights = frame.assign(area=area).dropna(subset=['area']).groupby('area')['weight'].sum()
+
+    path = str(tmp_path / 'events.csv')
+    frame.to_csv(path, index=False)
+
+    series = cp.aggregate_points(path, grid_shp, 'NAME', chunksize=700)
+    assert series.dtype == np.int64
+    pd.testing.assert_series_equal(series.sort_index(), counts.sort_index(), check_names=False)
+
+    pies = cp.aggregate_points(path, grid_shp, 'NAME', category='race', chunksize=700, spatial_index=index)
+    pd.testing.assert_series_equal(pies.sort_index(), by_race.sort_index(), check_names=False)
+
+    aggregator = PointAggregator(index).feed((frame.iloc[start:start + 800] for start in range(0, len(frame), 800)),
+                                             weight='weight')
+    pd.testing.assert_series_equal(aggregator.series(drop_empty=True).sort_index(), weights.sort_index(),
+                                   check_names=False)
+    assert aggregator.points == len(frame) and aggregator.unmatched == area.isna().sum()
+    assert len(aggregator.series()) == 96
+
+
+def test_categories_grow_between_chunks(grid_shp):
+    aggregator = PointAggregator(SpatialIndex.from_shapefile(grid_shp, 'NAME'))
+
+    aggregator.add([-99.5], [30.5], ['a'])
+    for category in 'bcdef':
+        aggregator.add([-99.5, -98.5], [30.5, 30.5], [category, 'a'])
+
+    assert aggregator.categories == list('abcdef')
+    pies = aggregator.category_series()
+    assert pies[('A0', 'a')] == 1 and pies[('A8', 'a')] == 5 and pies[('A0', 'f')] == 1
+    assert pies.sum() == 11
+
+
+def test_points_in_an_enclave_count_for_the_enclave(tmp_path):
+    square = lambda x0, y0, size: [(x0, y0), (x0, y0 + size), (x0 + size, y0 + size), (x0 + size, y0), (x0, y0)]
+    shp_file = write_shapefile(str(tmp_path / 'enclave'), [[square(0, 0, 10), square(4, 4, 2)[::-1]], [square(4, 4, 2)]],
+                               [('OUTER',), ('INNER',)])
+
+    series = cp.aggregate_points([([5., 5.1, 1.], [5., 5.2, 1.])], shp_file, 'NAME')
+
+    assert series.to_dict() == dict(OUTER=1, INNER=2)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from choropie import ChoroPie as cp
+
+
+def test_rows_per_ring_and_per_shape(grid_shp):
+    rings = cp.get_shp_attributes(grid_shp)
+    columns = cp.get_shp_attributes(grid_shp, columnar=True)
+
+    # the last shape has two rings
+    assert len(rings) == 97 and len(columns['NAME']) == 96
+    assert [row['NAME'] for row in rings[-2:]] == ['A95', 'A95']
+    assert [row['RINGNUM'] for row in rings[-2:]] == [1, 2]
+    np.testing.assert_array_equal(columns['ALAND'][:3], [0, 1000, 2000])
+
+    part = cp.get_shp_attributes(grid_shp, ['NAME'], slice(94, None), columnar=True)
+    assert list(part) == ['NAME'] and part['NAME'].tolist() == ['A94', 'A95']
+
+
+def test_find_shp_key_from_any_form(grid_shp):
+    index = ['A%d' % i for i in range(0, 96, 3)] + ['B1']
+
+    for shp_lst in (cp.get_shp_attributes(grid_shp), cp.get_shp_attributes(grid_shp, columnar=True), grid_shp):
+        assert cp.find_shp_key(index, shp_lst) == 'NAME'
+        assert cp.rank_shp_keys(index, shp_lst)[0] == ('NAME', 32 / 33)
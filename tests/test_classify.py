@@ -0,0 +1,52 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from choropie import classify
+
+
+def squared_deviations(values, edges):
+    """
+    Sum of squared deviations from the class means, with every class starting at its edge.
+    """
+    classes = np.searchsorted(edges[1:-1], values, 'right')
+    return sum(((values[classes == c] - values[classes == c].mean()) ** 2).sum() for c in np.unique(classes))
+
+
+def brute_force(values, k):
+    """
+    Smallest sum of squared deviations over every split of the sorted unique values into k classes.
+    """
+    unique = np.unique(values)
+    return min(squared_deviations(values, np.concatenate([unique[[0, *starts]], unique[-1:]]))
+               for starts in combinations(range(1, len(unique)), k - 1))
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_fisher_jenks_is_optimal(seed):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.lognormal(0., 1., 14), 1)  # rounded, so values repeat
+    values = np.append(values, values[:3])
+
+    for k in (2, 3, 4, 5):
+        edges = classify.fisher_jenks(values, k)
+
+        assert len(edges) == k + 1 and edges[0] == values.min() and edges[-1] == values.max()
+        assert squared_deviations(values, edges) == pytest.approx(brute_force(values, k), rel=1e-9, abs=1e-12)
+
+
+def test_fisher_jenks_blocks_match_one_block():
+    rng = np.random.default_rng(7)
+    values = np.unique(rng.normal(size=300))
+    weights = rng.integers(1, 4, len(values)).astype(np.float64)
+
+    assert classify._jenks_starts(values, weights, 6, block=7) == classify._jenks_starts(values, weights, 6, block=1000)
+
+
+def test_few_values_and_missing_values():
+    np.testing.assert_array_equal(classify.fisher_jenks([3., 1., np.nan, 3.], 4), [1., 3., 3., 3., 3.])
+    np.testing.assert_array_equal(classify.classify([0, 10, np.nan], 2), [0., 5., 10.])
+
+    with pytest.raises(ValueError):
+        classify.classify([1, 2], 2, 'natural')
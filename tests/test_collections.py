@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+names = ['A%d' % i for i in range(96)]
+
+
+def pie_series(seed=0):
+    """
+    Pies of one to three slices over the grid shp file.
+    """
+    rng = np.random.default_rng(seed)
+    index = [(name, k) for name in names for k in 'abc' if rng.random() < .6] + [('A0', 'a')]
+
+    return pd.Series(rng.uniform(1, 5, len(index)), index=pd.MultiIndex.from_tuples(sorted(set(index))))
+
+
+def rgb(m):
+    m.fig.canvas.draw()
+
+    return np.asarray(m.fig.canvas.buffer_rgba())[..., :3].astype(np.int64)
+
+
+def test_pie_collection_draws_like_scatter(grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    images = []
+    widths = []
+    for use_collection in (False, True):
+        m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True, figsize=(6, 4))
+        m.pie_plot(pie_series(), dict(a='red', b='blue', c='green'), size_data=300, use_collection=use_collection)
+        images.append(rgb(m))
+        widths.append(m.mpl_pie_collection.get_linewidths() if use_collection else
+                      np.concatenate([path.get_linewidths() for paths in m.mpl_paths.values() for path in paths]))
+
+    assert np.unique(widths[0]).tolist() == np.unique(widths[1]).tolist()
+
+    # wedge outlines are as heavy in both, the wedges only differ along their antialiased edges
+    ink = [(255 - image).sum() for image in images]
+    dark = [(image.max(axis=2) < 100).sum() for image in images]
+    assert abs(ink[1] - ink[0]) < .01 * ink[0]
+    assert abs(dark[1] - dark[0]) < .1 * dark[0]
+
+
+def test_choropleth_collection_zooms_and_moves(grid_shp, basemap_kwargs):
+    import matplotlib as mpl
+
+    from choropie.ChoroPie import ChoroPie
+
+    # A5 has no data and gets no path
+    series = pd.Series(np.arange(96.), index=names).drop('A5')
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+    m.choro_plot(4, 'Blues', series, use_collection=True)
+    collection = m.mpl_collection
+    width = mpl.rcParams['patch.linewidth']
+
+    def shown():
+        values, widths = collection.get_array(), np.broadcast_to(collection.get_linewidths(), len(collection.get_paths()))
+        return {name: (not np.ma.getmaskarray(values)[indices].any(), bool((widths[indices] > 0).all()))
+                for name, indices in m.mpl_polygons.items()}
+
+    home = collection.get_array().copy()
+    assert 'A5' not in m.mpl_polygons
+    assert shown() == {name: (True, True) for name in series.index}
+
+    m.zoom_to_area(['A10', 'A95'])
+    assert shown() == {name: (name in ('A10', 'A95'),) * 2 for name in series.index}
+    assert m.mpl_collection is collection
+
+    m.zoom_home()
+    assert shown() == {name: (True, True) for name in series.index}
+    values = collection.get_array()
+    assert not np.ma.getmaskarray(values).any()
+    np.testing.assert_array_equal(values.data, home.data)
+    assert np.unique(collection.get_linewidths()).tolist() == [width]
+
+    # A95 has a hole, both of its paths move
+    m.translate_shapes('A95', 27, -90, scale=2, rotation=30)
+    m.translate_shapes('A10', 40, -102)
+    paths = collection.get_paths()
+    for name in ('A95', 'A10'):
+        rings = m.corr_geometry.rings(name)
+        assert len(rings) == len(m.mpl_polygons[name]) == (2 if name == 'A95' else 1)
+        assert not np.allclose(rings[0], m.geometry.rings(name)[0])
+        for ring, i in zip(rings, m.mpl_polygons[name]):
+            np.testing.assert_allclose(paths[i].vertices[:len(ring)], ring)
+
+    # the others stay where they were
+    ring = m.corr_geometry.rings('A11')[0]
+    np.testing.assert_allclose(paths[m.mpl_polygons['A11'][0]].vertices[:len(ring)], m.geometry.rings('A11')[0])
+    np.testing.assert_allclose(ring, m.geometry.rings('A11')[0])
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from test_collections import pie_series
+
+names = ['A%d' % i for i in range(96)]
+
+
+def shapes(m):
+    """
+    Vertices of every choropleth polygon drawn, by area, whether drawn as patches or into mpl_collection.
+    """
+    if m.mpl_collection is None:
+        return {name: [poly.get_xy() for poly in polys] for name, polys in m.mpl_polygons.items()}
+
+    paths = m.mpl_collection.get_paths()
+
+    return {name: [paths[i].vertices for i in indices] for name, indices in m.mpl_polygons.items()}
+
+
+def shown(m, name):
+    if m.mpl_collection is None:
+        return m.mpl_polygons[name][0].get_visible()
+
+    return not np.ma.getmaskarray(m.mpl_collection.get_array())[m.mpl_polygons[name].start]
+
+
+def assert_drawn_at(m, name):
+    drawn = shapes(m)[name]
+    rings = m.corr_geometry.rings(name)
+    assert len(drawn) == len(rings)
+    for xy, ring in zip(drawn, rings):
+        np.testing.assert_allclose(xy[:len(ring)], ring)
+
+
+@pytest.mark.parametrize('use_collection', [False, True])
+def test_cull_draws_what_is_in_view(grid_shp, basemap_kwargs, use_collection):
+    from choropie.ChoroPie import ChoroPie
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+    m.choro_plot(4, 'Blues', pd.Series(np.arange(96.), index=names), use_collection=use_collection)
+    m.pie_plot(pie_series(), dict(a='red', b='blue', c='green'), size_data=300, use_collection=use_collection)
+    pies = set(m.mpl_paths)
+
+    # A50 (column 6, row 2) and the areas sharing its edges and corners
+    m.zoom_to_area(['A50'], cull=True)
+    x0, x1 = m.ax.get_xlim()
+    y0, y1 = m.ax.get_ylim()
+
+    in_view = [name for name in names for ring in m.corr_geometry.rings(name)
+               if ring[:, 0].min() <= x1 and ring[:, 0].max() >= x0 and ring[:, 1].min() <= y1 and ring[:, 1].max() >= y0]
+    assert sorted(shapes(m)) == sorted(in_view) == sorted('A%d' % (column * 8 + row)
+                                                          for column in (5, 6, 7) for row in (1, 2, 3))
+    assert set(m.mpl_paths) == {'A50'} & pies
+
+    # while culled, translations move drawn areas and are kept for the others
+    m.translate_areas({'A50': (32.5, -93.5, .5), 'A0': (41, -86)})
+    assert_drawn_at(m, 'A50')
+    assert 'A0' not in shapes(m)
+
+    # and recoloring hides areas dropped from the data
+    m.update_color_data(pd.Series(np.arange(96.), index=names).drop(['A0', 'A49']))
+    assert not shown(m, 'A49') and shown(m, 'A50')
+
+    m.zoom_home()
+    assert sorted(shapes(m)) == sorted(names)
+    assert set(m.mpl_paths) == pies
+    assert [name for name in names if not shown(m, name)] == ['A0', 'A49']
+    for name in names:
+        assert_drawn_at(m, name)
+
+    # A0 and A49 come back with data, A0 where it was moved to while culled
+    m.update_color_data(pd.Series(np.arange(96.), index=names))
+    assert all(shown(m, name) for name in names)
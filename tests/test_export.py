@@ -0,0 +1,156 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from choropie import export
+from choropie import poly_functs as sc
+from choropie.geometry import GeometryStore
+from conftest import grid_shapes
+
+
+def decode_topojson(topology):
+    """
+    Polygons of every area of a TopoJSON topology, each a list of rings in map coordinates.
+    """
+    scale, translate = np.array(topology['transform']['scale']), np.array(topology['transform']['translate'])
+    arcs = [np.cumsum(arc, axis=0) * scale + translate for arc in topology['arcs']]
+
+    areas = {}
+    for obj in topology['objects']['areas']['geometries']:
+        polygons = []
+        for polygon in obj.get('arcs', []):
+            rings = []
+            for ring_arcs in polygon:
+                ring = []
+                for arc in ring_arcs:
+                    points = arcs[arc] if arc >= 0 else arcs[~arc][::-1]
+                    ring.extend(points.tolist() if not ring else points[1:].tolist())
+                rings.append(np.array(ring))
+            polygons.append(rings)
+        areas[obj['id']] = polygons
+
+    return areas
+
+
+def same_ring(a, b, atol=1e-9):
+    """
+    True when closed rings a and b hold the same vertices in the same order, from any start and in either direction.
+    """
+    a, b = np.asarray(a)[:-1], np.asarray(b)[:-1]
+    if len(a) != len(b):
+        return False
+
+    return any(np.allclose(np.roll(a, -shift, axis=0), c, rtol=0, atol=atol) for shift in range(len(a)) for c in (b, b[::-1]))
+
+
+def assert_rfc7946(polygons, store_rings, atol=1e-9):
+    """
+    polygons hold the rings of an area once each, every one of them but A5's hole an outer ring of its own polygon,
+    counterclockwise, and holes clockwise.
+    """
+    assert sorted(len(ring) for polygon in polygons for ring in polygon) == sorted(len(ring) for ring in store_rings)
+    for polygon in polygons:
+        assert sc.area_for_polygon(polygon[0]) < 0
+        for hole in polygon[1:]:
+            assert sc.area_for_polygon(hole) > 0
+        for ring in polygon:
+            assert any(same_ring(ring, expected, atol) for expected in store_rings)
+
+
+def grid_store():
+    shapes = grid_shapes(4, 3, size=1., origin=(0., 0.))
+    shapes[5].append([(4 / 3, 7 / 3), (5 / 3, 7 / 3), (5 / 3, 8 / 3), (4 / 3, 8 / 3), (4 / 3, 7 / 3)])  # hole of A5
+    names = ['A%d' % area for area, rings in enumerate(shapes) for ring in rings]
+
+    return GeometryStore.from_rings(names, [ring for rings in shapes for ring in rings])
+
+
+def test_topojson_round_trip():
+    store = grid_store()
+    properties = {'A3': dict(bin=1)}
+    points = [('A3', 2 / 3, 3., dict(fractions=[.5, .5]))]
+
+    f = io.StringIO()
+    # the grid of 1 / 3 steps over 0 ... 4 lands on whole quantized positions
+    export.write_topojson(f, store, properties, points, quantization=37, metadata=dict(scheme='quantiles'))
+    topology = json.loads(f.getvalue())
+
+    assert topology['choropie'] == dict(scheme='quantiles')
+    assert topology['bbox'] == [0., 0., 4., 3.]
+
+    # one arc per edge of the grid, shared edges written once and the outer ones joined at the 4 corners, and the hole
+    assert len(topology['arcs']) == (4 * 4 + 5 * 3) - 4 + 1
+    used = [arc if arc >= 0 else ~arc for obj in topology['objects']['areas']['geometries'] for polygon in obj['arcs']
+            for ring in polygon for arc in ring]
+    assert sorted(set(used)) == list(range(len(topology['arcs'])))
+
+    areas = decode_topojson(topology)
+    assert list(areas) == store.names
+    for name in store.names:
+        assert_rfc7946(areas[name], store.rings(name))
+    assert [len(polygon) for polygon in areas['A5']] == [2]
+
+    objects = topology['objects']
+    assert objects['areas']['geometries'][3]['properties'] == dict(bin=1)
+    pie, = objects['pies']['geometries']
+    scale, translate = topology['transform']['scale'], topology['transform']['translate']
+    assert pie['id'] == 'A3' and pie['properties'] == dict(fractions=[.5, .5])
+    np.testing.assert_allclose(np.multiply(pie['coordinates'], scale) + translate, [2 / 3, 3.])
+
+
+def test_holes_go_with_the_outer_ring_around_them():
+    square = lambda x0, y0, size: [(x0, y0), (x0, y0 + size), (x0 + size, y0 + size), (x0 + size, y0), (x0, y0)]
+
+    # two clockwise islands, the second inside the hole of the first, each with a counterclockwise hole, and a hole
+    # outside both
+    rings = [square(0, 0, 10), square(2, 2, 6)[::-1], square(3, 3, 4), square(4, 4, 2)[::-1], square(20, 0, 1)[::-1]]
+    coords, offsets = sc.flatten_rings(rings)
+    areas = sc.areas_for_rings(coords, offsets)
+
+    polygons = export._polygons(coords, offsets, [0, 1, 2, 3, 4], areas)
+    assert polygons == [[(0, True), (1, True)], [(2, True), (3, True)], [(4, False)]]
+
+    # rings wound the other way round get the same polygons, and are already wound right
+    coords, offsets = sc.flatten_rings([ring[::-1] for ring in rings])
+    assert export._polygons(coords, offsets, [0, 1, 2, 3, 4], sc.areas_for_rings(coords, offsets)) == \
+        [[(0, False), (1, False)], [(2, False), (3, False)], [(4, True)]]
+
+
+def test_geojson_round_trip():
+    store = grid_store()
+
+    f = io.StringIO()
+    export.write_geojson(f, store, points=[('A0', .5, .5, {})])
+    features = json.loads(f.getvalue())['features']
+
+    assert [feature['id'] for feature in features] == store.names + ['A0']
+    for feature, name in zip(features, store.names):
+        polygons = feature['geometry']['coordinates']
+        assert_rfc7946([[np.array(ring) for ring in polygon] for polygon in polygons], store.rings(name), atol=0)
+    assert [len(polygon) for polygon in features[5]['geometry']['coordinates']] == [2]
+    assert features[-1]['geometry'] == dict(type='Point', coordinates=[.5, .5])
+
+
+def test_choropie_export_topojson(tmp_path, grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+    names = ['A%d' % i for i in range(96)]
+    m.choro_plot(4, 'Blues', pd.Series(np.arange(96.), index=names))
+    m.translate_shapes('A5', 40, -90)
+
+    path = str(tmp_path / 'map.json')
+    m.export_topojson(path, quantization=1e6)
+    with open(path) as f:
+        topology = json.load(f)
+    areas = decode_topojson(topology)
+
+    # moved A5 comes back where it was moved to
+    atol = max(topology['transform']['scale'])
+    for name in ('A0', 'A5', 'A95'):
+        assert_rfc7946(areas[name], m.corr_geometry.rings(name), atol)
+    assert [len(polygon) for polygon in areas['A95']] == [2]
+
+    assert topology['objects']['areas']['geometries'][95]['properties']['bin'] == 3
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from choropie import poly_functs as sc
+from choropie.geometry import GeometryStore, ShapeList
+
+
+def test_from_rings_groups_the_rings_of_each_area():
+    rings = [[(0, 0), (0, 1), (1, 0)], [(5, 5), (5, 6), (6, 5)], [(2, 2), (2, 3), (3, 2), (2, 2)]]
+    store = GeometryStore.from_rings(['a', 'b', 'a'], rings)
+
+    assert store.names == ['a', 'b']
+    assert store.file_rings.tolist() == [0, 2, 1]
+    assert [ring.tolist() for ring in store.rings('a')] == [[[0, 0], [0, 1], [1, 0]], [[2, 2], [2, 3], [3, 2], [2, 2]]]
+    np.testing.assert_array_equal(store.ring_bounds('b'), [[5, 5, 6, 6]])
+
+    coords, offsets = sc.flatten_rings([rings[0], rings[2], rings[1]])
+    np.testing.assert_array_equal(store.centroids(), sc.largest_ring_centroids(coords, offsets, [0, 2, 3]))
+
+
+def test_shape_list_is_a_read_only_view():
+    store = GeometryStore.from_rings(['a', 'b'], [[(0, 0), (0, 1), (1, 0)], [(5, 5), (5, 6), (6, 5)]])
+    shapes = ShapeList(store.ring_names(), store)
+
+    assert len(shapes) == 2
+    name, ring = shapes[-1]
+    assert name == 'b' and ring.tolist() == [[5, 5], [5, 6], [6, 5]]
+    assert [name for name, ring in shapes] == ['a', 'b']
+    assert len(shapes[:1]) == 1
+
+    with pytest.raises(TypeError):
+        shapes[0] = ('a', ring)
+    with pytest.raises(ValueError):
+        ring[0] = 1.
+    with pytest.raises(IndexError):
+        shapes[2]
+
+    # later writes to the store show through
+    store.vertices[3] = (7, 7)
+    assert shapes[1][1][0].tolist() == [7, 7]
+
+
+def test_choropie_corr_shapes_follow_translations(grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+    ring = m.indexer['A5']
+    before = m.corr_shapes[ring][1].copy()
+
+    m.translate_shapes('A5', 40, -90)
+
+    assert m.corr_shapes[ring][0] == 'A5'
+    assert not np.array_equal(m.corr_shapes[ring][1], before)
+    np.testing.assert_array_equal(m.shapes[ring][1], before)
+    with pytest.raises(TypeError):
+        m.corr_shapes[ring] = ('A5', before)
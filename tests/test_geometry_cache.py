@@ -0,0 +1,50 @@
+import numpy as np
+
+from choropie import geometry_cache
+
+
+def test_cache_key_covers_dtype_and_backend(tmp_path, grid_shp, basemap_kwargs):
+    paths = {geometry_cache.cache_path(str(tmp_path), grid_shp, 'NAME', basemap_kwargs, dtype, backend)
+             for dtype in (np.float64, np.float32) for backend in ('numpy', 'basemap')}
+
+    assert len(paths) == 4
+    assert geometry_cache.cache_path(str(tmp_path), grid_shp, 'NAME', basemap_kwargs) == \
+        geometry_cache.cache_path(str(tmp_path), grid_shp, 'NAME', dict(basemap_kwargs), 'float64', 'numpy')
+    assert geometry_cache.cache_path(str(tmp_path), grid_shp, 'NAME', basemap_kwargs) != \
+        geometry_cache.cache_path(str(tmp_path), grid_shp, 'GEOID', basemap_kwargs)
+
+
+def test_choropie_reuses_only_matching_entries(tmp_path, grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    first = ChoroPie(basemap_kwargs, grid_shp, 'NAME', cache_dir=str(tmp_path), headless=True)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    again = ChoroPie(basemap_kwargs, grid_shp, 'NAME', cache_dir=str(tmp_path), headless=True, profile=True)
+    assert 'project' not in again.stats.totals()
+    np.testing.assert_array_equal(again.geometry.vertices, first.geometry.vertices)
+    assert again.area_info == first.area_info
+
+    single = ChoroPie(basemap_kwargs, grid_shp, 'NAME', cache_dir=str(tmp_path), headless=True, dtype=np.float32)
+    assert single.geometry.vertices.dtype == np.float32
+    ChoroPie(basemap_kwargs, grid_shp, 'NAME', cache_dir=str(tmp_path), headless=True, projection_backend='basemap')
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_lod_errors_are_cached(tmp_path, grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    plain = ChoroPie(basemap_kwargs, grid_shp, 'NAME', cache_dir=str(tmp_path), headless=True)
+    path, = tmp_path.iterdir()
+    assert geometry_cache.load(str(path))['lod_errors'] is None
+
+    # a run with lod adds them to the entry without lod, later runs read them
+    first = ChoroPie(basemap_kwargs, grid_shp, 'NAME', cache_dir=str(tmp_path), headless=True, lod=[.1], profile=True)
+    assert 'simplify' in first.stats.totals()
+    errors = geometry_cache.load(str(path))['lod_errors']
+    assert errors.shape == (len(plain.geometry.vertices),)
+
+    again = ChoroPie(basemap_kwargs, grid_shp, 'NAME', cache_dir=str(tmp_path), headless=True, lod=[.1], profile=True)
+    assert 'simplify' not in again.stats.totals()
+    for a, b in zip(again.mpl_bounds.get_segments(), first.mpl_bounds.get_segments()):
+        np.testing.assert_array_equal(a, b)
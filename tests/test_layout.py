@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from choropie import layout
+
+
+def county_pies(n=3000, scale=1., seed=1):
+    """
+    n pie centers in points spread like counties over a 12 x 7 inch figure, with the radius pie_plot gives the default
+    size_data.
+    """
+    rng = np.random.default_rng(seed)
+    xy = np.column_stack([rng.beta(3, 2, n) * 864., rng.beta(2, 2, n) * 504.])
+
+    return xy, np.full(n, np.sqrt(1000.) / 2 * scale) * rng.uniform(.8, 1.2, n)
+
+
+def assert_laid_out(xy, radii, padding, new, moved):
+    crowded = np.zeros(len(xy), dtype=bool)
+    i, j = layout.overlapping_pairs(xy, radii, padding)[:2]
+    crowded[i] = crowded[j] = True
+
+    # pies not crowded at the start keep their positions, the crowded ones that stayed put are the ones with no room
+    np.testing.assert_array_equal(new[~moved], xy[~moved])
+    assert not moved[~crowded].any()
+
+    placed = moved | ~crowded
+    i, j, overlap = layout.overlapping_pairs(new[placed], radii[placed], padding)
+    assert overlap.max(initial=0.) < 1e-6
+
+    return placed
+
+
+def test_place_circles_is_collision_free():
+    rng = np.random.default_rng(4)
+    for padding in (0., 2.):
+        xy = rng.uniform(0, [300., 200.], (400, 2))
+        xy[:20] = xy[20]  # a stack sharing one center
+        radii = rng.uniform(2., 9., len(xy))
+
+        new, moved = layout.place_circles(xy, radii, padding)
+        assert moved.any()
+        assert_laid_out(xy, radii, padding, new, moved)
+        assert layout.overlapping_pairs(new, radii, padding)[2].max(initial=0.) < 1e-6
+
+        # circles with no room within max_distance stay put
+        new, moved = layout.place_circles(xy, radii, padding, max_distance=3.)
+        placed = assert_laid_out(xy, radii, padding, new, moved)
+        assert not placed.all() and (np.hypot(*(new - xy).T) <= 3. + 1e-9).all()
+
+
+def test_place_circles_moves_crowded_circles_as_little_as_it_can():
+    xy = np.array([[0., 0.], [3., 0.], [100., 100.]])
+    new, moved = layout.place_circles(xy, np.array([2., 1., 5.]), padding=1.)
+
+    assert moved.tolist() == [False, True, False]
+    np.testing.assert_allclose(new[1], [4., 0.])
+
+
+def test_place_circles_clears_every_overlap_when_the_pies_fit():
+    # pies cover a fifth of the figure, but the middle is too crowded for all of them to fit near their starts
+    xy, radii = county_pies(scale=.2)
+
+    start = time.perf_counter()
+    new, moved = layout.place_circles(xy, radii, 2.)
+    assert time.perf_counter() - start < 2.
+
+    assert_laid_out(xy, radii, 2., new, moved)
+    assert layout.overlapping_pairs(new, radii, 2.)[2].max(initial=0.) < 1e-6
+    assert np.hypot(*(new - xy).T).max() > 8 * (2. * radii.max() + 2.)
+
+
+def test_place_circles_stops_when_the_map_is_full():
+    # several times more pie than figure
+    xy, radii = county_pies(scale=1.)
+
+    start = time.perf_counter()
+    new, moved = layout.place_circles(xy, radii, 2.)
+    assert time.perf_counter() - start < 2.
+
+    placed = assert_laid_out(xy, radii, 2., new, moved)
+    assert 0 < moved.sum() and not placed.all()
+
+    # the ones left where they started had nowhere to go on the map, and a wider limit changes nothing
+    np.testing.assert_array_equal(layout.place_circles(xy, radii, 2., max_distance=1e4)[0], new)
+
+
+def test_choropie_layout_pies(grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+    names = ['A%d' % i for i in range(96)]
+    pie_data = pd.Series(1., index=pd.MultiIndex.from_tuples([(name, k) for name in names for k in 'ab']))
+    m.pie_plot(pie_data, dict(a='red', b='blue'), size_data=8000)
+    start = dict(m.corr_centroids)
+
+    moved = m.layout_pies(padding=1, leader_min=0)
+    assert moved and set(moved) == {name for name in names if m.corr_centroids[name] != start[name]}
+    assert set(moved) <= set(m.annotations)
+
+    # every call starts over from where pie_plot put the pies
+    assert m.layout_pies(padding=1, leader_min=0) == moved
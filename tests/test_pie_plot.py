@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+names = ['A%d' % i for i in range(96)]
+
+
+def reference_pies(pie_data, size_data, size_ratios, scale_factor_size=1, scale_factor_ratios=1 / 2):
+    """
+    Slices (category, ratio, size) of every pie, area by area with pandas, the way pie_plot has always drawn them: ratios of
+    the area sum sorted ascending, sizes from size_data normalized over the whole series and weighted by the share of each
+    slice in the area's size_ratios (pies of one slice and pairs missing from size_ratios are not weighted).
+    """
+    if isinstance(size_data, pd.Series):
+        size_data = size_data ** scale_factor_size
+        size_data = size_data / size_data.sum() * len(size_data) * 1500
+    if size_ratios is not None:
+        size_ratios = size_ratios ** scale_factor_ratios
+
+    pies = {}
+    for name in names:
+        if name not in pie_data.index.get_level_values(0):
+            continue
+        if isinstance(size_data, pd.Series) and name not in size_data.index:
+            continue
+        size = size_data[name] if isinstance(size_data, pd.Series) else size_data
+
+        ratios = (pie_data[name] / pie_data[name].sum()).sort_values(kind='stable')
+        sizes = pd.Series(float(size), index=ratios.index)
+        if size_ratios is not None and len(ratios) > 1 and name in size_ratios.index.get_level_values(0):
+            area_ratios = size_ratios[name]
+            weighted = ratios.index.intersection(area_ratios.index)
+            sizes[weighted] *= area_ratios[weighted] / area_ratios.sum() * 2 + .5
+
+        pies[name] = (list(ratios.index), ratios.values, sizes.values)
+
+    return pies
+
+
+@pytest.fixture(scope='module')
+def pie_inputs():
+    rng = np.random.default_rng(11)
+
+    # categories missing from most areas, areas of a single slice, areas without pies and an area not on the map
+    index = [(name, k) for name in names[:80] for k in 'abcd' if rng.random() < .6]
+    index += [('A90', 'c'), ('A91', 'a'), ('ZZ', 'a'), ('ZZ', 'b')]
+    pie_data = pd.Series(rng.uniform(1, 10, len(index)), index=pd.MultiIndex.from_tuples(index))
+
+    # size data for most areas only, and for the area off the map
+    size_data = pd.Series(rng.uniform(10, 1000, 90), index=names[5:95]).drop(['A40', 'A41'])
+    size_data['ZZ'] = 500.
+
+    # size ratios for some of the pairs only
+    pairs = [pair for pair in index if rng.random() < .7]
+    size_ratios = pd.Series(rng.uniform(1, 50, len(pairs)), index=pd.MultiIndex.from_tuples(pairs))
+
+    return pie_data, size_data, size_ratios
+
+
+@pytest.mark.parametrize('sized', [False, True])
+@pytest.mark.parametrize('ratioed', [False, True])
+def test_pies_match_pandas(grid_shp, basemap_kwargs, pie_inputs, sized, ratioed):
+    from choropie.ChoroPie import ChoroPie
+
+    pie_data, size_data, size_ratios = pie_inputs
+    size_data = size_data if sized else 800
+    size_ratios = size_ratios if ratioed else None
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+    m.pie_plot(pie_data, dict(a='red', b='blue', c='green', d='grey'), size_data=size_data, scale_factor_size=.8,
+               size_ratios=size_ratios, scale_factor_ratios=.7)
+    pies = m._ChoroPie__pies
+
+    expected = reference_pies(pie_data, size_data, size_ratios, .8, .7)
+    assert sorted(pies) == sorted(expected)
+    assert len(pies['A90'][2]) == len(pies['A91'][2]) == 1
+    if sized:  # areas without size data get no pie
+        assert not {'A0', 'A40', 'A41'} & set(pies)
+    else:
+        assert {'A0', 'A40', 'A41'} <= set(pies)
+    for name, (categories, ratios, sizes) in expected.items():
+        x, y, pie_categories, pie_ratios, pie_sizes = pies[name]
+        assert (x, y) == m.corr_centroids[name]
+        assert list(pie_categories) == categories
+        np.testing.assert_allclose(pie_ratios, ratios, rtol=1e-12)
+        np.testing.assert_allclose(pie_sizes, sizes, rtol=1e-12)
+
+    assert set(m.mpl_paths) == set(expected)
@@ -0,0 +1,88 @@
+import numpy as np
+
+from choropie import poly_functs as sc
+
+
+def loop_area(polygon):
+    """
+    area_for_polygon before it was vectorized.
+    """
+    result = 0
+    imax = len(polygon) - 1
+    for i in range(0, imax):
+        result += (polygon[i][1] * polygon[i + 1][0]) - (polygon[i + 1][1] * polygon[i][0])
+    result += (polygon[imax][1] * polygon[0][0]) - (polygon[0][1] * polygon[imax][0])
+    return result / 2.
+
+
+def loop_centroid(polygon):
+    """
+    centroid_for_polygon before it was vectorized.
+    """
+    area = loop_area(polygon)
+    imax = len(polygon) - 1
+
+    result_x = 0
+    result_y = 0
+    for i in range(0, imax):
+        result_x += (polygon[i][1] + polygon[i + 1][1]) * ((polygon[i][1] * polygon[i + 1][0]) - (polygon[i + 1][1] * polygon[i][0]))
+        result_y += (polygon[i][0] + polygon[i + 1][0]) * ((polygon[i][1] * polygon[i + 1][0]) - (polygon[i + 1][1] * polygon[i][0]))
+    result_x += (polygon[imax][1] + polygon[0][1]) * ((polygon[imax][1] * polygon[0][0]) - (polygon[0][1] * polygon[imax][0]))
+    result_y += (polygon[imax][0] + polygon[0][0]) * ((polygon[imax][1] * polygon[0][0]) - (polygon[0][1] * polygon[imax][0]))
+    result_x /= (area * 6.0)
+    result_y /= (area * 6.0)
+
+    return result_y, result_x
+
+
+def random_rings(rng, n_rings):
+    """
+    Star shaped rings of 3 to 200 vertices around random centers, closed or not, clockwise or counterclockwise.
+    """
+    rings = []
+    for _ in range(n_rings):
+        n = int(rng.integers(3, 200))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+        if rng.random() < .5:
+            angles = angles[::-1]
+        radii = rng.uniform(.2, 1., n) * rng.uniform(.01, 100.)
+        ring = rng.uniform(-180, 180, 2) + np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+        if rng.random() < .5:
+            ring = np.vstack([ring, ring[:1]])
+        rings.append([tuple(vertex) for vertex in ring.tolist()])
+
+    return rings
+
+
+def test_kernels_match_loops_on_many_rings():
+    rings = random_rings(np.random.default_rng(0), 300)
+    coords, offsets = sc.flatten_rings(rings)
+
+    areas = sc.areas_for_rings(coords, offsets)
+    centroids = sc.centroids_for_rings(coords, offsets)
+
+    np.testing.assert_allclose(areas, [loop_area(ring) for ring in rings], rtol=1e-12)
+    np.testing.assert_allclose(centroids, [loop_centroid(ring) for ring in rings], rtol=1e-12, atol=1e-9)
+
+
+def test_polygon_wrappers_match_loops():
+    for ring in random_rings(np.random.default_rng(1), 20):
+        assert np.isclose(sc.area_for_polygon(ring), loop_area(ring), rtol=1e-12)
+        np.testing.assert_allclose(sc.centroid_for_polygon(ring), loop_centroid(ring), rtol=1e-12, atol=1e-9)
+
+
+def test_largest_ring_centroids_of_multi_ring_areas():
+    rng = np.random.default_rng(2)
+    rings = random_rings(rng, 200)
+    coords, offsets = sc.flatten_rings(rings)
+
+    # areas of 1 to 5 consecutive rings
+    area_offsets = np.unique(np.concatenate([[0], np.cumsum(rng.integers(1, 6, 200)), [200]]))
+    area_offsets = area_offsets[area_offsets <= 200]
+
+    expected = []
+    for start, end in zip(area_offsets[:-1], area_offsets[1:]):
+        areas = [loop_area(ring) for ring in rings[start:end]]
+        expected.append(loop_centroid(rings[start + int(np.argmax(areas))]))
+
+    np.testing.assert_allclose(sc.largest_ring_centroids(coords, offsets, area_offsets), expected, rtol=1e-12, atol=1e-9)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from choropie import preprocess, projections
+from choropie.geometry import GeometryStore
+
+
+def jittered_store(seed=0, n_areas=40):
+    """
+    GeometryStore of irregular rings, some areas with several, of uneven sizes.
+    """
+    rng = np.random.default_rng(seed)
+    names = []
+    rings = []
+    for area in range(n_areas):
+        for ring in range(area % 3 + 1):
+            n = int(rng.integers(4, 200))
+            angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+            center = rng.uniform([-120, 25], [-70, 48])
+            xy = center + rng.uniform(.2, 1., n)[:, None] * np.column_stack([np.cos(angles), np.sin(angles)])
+            rings.append(np.vstack([xy, xy[:1]]).tolist())
+            names.append('a%d' % area)
+
+    return GeometryStore.from_rings(names, rings)
+
+
+def test_parallel_matches_serial():
+    store = jittered_store()
+    projector = projections.from_basemap_kwargs(dict(projection='lcc', llcrnrlon=-121, llcrnrlat=24, urcrnrlon=-65,
+                                                     urcrnrlat=51, lat_1=33, lat_2=45, lon_0=-95))
+
+    serial = preprocess.project(projector, store.vertices, 1)
+    for workers in (2, 3):
+        np.testing.assert_array_equal(preprocess.project(projector, store.vertices, workers), serial)
+
+    centroids, bounds = preprocess.centroids_and_bounds(store, 1)
+    for workers in (2, 3):
+        parallel = preprocess.centroids_and_bounds(store, workers)
+        np.testing.assert_array_equal(parallel[0], centroids)
+        np.testing.assert_array_equal(parallel[1], bounds)
+
+
+def test_resolve_workers():
+    big = preprocess.MIN_VERTICES
+
+    assert preprocess.resolve_workers(4, big - 1) == 1
+    assert preprocess.resolve_workers(None, big) == 1
+    assert preprocess.resolve_workers(4, big) == 4
+    assert preprocess.resolve_workers(-1, big) >= 1
+
+
+def test_choropie_workers_give_the_same_map(monkeypatch, grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    serial = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+
+    monkeypatch.setattr(preprocess, 'MIN_VERTICES', 0)
+    parallel = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True, workers=2)
+
+    np.testing.assert_array_equal(parallel.geometry.vertices, serial.geometry.vertices)
+    assert parallel.centroids == serial.centroids
+    assert parallel.area_info == serial.area_info
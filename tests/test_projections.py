@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from mpl_toolkits.basemap import Basemap
+
+from choropie import projections
+
+MAPS = [dict(projection='cyl', llcrnrlat=25, urcrnrlat=42, llcrnrlon=-105, urcrnrlon=-84),
+        dict(projection='merc', llcrnrlat=25, urcrnrlat=42, llcrnrlon=-105, urcrnrlon=-84, lat_ts=30),
+        dict(projection='merc', llcrnrlat=-40, urcrnrlat=10, llcrnrlon=170, urcrnrlon=230, ellps='WGS84'),
+        dict(projection='lcc', llcrnrlat=22, urcrnrlat=48, llcrnrlon=-118, urcrnrlon=-64, lat_1=33, lat_2=45, lon_0=-95),
+        dict(projection='lcc', llcrnrlat=22, urcrnrlat=48, llcrnrlon=-118, urcrnrlon=-64, lat_0=40, lon_0=-95,
+             ellps='GRS80'),
+        dict(projection='tmerc', llcrnrlat=35, urcrnrlat=45, llcrnrlon=-80, urcrnrlon=-68, lat_0=40, lon_0=-74)]
+
+
+def lonlat_grid(kwargs, n=25):
+    lon, lat = np.meshgrid(np.linspace(kwargs['llcrnrlon'], kwargs['urcrnrlon'], n),
+                           np.linspace(kwargs['llcrnrlat'], kwargs['urcrnrlat'], n))
+
+    return lon.ravel(), lat.ravel()
+
+
+@pytest.mark.parametrize('kwargs', MAPS, ids=lambda kwargs: kwargs['projection'])
+def test_matches_basemap(kwargs):
+    basemap = Basemap(**kwargs)
+    lon, lat = lonlat_grid(kwargs)
+    expected = basemap(lon, lat)
+
+    for proj in (projections.from_basemap_kwargs(kwargs), projections.from_basemap(basemap)):
+        assert isinstance(proj, projections.Projection)
+        x, y = proj(lon, lat)
+        np.testing.assert_allclose(x, expected[0], rtol=0, atol=1e-4)
+        np.testing.assert_allclose(y, expected[1], rtol=0, atol=1e-4)
+
+        back = proj(x, y, inverse=True)
+        np.testing.assert_allclose(back[0], lon, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(back[1], lat, rtol=0, atol=1e-9)
+
+    assert proj(lon[3], lat[3]) == (float(x[3]), float(y[3]))
+
+
+def test_width_and_height_fall_back_to_basemap():
+    kwargs = dict(projection='lcc', width=2e6, height=1.5e6, lat_1=33, lat_2=45, lat_0=40, lon_0=-95)
+    lon, lat = np.array([-100., -95., -90.]), np.array([38., 40., 42.])
+
+    proj = projections.from_basemap_kwargs(kwargs)
+    np.testing.assert_allclose(proj(lon, lat), Basemap(**kwargs)(lon, lat), rtol=0, atol=1e-4)
+
+    kwargs = dict(projection='ortho', lat_0=40, lon_0=-95)
+    proj = projections.from_basemap_kwargs(kwargs)
+    assert isinstance(proj, projections.BasemapProjection)
+    np.testing.assert_allclose(proj(lon, lat), Basemap(**kwargs)(lon, lat), rtol=0, atol=1e-4)
+
+
+def test_projection_is_abstract():
+    with pytest.raises(TypeError):
+        projections.Projection(1.)
@@ -0,0 +1,112 @@
+import datetime
+
+import numpy as np
+import pytest
+import shapefile
+
+from choropie import shp_reader
+from choropie.shp_reader import ShpReader
+
+FIELDS = (('NAME', 'C', 20, 0), ('COUNT', 'N', 8, 0), ('SHARE', 'N', 10, 3), ('RATE', 'F', 12, 4), ('DAY', 'D', 8, 0),
+          ('FLAG', 'L', 1, 0))
+
+RECORDS = [('Åland', 1, 1.5, .25, datetime.date(2020, 1, 2), True),
+           ('  padded', None, None, None, None, None),
+           ('c', -7, 2.25, 1e3, datetime.date(1999, 12, 31), False),
+           ('null shape', 3, .5, 0., None, True),
+           ('', 12345678, -1.125, -2.5, datetime.date(2001, 6, 30), False)]
+
+
+@pytest.fixture(scope='module')
+def odd_shp(tmp_path_factory):
+    """
+    Polygons with several parts, a null shape and every dbf column type, with missing values, written by pyshp.
+    """
+    rng = np.random.default_rng(5)
+    path = str(tmp_path_factory.mktemp('odd') / 'odd')
+
+    with shapefile.Writer(path, shapeType=shapefile.POLYGON) as writer:
+        for field in FIELDS:
+            writer.field(*field)
+        for number, record in enumerate(RECORDS):
+            if record[0] == 'null shape':
+                writer.null()
+            else:
+                parts = []
+                for part in range(number % 3 + 1):
+                    ring = (rng.uniform(-120, -70, 2) + rng.uniform(-1, 1, (rng.integers(3, 12), 2))).tolist()
+                    parts.append(ring + ring[:1])
+                writer.poly(parts)
+            writer.record(*record)
+
+    return path
+
+
+def test_geometry_matches_pyshp(odd_shp):
+    reader = ShpReader(odd_shp)
+    ref = shapefile.Reader(odd_shp)
+
+    assert reader.shape_type == ref.shapeType and reader.n_shapes == len(ref)
+    np.testing.assert_allclose(reader.bbox, ref.bbox)
+
+    points, ring_offsets, shape_offsets = reader.rings()
+    assert reader.ring_counts().tolist() == [len(shape.parts) for shape in ref.shapes()]
+
+    for number, shape in enumerate(ref.shapes()):
+        parts, shape_points = reader.shape(number)
+        assert parts.tolist() == list(shape.parts)
+        np.testing.assert_array_equal(shape_points, np.array(shape.points).reshape(-1, 2))
+
+        starts = list(shape.parts) + [len(shape.points)]
+        rings = [np.array(shape.points[a:b]) for a, b in zip(starts[:-1], starts[1:])]
+        ours = [points[ring_offsets[ring]:ring_offsets[ring + 1]]
+                for ring in range(shape_offsets[number], shape_offsets[number + 1])]
+        assert len(ours) == len(rings)
+        for ring, expected in zip(ours, rings):
+            np.testing.assert_array_equal(ring, expected)
+
+
+def test_records_match_pyshp(odd_shp):
+    reader = ShpReader(odd_shp)
+    ref = shapefile.Reader(odd_shp)
+    names = [field[0] for field in ref.fields[1:]]
+
+    assert [tuple(field[:2]) for field in reader.fields] == [tuple(field[:2]) for field in ref.fields[1:]]
+    assert reader.records() == [dict(zip(names, record)) for record in ref.records()]
+    assert reader.records(['RATE', 'NAME'], [4, 0]) == [dict(RATE=ref.record(row)['RATE'], NAME=ref.record(row)['NAME'])
+                                                       for row in (4, 0)]
+
+    with pytest.raises(KeyError):
+        reader.table(['NAME', 'POP'])
+
+
+def test_table_columns(odd_shp):
+    table = ShpReader(odd_shp).table()
+
+    assert table['NAME'].tolist() == ['Åland', 'padded', 'c', 'null shape', '']
+    assert table['COUNT'].dtype == np.float64
+    np.testing.assert_array_equal(table['COUNT'], [1, np.nan, -7, 3, 12345678])
+    np.testing.assert_array_equal(table['SHARE'], [1.5, np.nan, 2.25, .5, -1.125])
+    assert table['DAY'].dtype == np.dtype('datetime64[D]') and np.isnat(table['DAY'][[1, 3]]).all()
+    assert table['DAY'][4] == np.datetime64('2001-06-30')
+    assert table['FLAG'].tolist() == [True, None, False, True, False]
+
+    rows = np.array([True, False, True, False, False])
+    assert ShpReader(odd_shp).table(['COUNT'], rows)['COUNT'].dtype == np.int64
+
+
+def test_read_lonlat_matches_basemap(grid_shp):
+    from mpl_toolkits.basemap import Basemap
+
+    basemap = Basemap(projection='cyl', llcrnrlat=25, urcrnrlat=42, llcrnrlon=-105, urcrnrlon=-84)
+    basemap.readshapefile(grid_shp, 'area', drawbounds=False)
+
+    lonlat, ring_offsets, area_info = shp_reader.read_lonlat(grid_shp)
+
+    assert area_info == basemap.area_info
+    assert len(ring_offsets) == len(basemap.area) + 1
+    for ring, expected in enumerate(basemap.area):
+        np.testing.assert_array_equal(lonlat[ring_offsets[ring]:ring_offsets[ring + 1]], expected)
+
+    with pytest.raises(IOError):
+        shp_reader.read_lonlat(grid_shp + '_missing')
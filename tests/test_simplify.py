@@ -0,0 +1,114 @@
+import numpy as np
+
+from choropie import poly_functs as sc
+
+
+def wavy_border(n=60):
+    """
+    Shared border from (0, 0) to (0, 10), wobbling in x.
+    """
+    y = np.linspace(0., 10., n)
+    x = .4 * np.sin(y * 2.3) + .05 * np.cos(y * 17.)
+
+    return [tuple(vertex) for vertex in np.column_stack([x, y]).tolist()]
+
+
+def close(ring, start=0):
+    """
+    Closed ring walking ring from its start-th vertex.
+    """
+    ring = ring[start:] + ring[:start]
+
+    return ring + ring[:1]
+
+
+def kept(rings, tolerance, fixed=True):
+    coords, offsets = sc.flatten_rings(rings)
+    junctions = sc.ring_junctions(coords, offsets) if fixed else None
+    keep = sc.simplify_rings(coords, offsets, tolerance, fixed=junctions)
+
+    return [set(map(tuple, coords[start:end][keep[start:end]].tolist())) for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def test_shared_border_keeps_the_same_vertices_from_both_sides():
+    border = wavy_border()
+    left = border + [(-5., 10.), (-5., 0.)]
+    right = border[::-1] + [(5., 0.), (5., 10.)]
+
+    shared = set(border)
+    for tolerance in (.01, .05, .2, 1.):
+        # the left ring starts partway along the border, the right one at a corner
+        for start in (0, 17, 33):
+            kept_left, kept_right = kept([close(left, start), close(right, len(right) - 1)], tolerance)
+
+            assert kept_left & shared == kept_right & shared
+            assert border[0] in kept_left and border[-1] in kept_left
+
+
+def test_ring_without_junctions_does_not_depend_on_its_start():
+    rng = np.random.default_rng(3)
+    angles = np.linspace(0, 2 * np.pi, 80, endpoint=False)
+    radii = 1. + .1 * rng.standard_normal(80)
+    ring = [tuple(vertex) for vertex in np.column_stack([radii * np.cos(angles), radii * np.sin(angles)]).tolist()]
+
+    for tolerance in (.02, .1):
+        results = [kept([close(ring, start)], tolerance, fixed=False)[0] for start in (0, 11, 52)]
+
+        assert results[0] == results[1] == results[2]
+        assert len(results[0]) >= 4
+
+
+def douglas_peucker(points, tolerance):
+    """
+    Kept vertices of an open line, by plain recursion.
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+
+    def split(i, j):
+        if j - i < 2:
+            return
+        d = points[j] - points[i]
+        seg = points[i + 1:j] - points[i]
+        norm = np.hypot(*d)
+        dist = np.hypot(*seg.T) if norm == 0 else np.abs(d[0] * seg[:, 1] - d[1] * seg[:, 0]) / norm
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            keep[i + 1 + k] = True
+            split(i, i + 1 + k)
+            split(i + 1 + k, j)
+
+    split(0, len(points) - 1)
+
+    return keep
+
+
+def test_errors_give_every_level():
+    rng = np.random.default_rng(7)
+    # open lines of random walks, some with repeated points
+    lines = [np.cumsum(rng.normal(size=(int(rng.integers(2, 300)), 2)), axis=0).round(1).tolist() for _ in range(40)]
+    coords, offsets = sc.flatten_rings(lines)
+
+    errors = sc.simplification_errors(coords, offsets)
+    for tolerance in (0., .05, .5, 2., 10.):
+        keep = sc.simplify_rings(coords, offsets, tolerance, min_points=0, errors=errors)
+        expected = np.concatenate([douglas_peucker(np.array(line), tolerance) for line in lines])
+        np.testing.assert_array_equal(keep, expected)
+
+
+def test_closing_vertex_follows_the_first():
+    border = wavy_border()
+    coords, offsets = sc.flatten_rings([close(border + [(-5., 10.), (-5., 0.)], 17)])
+    keep = sc.simplify_rings(coords, offsets, .2)
+
+    assert keep[0] == keep[-1]
+
+
+def test_choropie_lod_keeps_rings_closed(grid_shp, basemap_kwargs):
+    from choropie.ChoroPie import ChoroPie
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True, lod=[1.])
+    assert m.lod_tolerance == 1.
+
+    for segment in m.mpl_bounds.get_segments():
+        np.testing.assert_array_equal(segment[0], segment[-1])
@@ -0,0 +1,81 @@
+import matplotlib.path as mplPath
+import numpy as np
+import pytest
+
+from choropie import ChoroPie as cp
+from choropie.spatial_index import SpatialIndex
+from conftest import write_shapefile
+
+
+def star(rng, center, radius, n=9):
+    """
+    Non convex ring around center, as a closed list of vertices.
+    """
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+    radii = radius * rng.uniform(.3, 1., n)
+    ring = np.column_stack([center[0] + radii * np.cos(angles), center[1] + radii * np.sin(angles)])
+
+    return ring.tolist() + ring[:1].tolist()
+
+
+def brute_force(names, rings, points):
+    """
+    First ring of the first area (in file order) containing each point, where an area contains a point when an odd number
+    of its rings do. Tests every ring.
+    """
+    inside = np.array([mplPath.Path(ring).contains_points(points) for ring in rings])
+    areas = list(dict.fromkeys(names))
+    result = np.full(len(points), -1)
+
+    for area in areas[::-1]:
+        area_rings = [ring for ring, name in enumerate(names) if name == area]
+        odd = inside[area_rings].sum(axis=0) % 2 == 1
+        first = np.array(area_rings)[np.argmax(inside[area_rings], axis=0)]
+        result[odd] = first[odd]
+
+    return result
+
+
+@pytest.mark.parametrize('cell_size', [None, .3, 50.])
+def test_contains_points_matches_brute_force(cell_size):
+    rng = np.random.default_rng(2)
+    # overlapping rings, several per area, so points can fall in an even number of the rings of an area
+    rings = [star(rng, center, radius) for center, radius in zip(rng.uniform(0, 10, (60, 2)), rng.uniform(.2, 2., 60))]
+    names = ['r%d' % (ring % 23) for ring in range(len(rings))]
+    points = rng.uniform(-1, 11, (5000, 2))
+    points[:60] = [ring[0] for ring in rings]  # vertices are on the edge
+
+    index = SpatialIndex.from_rings(names, rings, cell_size)
+
+    expected = brute_force(names, rings, points)
+    assert (expected >= 0).sum() > 1000
+    np.testing.assert_array_equal(index.contains_points(points), expected)
+
+    found = index.find_areas(points)
+    assert found[expected == -1].tolist() == [None] * (expected == -1).sum()
+    assert found[expected >= 0].tolist() == [names[ring] for ring in expected[expected >= 0]]
+
+
+def test_enclave_inside_a_hole(tmp_path):
+    square = lambda x0, y0, size: [(x0, y0), (x0, y0 + size), (x0 + size, y0 + size), (x0 + size, y0), (x0, y0)]
+
+    # OUTER comes first and has a hole, which INNER fills. LAKE is a hole of OUTER with nothing in it
+    shp_file = write_shapefile(str(tmp_path / 'enclave'),
+                               [[square(0, 0, 10), square(4, 4, 2)[::-1], square(7, 7, 1)[::-1]], [square(4, 4, 2)]],
+                               [('OUTER',), ('INNER',)])
+
+    locations = ['enclave', 'county', 'lake']
+    assert cp.coords_in_area(locations, [(5, 5), (1, 1), (7.5, 7.5)], shp_file, 'NAME') == [('enclave', 'county'),
+                                                                                          ('INNER', 'OUTER')]
+
+
+def test_coords_in_area(grid_shp):
+    # the grid starts at -100, 30 with one degree squares, A(i * 8 + j) at column i and row j. A95 has a hole
+    locations = ['a', 'b', 'c', 'd', 'hole']
+    coords = [(30.5, -99.5), (32.5, -98.5), (10., 10.), (37.7, -88.2), (37.5, -88.5)]
+
+    index = SpatialIndex.from_shapefile(grid_shp, 'NAME')
+    found = cp.coords_in_area(locations, coords, grid_shp, 'NAME')
+
+    assert found == [('a', 'b', 'd'), ('A0', 'A10', 'A95')]
+    assert cp.coords_in_area(locations, coords, grid_shp, 'NAME', spatial_index=index) == found
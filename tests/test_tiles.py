@@ -0,0 +1,66 @@
+import os
+
+import matplotlib.image as mpimg
+import numpy as np
+import pandas as pd
+import pytest
+
+from choropie import tiles
+
+
+@pytest.fixture(scope='module')
+def rendered(tmp_path_factory, grid_shp):
+    from choropie.ChoroPie import ChoroPie
+
+    # a degree of sea around the grid
+    m = ChoroPie(dict(projection='merc', llcrnrlat=29, urcrnrlat=39, llcrnrlon=-101, urcrnrlon=-87), grid_shp, 'NAME',
+                 headless=True)
+    m.choro_plot(4, 'Blues', pd.Series(np.arange(96.), index=['A%d' % i for i in range(96)]))
+
+    out_dir = tmp_path_factory.mktemp('tiles')
+
+    return str(out_dir), tiles.render_tiles(str(out_dir), [9], m, workers=1)
+
+
+def tile_path(out_dir, tile):
+    return os.path.join(out_dir, *[str(i) for i in tile]) + '.png'
+
+
+def test_tiles_inside_an_area_are_written(rendered):
+    out_dir, result = rendered
+
+    # z9 tiles are about .7 degrees wide, this one lies wholly in A7 (column 0, row 7)
+    lon0, lat0, lon1, lat1 = tiles.tile_bounds(9, 114, 198)
+    assert -100 < lon0 < lon1 < -99 and 37 < lat0 < lat1 < 38
+
+    assert (9, 114, 198) in result['tiles']
+    rgba = mpimg.imread(tile_path(out_dir, (9, 114, 198)))
+    assert rgba.shape == (256, 256, 4)
+    assert (rgba == rgba[0, 0]).all() and not (rgba[0, 0] == 1.).all()
+
+    assert result['written'] + result['linked'] == len(result['tiles'])
+    assert all(os.path.exists(tile_path(out_dir, tile)) for tile in result['tiles'])
+
+
+def test_sea_tiles_are_skipped(rendered):
+    out_dir, result = rendered
+
+    sea = [tile for tile in tiles.tiles_for_bounds(-101, 29, -87, 39, 9)
+           if tiles.tile_bounds(*tile)[2] < -100 or tiles.tile_bounds(*tile)[0] > -88]
+    assert sea and result['skipped'] >= len(sea)
+    for tile in sea:
+        assert tile not in result['tiles'] and not os.path.exists(tile_path(out_dir, tile))
+
+
+def test_duplicate_tiles_are_linked(rendered):
+    out_dir, result = rendered
+
+    by_digest = {}
+    for tile, digest in result['tiles'].items():
+        by_digest.setdefault(digest, []).append(tile)
+    duplicates = [same for same in by_digest.values() if len(same) > 1]
+
+    assert result['linked'] == sum(len(same) - 1 for same in duplicates) > 0
+    assert result['written'] == len(by_digest)
+    for same in duplicates:
+        assert len({os.stat(tile_path(out_dir, tile)).st_ino for tile in same}) == 1
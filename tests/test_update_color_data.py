@@ -0,0 +1,70 @@
+import matplotlib as mpl
+import numpy as np
+import pandas as pd
+import pytest
+
+from choropie import classify
+
+names = ['A%d' % i for i in range(96)]
+
+
+def drawn(m):
+    """
+    Face color (rgba) and visibility of every area, whether it was drawn as patches or into mpl_collection.
+    """
+    if m.mpl_collection is None:
+        return {name: (tuple(polys[0].get_facecolor()), polys[0].get_visible()) for name, polys in m.mpl_polygons.items()}
+
+    m.mpl_collection.update_scalarmappable()
+    colors = m.mpl_collection.get_facecolors()
+    values = m.mpl_collection.get_array()
+    widths = np.broadcast_to(m.mpl_collection.get_linewidths(), len(values))
+
+    return {name: (tuple(colors[indices.start]), not values.mask[indices.start] and widths[indices.start] > 0)
+            for name, indices in m.mpl_polygons.items()}
+
+
+@pytest.mark.parametrize('use_collection', [False, True])
+def test_update_color_data_recolors_in_place(grid_shp, basemap_kwargs, use_collection):
+    from choropie.ChoroPie import ChoroPie
+
+    m = ChoroPie(basemap_kwargs, grid_shp, 'NAME', headless=True)
+    m.choro_plot(4, 'Blues', pd.Series(np.arange(96.), index=names), use_collection=use_collection)
+    m.insert_colorbar()
+
+    artists = m.mpl_collection if use_collection else {name: list(polys) for name, polys in m.mpl_polygons.items()}
+    ax_colorbar = m.ax_colorbar
+
+    # fewer areas, another range and more colors
+    new = pd.Series(np.random.default_rng(3).uniform(-50, 50, 96), index=names).drop(['A3', 'A95'])
+    m.update_color_data(new, num_colors=6)
+
+    if use_collection:
+        assert m.mpl_collection is artists
+    else:
+        assert all(a is b for name, polys in artists.items() for a, b in zip(polys, m.mpl_polygons[name]))
+        assert {name: len(polys) for name, polys in artists.items()} == {name: len(m.mpl_polygons[name]) for name in names}
+
+    bins = classify.classify(new, 6)
+    cm = mpl.colormaps.get_cmap('Blues')
+    scheme = [cm(i / 6) for i in range(1, 7)]
+    colors = np.array(scheme)[np.clip(np.digitize(new, bins[1:-1]), 0, 5)]
+
+    shown = drawn(m)
+    assert set(shown) == set(names)
+    for name in ('A3', 'A95'):
+        assert not shown[name][1]
+    for name, color in zip(new.index, colors):
+        assert shown[name][1]
+        np.testing.assert_allclose(shown[name][0], color)
+
+    # the colorbar is redrawn in place with the new bins
+    assert m.ax_colorbar is ax_colorbar
+    np.testing.assert_allclose(m.ax_colorbar.get_yticks(), bins)
+    np.testing.assert_allclose(m.ax_colorbar.get_ylim(), (bins[0], bins[-1]))
+
+    # areas hidden by the new data stay hidden after a zoom
+    m.zoom_to_area(['A3', 'A4'])
+    m.zoom_home()
+    shown = drawn(m)
+    assert not shown['A3'][1] and not shown['A95'][1] and shown['A4'][1]